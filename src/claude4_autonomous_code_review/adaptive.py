@@ -0,0 +1,104 @@
+"""
+Adaptive iteration control (used with --adaptive)
+
+Focus areas that cannot apply to the packed code are skipped up front
+(e.g. concurrency when nothing imports threading or uses async), and the
+iteration loop stops once iterations stop producing findings that are new
+after de-duplication against everything reported so far.
+"""
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import ADAPTIVE_MIN_ITERATIONS, ADAPTIVE_MIN_NEW_FINDINGS, ADAPTIVE_PATIENCE
+from dedup import dedupe_findings
+from findings import Finding, FindingsStore
+from incremental import imported_modules
+
+ASYNC_SYNTAX = re.compile(r'^\s*async\s+(def|with|for)\b', re.MULTILINE)
+
+# Focus area (iteration number) -> (top-level modules that make it relevant, reason when absent)
+FOCUS_REQUIREMENTS = {
+    6: (
+        {"threading", "multiprocessing", "asyncio", "concurrent", "queue", "_thread",
+         "gevent", "eventlet", "trio", "anyio", "celery"},
+        "no threading, multiprocessing or async code"
+    ),
+    8: (
+        {"requests", "httpx", "urllib", "urllib3", "aiohttp", "http", "socket", "ssl", "grpc",
+         "flask", "django", "fastapi", "starlette", "tornado", "boto3", "botocore", "paramiko",
+         "smtplib", "ftplib", "xmlrpc", "websockets", "pika", "kafka", "redis", "pymongo",
+         "sqlalchemy", "psycopg2", "pymysql", "sqlite3"},
+        "no network, web framework or database imports"
+    ),
+}
+
+
+def irrelevant_focus_areas(sources: Iterable[str]) -> Dict[int, str]:
+    """
+    Focus areas (iteration number -> reason) that cannot apply to this code
+    """
+    top_level, uses_async = set(), False
+    for source in sources:
+        top_level.update(module.split(".")[0] for module in imported_modules(source))
+        uses_async = uses_async or bool(ASYNC_SYNTAX.search(source))
+    
+    skipped = {}
+    for iteration, (modules, reason) in FOCUS_REQUIREMENTS.items():
+        relevant = bool(top_level & modules) or (iteration == 6 and uses_async)
+        if not relevant:
+            skipped[iteration] = reason
+    return skipped
+
+
+class YieldTracker:
+    """
+    Novel findings per iteration, and whether the yield has dried up
+    """
+    
+    def __init__(
+        self,
+        rel_paths: List[str],
+        seed: Iterable[Finding] = (),
+        min_new_findings: int = ADAPTIVE_MIN_NEW_FINDINGS,
+        patience: int = ADAPTIVE_PATIENCE,
+        min_iterations: int = ADAPTIVE_MIN_ITERATIONS
+    ):
+        self.rel_paths = rel_paths
+        self.min_new_findings = min_new_findings
+        self.patience = patience
+        self.min_iterations = min_iterations
+        # Already-known findings (e.g. from static analysis) never count as new
+        self.unique, _ = dedupe_findings(list(seed))
+        self.history: List[Dict[str, int]] = []
+    
+    def observe(self, result: Dict[str, Any]) -> int:
+        """
+        Record one iteration result; returns how many of its findings are new
+        """
+        found = FindingsStore.from_iterations([result], self.rel_paths).findings
+        merged, _ = dedupe_findings(self.unique + found)
+        # A new finding can also join two old ones, so the count may not grow
+        novel = max(0, len(merged) - len(self.unique))
+        self.unique = merged
+        self.history.append({"iteration": result["iteration"], "findings": len(found), "novel": novel})
+        return novel
+    
+    @property
+    def exhausted(self) -> bool:
+        """
+        At least min_iterations observed and the last `patience` of them
+        each produced fewer than min_new_findings new findings
+        """
+        if len(self.history) < max(self.min_iterations, self.patience):
+            return False
+        return all(entry["novel"] < self.min_new_findings for entry in self.history[-self.patience:])
+    
+    def stats(self, stopped_after: Optional[int], skipped: Dict[int, str]) -> Dict[str, Any]:
+        """Per-iteration yield and the stop/skip decisions for the JSON report"""
+        return {
+            "novel_findings": {entry["iteration"]: entry["novel"] for entry in self.history},
+            "stopped_after": stopped_after,
+            "skipped_focus_areas": skipped,
+            "min_new_findings": self.min_new_findings,
+            "patience": self.patience
+        }
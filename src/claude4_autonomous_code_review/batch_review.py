@@ -0,0 +1,205 @@
+"""
+Message Batches mode for bulk, latency-insensitive reviews
+
+Every codebase gets its own conversation. All first-iteration requests are
+submitted as one batch; once it has ended, the next iteration of every
+still-running review is submitted as the next batch, and so on. Each
+codebase ends up with the usual review_*.json / .md pair.
+
+With --max-cost each request's worst case is held on the run's cost meter
+at batch prices before the batch is submitted, and settled from the
+result's usage; a request that does not fit ends its review.
+"""
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+from clean_review import CleanIterativeReviewer
+from config import BATCH_POLL_SECONDS, BATCH_PRICE_FACTOR, INPUT_TOKEN_BUDGET
+from cost_meter import CostLimitExceeded
+from iteration_prompts import get_focus_area
+
+
+class BatchReviewer:
+    """
+    Runs CleanIterativeReviewer's iteration loop for many codebases through
+    the Message Batches API, one batch per iteration
+    """
+    
+    def __init__(self, reviewer: CleanIterativeReviewer, poll_interval: float = BATCH_POLL_SECONDS):
+        self.reviewer = reviewer
+        self.poll_interval = poll_interval
+    
+    def run_batch_reviews(
+        self,
+        codebase_paths: List[Path],
+        review_goals: str,
+        max_iterations: int = 5,
+        incremental: bool = False,
+        token_budget: int = INPUT_TOKEN_BUDGET,
+        ranking: str = "risk"
+    ) -> List[Dict[str, Any]]:
+        """
+        Review every codebase and write one report per codebase
+        """
+        start_time = datetime.now()
+        
+        print(f"📦 BATCH CODE REVIEW ({len(codebase_paths)} codebases, {max_iterations} iterations)")
+        print("=" * 50)
+        print(f"🎯 Goals: {review_goals}")
+        print(f"🤖 Model: {self.reviewer.client.model}")
+        print()
+        
+        jobs = []
+        for index, codebase_path in enumerate(codebase_paths):
+            codebase_path = Path(codebase_path)
+            print(f"📁 [{index}] {codebase_path}")
+            reviewer = self.reviewer.spawn()
+            files, plan = reviewer.select_files(codebase_path, incremental)
+            packing, file_ids = reviewer.pack_and_upload(files, token_budget, ranking)
+            jobs.append({
+                "index": index,
+                "codebase_path": codebase_path,
+                "reviewer": reviewer,
+                "plan": plan,
+                "packing": packing,
+                "file_ids": file_ids,
+                "iterations": [],
+                "active": bool(file_ids)
+            })
+        
+        for i in range(1, max_iterations + 1):
+            active = [job for job in jobs if job["active"]]
+            if not active:
+                break
+            # --adaptive: focus areas that cannot apply to a codebase are left out of its batch
+            due = [job for job in active if i not in job["reviewer"].skipped_focus]
+            print(f"\n=== ITERATION {i}: {get_focus_area(i)} ({len(due)} reviews) ===")
+            if due:
+                self._run_iteration(due, i, max_iterations, review_goals)
+        
+        reports = []
+        for job in jobs:
+            reviewer = job["reviewer"]
+            review = {"iterations": job["iterations"], "packing": job["packing"], "execution_mode": "batch"}
+            results = reviewer.build_report(
+                job["codebase_path"], review_goals, max_iterations, review, start_time, job["plan"]
+            )
+            results["cost_estimate"] *= BATCH_PRICE_FACTOR
+            reviewer.save_reports(results)
+            reports.append(results)
+        
+        return reports
+    
+    def _run_iteration(
+        self,
+        jobs: List[Dict[str, Any]],
+        iteration: int,
+        max_iterations: int,
+        review_goals: str
+    ) -> None:
+        """
+        Submit one iteration for every job as a single batch and record the replies
+        """
+        focus = get_focus_area(iteration)
+        pending: Dict[str, Dict[str, Any]] = {}
+        
+        for job in jobs:
+            reviewer, client = job["reviewer"], job["reviewer"].client
+            if iteration == 1:
+                prompt = reviewer.build_initial_prompt(iteration, max_iterations, review_goals, focus)
+                client.session_context.append(
+                    {"role": "user", "content": client.build_user_content(prompt, job["file_ids"])}
+                )
+                messages = list(client.session_context)
+            else:
+                prompt = reviewer.build_continuation_prompt(iteration, max_iterations, focus)
+                client.session_context.append({"role": "user", "content": client.continuation_content(prompt)})
+                messages = client.history_messages()
+            
+            params = client.request_params(messages)
+            cache_key = client.cache_key(params)
+            cached = client.response_cache.get(cache_key) if cache_key else None
+            if cached is not None:
+                self._record(job, iteration, focus, cached)
+                continue
+            
+            requested_model = params["model"]
+            try:
+                reserved = client.reserve_cost(params, BATCH_PRICE_FACTOR)
+            except CostLimitExceeded as e:
+                print(f"💸 [{job['index']}] {job['codebase_path'].name} - stopping: {e}")
+                self._stop(job)
+                continue
+            if cache_key and params["model"] != requested_model:
+                cache_key = client.cache_key(params)
+            
+            custom_id = f"review-{job['index']}-iter-{iteration}"
+            pending[custom_id] = {"job": job, "params": params, "cache_key": cache_key, "reserved": reserved}
+        
+        if not pending:
+            return
+        
+        api = self.reviewer.client.client.messages.batches
+        limiter = self.reviewer.rate_limiter
+        meter = self.reviewer.cost_meter
+        try:
+            batch = limiter.call(lambda: api.create(requests=[
+                {"custom_id": custom_id, "params": entry["params"]}
+                for custom_id, entry in pending.items()
+            ]))
+        except Exception:
+            for entry in pending.values():
+                meter.release(entry["reserved"])
+            raise
+        print(f"📤 Submitted {batch.id} ({len(pending)} requests)")
+        
+        while batch.processing_status != "ended":
+            time.sleep(self.poll_interval)
+            batch = limiter.call(lambda: api.retrieve(batch.id))
+            counts = batch.request_counts
+            print(f"   ⏳ {batch.processing_status}: {counts.succeeded} succeeded, "
+                  f"{counts.errored} errored, {counts.processing} processing")
+        
+        for result in limiter.call(lambda: list(api.results(batch.id))):
+            entry = pending.pop(result.custom_id, None)
+            if entry is None:
+                continue
+            job = entry["job"]
+            if result.result.type != "succeeded":
+                print(f"✗ [{job['index']}] {job['codebase_path']} - iteration {iteration} {result.result.type}")
+                meter.release(entry["reserved"])
+                self._stop(job)
+                continue
+            
+            message = result.result.message
+            meter.settle(entry["params"]["model"], message.usage, entry["reserved"], BATCH_PRICE_FACTOR)
+            if entry["cache_key"]:
+                job["reviewer"].client.response_cache.put(entry["cache_key"], message)
+            self._record(job, iteration, focus, message)
+        
+        # Requests missing from the results file are treated as failed
+        for entry in pending.values():
+            meter.release(entry["reserved"])
+            self._stop(entry["job"])
+    
+    def _record(self, job: Dict[str, Any], iteration: int, focus: str, message: Any) -> None:
+        """Store a reply in the job's conversation and iteration list"""
+        reviewer = job["reviewer"]
+        reviewer.client.session_context.append({"role": "assistant", "content": message.content})
+        iteration_result = reviewer.build_iteration_result(iteration, focus, message)
+        if iteration > 1 and reviewer.client.last_history_stats:
+            iteration_result["history"] = reviewer.client.last_history_stats
+        print(f"✓ [{job['index']}] {job['codebase_path'].name} - {len(iteration_result['response'])} chars")
+        exhausted = reviewer.observe_yield(iteration_result)
+        job["iterations"].append(iteration_result)
+        if exhausted:
+            reviewer.stopped_after = iteration
+            job["active"] = False
+            print(f"🛑 [{job['index']}] Adaptive stop: few new findings")
+    
+    def _stop(self, job: Dict[str, Any]) -> None:
+        """Drop the unanswered instruction and end the job's iteration loop"""
+        job["reviewer"].client.session_context.pop()
+        job["active"] = False
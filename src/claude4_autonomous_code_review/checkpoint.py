@@ -0,0 +1,90 @@
+"""
+Append-only checkpoints that make long reviews resumable
+
+A checkpoint is a JSON-lines file in reports/ with one record per event:
+
+    start      run settings (codebase, goals, iterations, model options)
+    context    packing summary, uploaded file contents and their ids
+    iteration  one completed iteration result, plus the user/assistant
+               messages it added to the conversation (sequential mode)
+    complete   name of the review report written at the end
+
+Every record is flushed and fsynced as it is written, so after a crash the
+file holds everything up to the last completed iteration.
+"""
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict
+
+from response_cache import to_jsonable
+
+
+class ReviewCheckpoint:
+    """
+    Writer for one review's checkpoint file
+    """
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        # A crash can leave a torn last line; start the next record on a fresh one
+        self._needs_newline = False
+        if self.path.exists() and self.path.stat().st_size:
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                self._needs_newline = f.read(1) != b"\n"
+    
+    @classmethod
+    def create(cls, reports_dir: Path, **settings: Any) -> "ReviewCheckpoint":
+        """
+        New checkpoint file whose first record holds the run settings
+        """
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        base, suffix = timestamp, 2
+        while (reports_dir / f"checkpoint_{timestamp}.jsonl").exists():
+            timestamp, suffix = f"{base}_{suffix}", suffix + 1
+        
+        checkpoint = cls(reports_dir / f"checkpoint_{timestamp}.jsonl")
+        checkpoint.append("start", started_at=datetime.now().isoformat(), **settings)
+        return checkpoint
+    
+    def append(self, event: str, **data: Any) -> None:
+        """
+        Durably append one record
+        """
+        line = json.dumps({"event": event, **data}, default=to_jsonable, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                if self._needs_newline:
+                    f.write("\n")
+                    self._needs_newline = False
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+    
+    @staticmethod
+    def load(path: Path) -> Dict[str, Any]:
+        """
+        Replay a checkpoint into {"start", "context", "iterations", "complete"}
+        
+        A torn final line (crash mid-write) is ignored.
+        """
+        state: Dict[str, Any] = {"start": None, "context": None, "iterations": [], "complete": None}
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                event = record.pop("event", None)
+                if event == "iteration":
+                    state["iterations"].append(record)
+                elif event in state:
+                    state[event] = record
+        
+        if state["start"] is None:
+            raise ValueError(f"Not a review checkpoint: {path}")
+        return state
@@ -1,34 +1,91 @@
 """
 Clean Claude 4 Client for Iterative Code Reviews Only
 """
+import asyncio
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 
 import anthropic
-from anthropic import Anthropic
+import httpx
+from anthropic import Anthropic, AsyncAnthropic
 from anthropic.types import Message, MessageParam
 
 from config import (
     ANTHROPIC_API_KEY, DEVELOPMENT_MODEL, PRODUCTION_MODEL,
-    MAX_TOKENS, TEMPERATURE
+    MAX_TOKENS, TEMPERATURE, MAX_PARALLEL_REQUESTS
 )
+from context_packer import estimate_tokens
+from cost_meter import CostMeter
+from history import compact_history, content_text
+from rate_limiter import RateLimiter, is_retryable
+from response_cache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
+# Receives each text delta of a streamed response as it arrives
+TextCallback = Callable[[str], None]
 
-class Claude4Client:
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def message_text(message: Message) -> str:
     """
-    Streamlined Claude 4 client for iterative code reviews
+    Plain text of a response (joins all text blocks)
+    """
+    return "".join(
+        block.text for block in message.content
+        if getattr(block, "type", None) == "text"
+    )
+
+
+def _with_cache_breakpoint(message: MessageParam) -> MessageParam:
+    """
+    Copy of a message whose last content block carries cache_control
+    """
+    content = message["content"]
+    if isinstance(content, str):
+        blocks = [{"type": "text", "text": content}]
+    else:
+        blocks = [
+            block.model_dump(exclude_none=True) if hasattr(block, "model_dump") else dict(block)
+            for block in content
+        ]
+    blocks[-1] = {**blocks[-1], "cache_control": CACHE_CONTROL}
+    return {"role": message["role"], "content": blocks}
+
+
+class BaseClaude4Client:
+    """
+    Session state and file context shared by the sync and async clients
     """
     
-    def __init__(self, use_production_model: bool = False):
-        self.client = Anthropic(api_key=ANTHROPIC_API_KEY)
+    def __init__(
+        self,
+        use_production_model: bool = False,
+        response_cache: Optional[ResponseCache] = None,
+        history_turns: Optional[int] = None,
+        prompt_caching: bool = False,
+        system_prompt: Optional[str] = None,
+        output_tool: Optional[Dict[str, Any]] = None,
+        cost_meter: Optional[CostMeter] = None
+    ):
         self.model = PRODUCTION_MODEL if use_production_model else DEVELOPMENT_MODEL
         self.session_context: List[MessageParam] = []
         self.uploaded_files: Dict[str, str] = {}
-        
-        logger.info(f"Initialized Claude4Client with model: {self.model}")
+        self.response_cache = response_cache
+        # None sends the whole conversation; N keeps the first turn, a findings
+        # summary and the last N turns (see history.compact_history)
+        self.history_turns = history_turns
+        self.last_history_stats: Optional[Dict[str, int]] = None
+        # Prompt caching puts the file context first and marks it (and the
+        # system prompt) with cache_control so later calls read it from cache
+        self.prompt_caching = prompt_caching
+        self.system_prompt = system_prompt
+        # When set, every request forces a call to this tool (structured output)
+        self.output_tool = output_tool
+        # Prices every uncached call and enforces the run's cost limit
+        self.cost_meter = cost_meter
     
     def upload_file(self, file_path: Union[str, Path]) -> str:
         """
@@ -43,43 +100,198 @@ class Claude4Client:
         with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
             content = f.read()
         
-        file_id = f"file_{len(self.uploaded_files)}_{file_path.name}"
+        return self.upload_content(file_path.name, content)
+    
+    def upload_content(self, name: str, content: str) -> str:
+        """
+        Upload already-read content (a whole file or a chunk of one)
+        """
+        file_id = f"file_{len(self.uploaded_files)}_{name}"
         self.uploaded_files[file_id] = content
         
-        logger.info(f"Uploaded file: {file_path.name} -> {file_id}")
+        logger.info(f"Uploaded file: {name} -> {file_id}")
         return file_id
     
-    def create_analysis_message(
+    def _build_file_context(
         self,
         task_description: str,
         file_references: Optional[List[str]] = None
-    ) -> Message:
+    ) -> str:
         """
-        Create initial analysis message with file context
+        Concatenate task description with the referenced uploaded files
         """
-        # Build context with uploaded files
         context_parts = [task_description]
+        context_parts.extend(self._file_parts(file_references))
         
-        if file_references:
-            for file_id in file_references:
-                if file_id in self.uploaded_files:
-                    context_parts.append(f"\n--- File: {file_id} ---\n")
-                    context_parts.append(self.uploaded_files[file_id])
+        return "\n".join(context_parts)
+    
+    def _file_parts(self, file_references: Optional[List[str]]) -> List[str]:
+        """
+        Header and content lines for each referenced uploaded file
+        """
+        parts = []
+        for file_id in file_references or []:
+            if file_id in self.uploaded_files:
+                parts.append(f"\n--- File: {file_id} ---\n")
+                parts.append(self.uploaded_files[file_id])
+        return parts
+    
+    def build_user_content(
+        self,
+        task_description: str,
+        file_references: Optional[List[str]] = None
+    ) -> Union[str, List[Dict[str, Any]]]:
+        """
+        First-turn user content: plain text, or with prompt caching a cacheable
+        file-context block followed by the task
+        """
+        file_parts = self._file_parts(file_references)
+        if not self.prompt_caching or not file_parts:
+            return self._build_file_context(task_description, file_references)
         
-        full_context = "\n".join(context_parts)
+        return [
+            {"type": "text", "text": "\n".join(file_parts), "cache_control": CACHE_CONTROL},
+            {"type": "text", "text": task_description}
+        ]
+    
+    def request_params(self, messages: List[MessageParam]) -> Dict[str, Any]:
+        """
+        Keyword arguments for messages.create
+        """
+        params: Dict[str, Any] = {
+            "model": self.model,
+            "max_tokens": MAX_TOKENS,
+            "temperature": TEMPERATURE,
+            "messages": messages
+        }
         
-        # Create message
-        message = self.client.messages.create(
-            model=self.model,
-            max_tokens=MAX_TOKENS,
-            temperature=TEMPERATURE,
-            messages=[
-                {
-                    "role": "user",
-                    "content": full_context
-                }
-            ]
+        if self.system_prompt:
+            params["system"] = (
+                [{"type": "text", "text": self.system_prompt, "cache_control": CACHE_CONTROL}]
+                if self.prompt_caching else self.system_prompt
+            )
+        
+        if self.output_tool:
+            params["tools"] = [self.output_tool]
+            params["tool_choice"] = {"type": "tool", "name": self.output_tool["name"]}
+        
+        if self.prompt_caching and len(messages) > 1:
+            # Moving breakpoint on the newest turn caches the conversation so far
+            params["messages"] = list(messages[:-1]) + [_with_cache_breakpoint(messages[-1])]
+        
+        return params
+    
+    def continuation_content(self, instruction: str) -> Union[str, List[Dict[str, Any]]]:
+        """
+        User content for the next turn; a previous tool call must be answered
+        with a tool_result before the conversation can continue
+        """
+        previous = self.session_context[-1]["content"] if self.session_context else ""
+        if isinstance(previous, str):
+            return instruction
+        
+        tool_ids = []
+        for block in previous:
+            block = block.model_dump() if hasattr(block, "model_dump") else block
+            if block.get("type") == "tool_use":
+                tool_ids.append(block["id"])
+        if not tool_ids:
+            return instruction
+        
+        return [
+            *({"type": "tool_result", "tool_use_id": tool_id, "content": "Recorded."} for tool_id in tool_ids),
+            {"type": "text", "text": instruction}
+        ]
+    
+    def history_messages(self) -> List[MessageParam]:
+        """
+        Messages to send for a continuation, compacted per the history policy
+        """
+        if self.history_turns is None:
+            self.last_history_stats = None
+            return self.session_context
+        
+        messages, self.last_history_stats = compact_history(self.session_context, self.history_turns)
+        return messages
+    
+    def cache_key(self, params: Dict[str, Any]) -> Optional[str]:
+        """
+        Response cache key for a request, or None when caching is off
+        """
+        if self.response_cache is None:
+            return None
+        # Tools only join the key when present so existing entries stay valid
+        extra = {key: params[key] for key in ("tools", "tool_choice") if key in params}
+        return ResponseCache.make_key(
+            params["model"], params["temperature"], params["max_tokens"], params["messages"],
+            system=params.get("system"), **extra
+        )
+    
+    def _estimated_input_tokens(self, params: Dict[str, Any]) -> int:
+        """
+        Rough input size of a request, for rate-limit and cost budgeting
+        """
+        text = "".join(content_text(m["content"]) for m in params["messages"])
+        return estimate_tokens(text + content_text(params.get("system") or ""))
+    
+    def reserve_cost(self, params: Dict[str, Any], price_factor: float = 1.0) -> float:
+        """
+        Hold a request's worst-case cost on the cost meter (switching
+        params["model"] if the meter downgrades it); returns the amount held
+        
+        Raises cost_meter.CostLimitExceeded when the request does not fit.
+        """
+        if self.cost_meter is None:
+            return 0.0
+        params["model"], reserved = self.cost_meter.reserve(
+            params["model"], self._estimated_input_tokens(params), params["max_tokens"], price_factor,
+            cache_writes=self.prompt_caching
         )
+        return reserved
+
+
+class Claude4Client(BaseClaude4Client):
+    """
+    Streamlined Claude 4 client for iterative code reviews
+    """
+    
+    def __init__(
+        self,
+        use_production_model: bool = False,
+        response_cache: Optional[ResponseCache] = None,
+        history_turns: Optional[int] = None,
+        prompt_caching: bool = False,
+        system_prompt: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        output_tool: Optional[Dict[str, Any]] = None,
+        cost_meter: Optional[CostMeter] = None
+    ):
+        super().__init__(
+            use_production_model, response_cache, history_turns, prompt_caching, system_prompt,
+            output_tool, cost_meter
+        )
+        # Retries are owned by the rate limiter (shared across clients of one run)
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.client = Anthropic(api_key=ANTHROPIC_API_KEY, max_retries=0)
+        
+        logger.info(f"Initialized Claude4Client with model: {self.model}")
+    
+    def create_analysis_message(
+        self,
+        task_description: str,
+        file_references: Optional[List[str]] = None,
+        on_text: Optional[TextCallback] = None
+    ) -> Message:
+        """
+        Create initial analysis message with file context
+        
+        With on_text the response is streamed and each text delta is passed
+        to the callback as it arrives; the complete message is still returned.
+        """
+        full_context = self.build_user_content(task_description, file_references)
+        
+        # Create message
+        message = self._create([{"role": "user", "content": full_context}], on_text)
         
         # Store in session context for conversation continuity
         self.session_context.extend([
@@ -89,25 +301,37 @@ class Claude4Client:
         
         return message
     
-    def continue_autonomous_session(self, additional_instruction: str) -> Message:
+    def create_independent_message(
+        self,
+        task_description: str,
+        file_references: Optional[List[str]] = None
+    ) -> Message:
         """
-        Continue the iterative session with new instruction
+        One-shot analysis with file context that does not touch session_context.
+        Safe to call concurrently from several threads.
+        """
+        full_context = self.build_user_content(task_description, file_references)
+        
+        return self._create([{"role": "user", "content": full_context}])
+    
+    def continue_autonomous_session(
+        self,
+        additional_instruction: str,
+        on_text: Optional[TextCallback] = None
+    ) -> Message:
+        """
+        Continue the iterative session with new instruction (streamed when on_text is given)
         """
         if not self.session_context:
             raise ValueError("No session context available. Start with create_analysis_message first.")
         
         # Add the continuation instruction
         self.session_context.append({
-            "role": "user", 
-            "content": additional_instruction
+            "role": "user",
+            "content": self.continuation_content(additional_instruction)
         })
         
-        message = self.client.messages.create(
-            model=self.model,
-            max_tokens=MAX_TOKENS,
-            temperature=TEMPERATURE,
-            messages=self.session_context
-        )
+        message = self._create(self.history_messages(), on_text)
         
         # Update session context
         self.session_context.append({
@@ -116,3 +340,230 @@ class Claude4Client:
         })
         
         return message
+    
+    def _create(self, messages: List[MessageParam], on_text: Optional[TextCallback] = None) -> Message:
+        """
+        Single entry point for every Messages API call
+        """
+        params = self.request_params(messages)
+        cache_key = self.cache_key(params)
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                if on_text:
+                    on_text(message_text(cached))
+                return cached
+        
+        requested_model = params["model"]
+        reserved = self.reserve_cost(params)
+        if cache_key and params["model"] != requested_model:
+            cache_key = self.cache_key(params)
+        
+        estimated_tokens = self._estimated_input_tokens(params)
+        try:
+            if on_text:
+                streamed = []
+                
+                def forward(text: str) -> None:
+                    streamed.append(text)
+                    on_text(text)
+                
+                # Once text has reached the caller a retry would repeat it
+                message = self.rate_limiter.call(
+                    lambda: self._stream(params, forward),
+                    estimated_tokens,
+                    lambda e: not streamed and is_retryable(e)
+                )
+            else:
+                message = self.rate_limiter.call(lambda: self._send(params), estimated_tokens)
+        except Exception:
+            if self.cost_meter:
+                self.cost_meter.release(reserved)
+            raise
+        
+        if self.cost_meter:
+            self.cost_meter.settle(params["model"], message.usage, reserved)
+        if cache_key:
+            self.response_cache.put(cache_key, message)
+        return message
+    
+    def _send(self, params: Dict[str, Any]) -> Message:
+        """
+        One non-streaming request; feeds the rate-limit headers to the scheduler
+        """
+        raw = self.client.messages.with_raw_response.create(**params)
+        self.rate_limiter.update(raw.headers)
+        return raw.parse()
+    
+    def _stream(self, params: Dict[str, Any], on_text: TextCallback) -> Message:
+        """
+        One streaming request; feeds the rate-limit headers to the scheduler
+        """
+        with self.client.messages.stream(**params) as stream:
+            self.rate_limiter.update(stream.response.headers)
+            for text in stream.text_stream:
+                on_text(text)
+            return stream.get_final_message()
+
+
+def create_async_http_client(max_connections: int = MAX_PARALLEL_REQUESTS) -> httpx.AsyncClient:
+    """
+    Pooled HTTP transport that several AsyncClaude4Client instances can share
+    """
+    return anthropic.DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections
+        )
+    )
+
+
+class AsyncClaude4Client(BaseClaude4Client):
+    """
+    Asyncio variant of Claude4Client for reviewing many codebases from one process.
+    
+    Pass the same http_client and semaphore to several instances to share one
+    connection pool and one in-flight request limit across reviews. base_url
+    points the client at a local stand-in server for testing.
+    """
+    
+    def __init__(
+        self,
+        use_production_model: bool = False,
+        max_concurrent_requests: int = MAX_PARALLEL_REQUESTS,
+        http_client: Optional[httpx.AsyncClient] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        base_url: Optional[str] = None,
+        response_cache: Optional[ResponseCache] = None,
+        history_turns: Optional[int] = None,
+        prompt_caching: bool = False,
+        system_prompt: Optional[str] = None,
+        output_tool: Optional[Dict[str, Any]] = None,
+        cost_meter: Optional[CostMeter] = None
+    ):
+        super().__init__(
+            use_production_model, response_cache, history_turns, prompt_caching, system_prompt,
+            output_tool, cost_meter
+        )
+        self._owns_http_client = http_client is None
+        self.http_client = http_client or create_async_http_client(max_concurrent_requests)
+        self.semaphore = semaphore or asyncio.Semaphore(max_concurrent_requests)
+        self.client = AsyncAnthropic(
+            api_key=ANTHROPIC_API_KEY,
+            base_url=base_url,
+            http_client=self.http_client
+        )
+        
+        logger.info(f"Initialized AsyncClaude4Client with model: {self.model}")
+    
+    async def __aenter__(self) -> "AsyncClaude4Client":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+    
+    async def aclose(self) -> None:
+        """
+        Close the HTTP transport if this client created it
+        """
+        if self._owns_http_client:
+            await self.http_client.aclose()
+    
+    async def create_analysis_message(
+        self,
+        task_description: str,
+        file_references: Optional[List[str]] = None,
+        on_text: Optional[TextCallback] = None
+    ) -> Message:
+        """
+        Create initial analysis message with file context
+        
+        With on_text the response is streamed and each text delta is passed
+        to the callback as it arrives; the complete message is still returned.
+        """
+        full_context = self.build_user_content(task_description, file_references)
+        
+        message = await self._create([{"role": "user", "content": full_context}], on_text)
+        
+        # Store in session context for conversation continuity
+        self.session_context.extend([
+            {"role": "user", "content": full_context},
+            {"role": "assistant", "content": message.content}
+        ])
+        
+        return message
+    
+    async def create_independent_message(
+        self,
+        task_description: str,
+        file_references: Optional[List[str]] = None
+    ) -> Message:
+        """
+        One-shot analysis with file context that does not touch session_context
+        """
+        full_context = self.build_user_content(task_description, file_references)
+        
+        return await self._create([{"role": "user", "content": full_context}])
+    
+    async def continue_autonomous_session(
+        self,
+        additional_instruction: str,
+        on_text: Optional[TextCallback] = None
+    ) -> Message:
+        """
+        Continue the iterative session with new instruction (streamed when on_text is given)
+        """
+        if not self.session_context:
+            raise ValueError("No session context available. Start with create_analysis_message first.")
+        
+        self.session_context.append({
+            "role": "user",
+            "content": self.continuation_content(additional_instruction)
+        })
+        
+        message = await self._create(self.history_messages(), on_text)
+        
+        self.session_context.append({
+            "role": "assistant",
+            "content": message.content
+        })
+        
+        return message
+    
+    async def _create(self, messages: List[MessageParam], on_text: Optional[TextCallback] = None) -> Message:
+        """
+        Send one request while holding a slot of the in-flight semaphore
+        """
+        params = self.request_params(messages)
+        cache_key = self.cache_key(params)
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                if on_text:
+                    on_text(message_text(cached))
+                return cached
+        
+        requested_model = params["model"]
+        reserved = self.reserve_cost(params)
+        if cache_key and params["model"] != requested_model:
+            cache_key = self.cache_key(params)
+        
+        try:
+            async with self.semaphore:
+                if on_text:
+                    async with self.client.messages.stream(**params) as stream:
+                        async for text in stream.text_stream:
+                            on_text(text)
+                        message = await stream.get_final_message()
+                else:
+                    message = await self.client.messages.create(**params)
+        except BaseException:
+            if self.cost_meter:
+                self.cost_meter.release(reserved)
+            raise
+        
+        if self.cost_meter:
+            self.cost_meter.settle(params["model"], message.usage, reserved)
+        if cache_key:
+            self.response_cache.put(cache_key, message)
+        return message
@@ -5,17 +5,49 @@ Generates both JSON (for processing) and Markdown (for humans) in reports/ folde
 import json
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 
 # Add current directory for imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 
-from claude4_client import Claude4Client
-from config import REPORTS_DIR
-from iteration_prompts import get_iteration_prompt
+import anthropic
+
+from adaptive import YieldTracker, irrelevant_focus_areas
+from checkpoint import ReviewCheckpoint
+from claude4_client import Claude4Client, message_text
+from config import (
+    CASCADE_ESCALATE_SEVERITY, CASCADE_TRIAGE_ITERATIONS, CONTEXT_CHUNK_TOKENS, INPUT_TOKEN_BUDGET,
+    MAX_PARALLEL_REQUESTS, PRODUCTION_MODEL, REPORTS_DIR, RESPONSE_CACHE_DIR,
+    RESPONSE_CACHE_MAX_BYTES, RISK_DEEP_FRACTION, RISK_SHALLOW_ITERATIONS
+)
+from context_packer import RANKING_STRATEGIES, pack_files
+from cost_meter import COST_LIMIT_ACTIONS, CostLimitExceeded, CostMeter, estimate_cost
+from dedup import dedupe_findings
+from findings import (
+    FINDINGS_TOOL, SEVERITY_ORDER, Finding, FindingsStore, parse_issue_block, render_records,
+    severity_rank, tool_findings
+)
+from history import summarize_issue
+from incremental import (
+    attribute_findings, compute_file_hashes, find_previous_report,
+    format_carried_findings, plan_incremental_review, relative_name
+)
+from iteration_prompts import (
+    OUTPUT_FORMAT, REVIEW_SYSTEM_PROMPT, STRUCTURED_OUTPUT_FORMAT, STRUCTURED_SYSTEM_PROMPT,
+    get_focus_area, get_iteration_prompt
+)
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache
+from risk_scoring import score_files, split_by_risk
+from static_analysis import MAX_NOTE_LINES, analyze_files, coverage_note
+from streaming import IssueStreamParser
+from symbol_index import SymbolIndex
+
+PROGRESS_WIDTH = 60
 
 
 class CleanIterativeReviewer:
@@ -23,19 +55,83 @@ class CleanIterativeReviewer:
     Single, clean implementation of iterative review
     """
     
-    def __init__(self, use_production_model: bool = False):
-        self.client = Claude4Client(use_production_model)
+    def __init__(
+        self,
+        use_production_model: bool = False,
+        use_cache: bool = False,
+        history_turns: Optional[int] = None,
+        prompt_caching: bool = False,
+        structured: bool = False,
+        static_analysis: bool = False,
+        max_cost: Optional[float] = None,
+        on_cost_limit: str = "halt",
+        adaptive: bool = False
+    ):
+        self.use_production_model = use_production_model
+        self.use_cache = use_cache
+        self.history_turns = history_turns
+        self.prompt_caching = prompt_caching
+        # Findings are reported through FINDINGS_TOOL instead of markdown text
+        self.structured = structured
+        # Local ast pass whose findings are reported directly and excluded from the prompts
+        self.static_analysis = static_analysis
+        self.static_findings: Dict[Path, List[Finding]] = {}
+        self.static_note = ""
+        # Triage findings handed to the escalated pass of a --cascade review
+        self.triage_note = ""
+        # Skip focus areas that cannot apply and stop once iterations stop finding new issues
+        self.adaptive = adaptive
+        self.yield_tracker: Optional[YieldTracker] = None
+        self.skipped_focus: Dict[int, str] = {}
+        self.stopped_after: Optional[int] = None
+        self.response_cache = (
+            ResponseCache(RESPONSE_CACHE_DIR, RESPONSE_CACHE_MAX_BYTES) if use_cache else None
+        )
+        # One scheduler per run so parallel and sharded requests share the rate limits
+        self.rate_limiter = RateLimiter()
+        # Likewise one meter, so max_cost (USD) bounds the whole run
+        self.cost_meter = CostMeter(max_cost, on_cost_limit)
+        # Set for the duration of run_iterative_review / resume_review
+        self.checkpoint: Optional[ReviewCheckpoint] = None
+        # Persistent per-codebase index, opened by select_files
+        self.symbol_index: Optional[SymbolIndex] = None
+        self.client = self._new_client()
         
     def run_iterative_review(
         self, 
         codebase_path: Path, 
         review_goals: str,
-        max_iterations: int = 5
+        max_iterations: int = 5,
+        parallel: bool = False,
+        max_workers: int = MAX_PARALLEL_REQUESTS,
+        incremental: bool = False,
+        token_budget: int = INPUT_TOKEN_BUDGET,
+        ranking: str = "risk",
+        stream: bool = False,
+        risk_tiers: bool = False,
+        cascade: bool = False
     ) -> Dict[str, Any]:
         """
         Run iterative review and generate both JSON and Markdown reports
+        
+        With parallel=True every focus area runs as an independent request
+        seeded with the same file context, at most max_workers at a time.
+        With incremental=True only files whose content changed since the
+        previous report (plus their direct importers) are re-reviewed and
+        findings for the other files are carried over.
+        Files are ranked (see context_packer.RANKING_STRATEGIES) and packed
+        whole or in boundary-aligned chunks until token_budget is used up.
+        With stream=True (sequential mode) responses are streamed and each
+        issue is printed as soon as its block is complete.
+        With risk_tiers=True only the highest-risk files get the focus areas
+        after the first RISK_SHALLOW_ITERATIONS (see _review_by_risk), and
+        with cascade=True only the files flagged during triage go on to
+        PRODUCTION_MODEL (see _review_by_cascade).
+        Every completed iteration is appended to a checkpoint in reports/,
+        which `resume_review` can pick up after a crash.
         """
-        print(f"🔍 ITERATIVE CODE REVIEW ({max_iterations} iterations)")
+        mode = f"parallel x{max_workers}" if parallel else "sequential"
+        print(f"🔍 ITERATIVE CODE REVIEW ({max_iterations} iterations, {mode})")
         print("=" * 50)
         print(f"📁 Path: {codebase_path}")
         print(f"🎯 Goals: {review_goals}")
@@ -45,102 +141,602 @@ class CleanIterativeReviewer:
         codebase_path = Path(codebase_path)
         start_time = datetime.now()
         
-        # Upload files for analysis
-        code_files = list(codebase_path.rglob("*.py"))[:10]
-        file_ids = []
+        all_files, plan = self.select_files(codebase_path, incremental)
+        self.checkpoint = ReviewCheckpoint.create(
+            REPORTS_DIR,
+            codebase_path=str(codebase_path),
+            review_goals=review_goals,
+            max_iterations=max_iterations,
+            parallel=parallel,
+            max_workers=max_workers,
+            use_production_model=self.use_production_model,
+            use_cache=self.use_cache,
+            history_turns=self.history_turns,
+            prompt_caching=self.prompt_caching,
+            structured=self.structured,
+            static_analysis=self.static_analysis,
+            max_cost=self.cost_meter.max_cost,
+            on_cost_limit=self.cost_meter.on_limit,
+            adaptive=self.adaptive,
+            token_budget=token_budget,
+            ranking=ranking,
+            risk_tiers=risk_tiers,
+            cascade=cascade,
+            plan=plan
+        )
+        print(f"💾 Checkpoint: {self.checkpoint.path}")
         
-        print(f"📤 Uploading {len(code_files)} files...")
-        for code_file in code_files:
-            try:
-                file_id = self.client.upload_file(code_file)
-                file_ids.append(file_id)
-                print(f"   ✓ {code_file.name}")
-            except Exception as e:
-                print(f"   ✗ Failed: {code_file.name} - {e}")
+        if cascade:
+            review_files = self._review_by_cascade
+        else:
+            review_files = self._review_by_risk if risk_tiers else self.review_files
+        review = review_files(
+            all_files, review_goals, max_iterations,
+            parallel, max_workers, token_budget, ranking, stream
+        )
+        return self._finish_review(codebase_path, review_goals, max_iterations, review, start_time, plan)
+    
+    def resume_review(self, checkpoint_path: Path, stream: bool = False) -> Dict[str, Any]:
+        """
+        Continue a checkpointed review from its first missing iteration
         
-        iterations_data = []
+        The file context is restored from the checkpoint (not re-read from
+        disk) and, in sequential mode, so is the conversation, so the model
+        sees exactly what it saw before the interruption. Risk-tier and
+        cascade runs then redo their deep or escalated pass.
+        """
+        checkpoint_path = Path(checkpoint_path)
+        state = ReviewCheckpoint.load(checkpoint_path)
+        settings, context = state["start"], state["context"]
         
-        # Run iterations
-        for i in range(1, max_iterations + 1):
-            focus_areas = {
-                1: "Security & Critical Bugs",
-                2: "Performance & Resources",
-                3: "Input Validation & Data Flow", 
-                4: "Error Handling & Edge Cases",
-                5: "Architecture & Design",
-                6: "Concurrency & Thread Safety",
-                7: "Configuration & Environment",
-                8: "Integration & API Security",
-                9: "Business Logic & Domain Rules",
-                10: "Comprehensive Risk Assessment"
-            }
-            
-            focus = focus_areas.get(i, f"Deep Analysis {i}")
-            print(f"\n=== ITERATION {i}: {focus} ===")
-            
-            if i == 1:
-                # Initial iteration
-                prompt = f"""
-                {get_iteration_prompt(i, max_iterations)}
-                
-                REVIEW GOALS: {review_goals}
-                
-                You are conducting ITERATION {i} of {max_iterations} for comprehensive code review.
-                
-                OUTPUT FORMAT - For each issue provide:
-                ## Issue: [Brief Title]
-                - **Type**: [Security/Performance/Bug/Code Quality]
-                - **Severity**: [Critical/High/Medium/Low]  
-                - **File**: [filename]
-                - **Location**: [line/function]
-                - **Description**: [detailed explanation]
-                - **Impact**: [what could go wrong]
-                - **Recommendation**: [what should be done]
-                
-                Focus on {focus.lower()}.
-                """
-                
-                message = self.client.create_analysis_message(prompt, file_ids)
+        if state["complete"]:
+            print(f"✅ Checkpoint already complete: {state['complete']['report']}")
+            return {"already_complete": state["complete"]["report"]}
+        
+        codebase_path = Path(settings["codebase_path"])
+        review_goals, max_iterations = settings["review_goals"], settings["max_iterations"]
+        done = [record["result"] for record in state["iterations"]]
+        
+        print(f"⏯️  RESUMING REVIEW ({len(done)}/{max_iterations} iterations done)")
+        print("=" * 50)
+        print(f"📁 Path: {codebase_path}")
+        print(f"💾 Checkpoint: {checkpoint_path}")
+        print()
+        
+        if context is None:
+            return {"error": "checkpoint has no file context; start a new review"}
+        
+        self.checkpoint = ReviewCheckpoint(checkpoint_path)
+        for result in done:
+            self.cost_meter.record(
+                result.get("model") or self.client.model,
+                result.get("prompt_tokens", 0), result.get("completion_tokens", 0),
+                result.get("cache_write_tokens", 0), result.get("cache_read_tokens", 0)
+            )
+        self.client.uploaded_files = dict(context["uploaded_files"])
+        for record in state["iterations"]:
+            self.client.session_context.extend(record.get("messages", []))
+        
+        packing = {
+            **context["packing"],
+            **{key: [Path(f) for f in context["packing"][key]]
+               for key in ("complete_files", "partial_files", "skipped_files")}
+        }
+        code_files = packing["complete_files"] + packing["partial_files"]
+        self.symbol_index = SymbolIndex.open(codebase_path)
+        if self.static_analysis:
+            self._run_static_analysis(self.symbol_index.files(), codebase_path)
+            self.static_note = self._static_note(code_files)
+        if self.adaptive:
+            self._start_adaptive(code_files, context["uploaded_files"].values())
+            for result in done:
+                self.yield_tracker.observe(result)
+        # Tiered runs checkpoint only the pass over every file; the follow-up pass runs afresh
+        if settings.get("cascade"):
+            last_iteration, follow_up = min(CASCADE_TRIAGE_ITERATIONS, max_iterations), self._cascade_escalation
+        elif settings.get("risk_tiers"):
+            last_iteration, follow_up = min(RISK_SHALLOW_ITERATIONS, max_iterations), self._risk_deep_pass
+        else:
+            last_iteration, follow_up = max_iterations, None
+        
+        file_ids = context["file_ids"]
+        if settings["parallel"]:
+            finished = {result["iteration"] for result in done}
+            remaining = [i for i in range(1, last_iteration + 1) if i not in finished]
+            iterations_data = sorted(
+                done + self._run_parallel_iterations(
+                    file_ids, review_goals, max_iterations, settings["max_workers"], remaining
+                ),
+                key=lambda result: result["iteration"]
+            )
+        else:
+            iterations_data = done + self._run_sequential_iterations(
+                file_ids, review_goals, max_iterations, stream,
+                first_iteration=max((result["iteration"] for result in done), default=0) + 1,
+                last_iteration=last_iteration
+            )
+        
+        review = {
+            "iterations": iterations_data,
+            "packing": packing,
+            "execution_mode": "parallel" if settings["parallel"] else "sequential"
+        }
+        if follow_up:
+            review = follow_up(
+                review, review_goals, max_iterations, settings["parallel"], settings["max_workers"],
+                settings.get("token_budget", INPUT_TOKEN_BUDGET), settings.get("ranking", "risk"), stream
+            )
+        start_time = datetime.fromisoformat(settings["started_at"])
+        return self._finish_review(codebase_path, review_goals, max_iterations, review, start_time, settings["plan"])
+    
+    def _finish_review(
+        self,
+        codebase_path: Path,
+        review_goals: str,
+        max_iterations: int,
+        review: Dict[str, Any],
+        start_time: datetime,
+        plan: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Build and save the report, then close the checkpoint if every iteration finished
+        """
+        review_results = self.build_report(
+            codebase_path, review_goals, max_iterations, review, start_time, plan
+        )
+        json_file, _ = self.save_reports(review_results)
+        
+        if self.checkpoint:
+            covered = (
+                {result["iteration"] for result in review["iterations"]}
+                | set(self.skipped_focus) | set(review.get("settled_iterations", []))
+            )
+            if self.stopped_after is not None or covered >= set(range(1, max_iterations + 1)):
+                self.checkpoint.append("complete", report=json_file.name)
             else:
-                # Continuation iterations
-                prompt = f"""
-                {get_iteration_prompt(i, max_iterations)}
-                
-                This is ITERATION {i} of {max_iterations}. 
-                Focus on: {focus}
-                
-                Continue finding NEW issues and generating review comments.
-                Use the same structured format as before.
-                """
-                
-                message = self.client.continue_autonomous_session(prompt)
-            
-            iteration_result = {
-                "iteration": i,
-                "focus": focus,
-                "timestamp": datetime.now().isoformat(),
-                "prompt_tokens": getattr(message.usage, 'input_tokens', 0) if hasattr(message, 'usage') else 0,
-                "completion_tokens": getattr(message.usage, 'output_tokens', 0) if hasattr(message, 'usage') else 0,
-                "response": str(message.content)
-            }
-            
-            print(f"✓ Completed - {len(str(message.content))} chars")
-            print(f"  Tokens: {iteration_result['prompt_tokens']} → {iteration_result['completion_tokens']}")
+                print(f"⏯️  Resume with: python clean_review.py resume {self.checkpoint.path}")
+            self.checkpoint = None
+        
+        return review_results
+    
+    def spawn(self, use_production_model: Optional[bool] = None) -> "CleanIterativeReviewer":
+        """
+        Fresh reviewer (own conversation) with the same model (unless
+        overridden) and shared cache
+        """
+        reviewer = CleanIterativeReviewer.__new__(CleanIterativeReviewer)
+        reviewer.use_production_model = (
+            self.use_production_model if use_production_model is None else use_production_model
+        )
+        reviewer.history_turns = self.history_turns
+        reviewer.prompt_caching = self.prompt_caching
+        reviewer.structured = self.structured
+        reviewer.static_analysis = self.static_analysis
+        reviewer.static_findings = self.static_findings
+        reviewer.static_note = ""
+        reviewer.triage_note = ""
+        reviewer.adaptive = self.adaptive
+        reviewer.yield_tracker = None
+        reviewer.skipped_focus = {}
+        reviewer.stopped_after = None
+        reviewer.response_cache = self.response_cache
+        reviewer.rate_limiter = self.rate_limiter
+        reviewer.cost_meter = self.cost_meter
+        reviewer.use_cache = self.use_cache
+        reviewer.checkpoint = None
+        reviewer.symbol_index = self.symbol_index
+        reviewer.client = reviewer._new_client()
+        return reviewer
+    
+    def _new_client(self) -> Claude4Client:
+        """
+        Claude4Client configured with this reviewer's model, cache and history settings
+        """
+        system_prompt = STRUCTURED_SYSTEM_PROMPT if self.structured else REVIEW_SYSTEM_PROMPT
+        return Claude4Client(
+            self.use_production_model,
+            self.response_cache,
+            self.history_turns,
+            prompt_caching=self.prompt_caching,
+            system_prompt=system_prompt if self.prompt_caching else None,
+            rate_limiter=self.rate_limiter,
+            output_tool=FINDINGS_TOOL if self.structured else None,
+            cost_meter=self.cost_meter
+        )
+    
+    def select_files(self, codebase_path: Path, incremental: bool):
+        """
+        Candidate files for this run, plus the incremental plan if enabled
+        """
+        self.symbol_index = SymbolIndex.open(codebase_path)
+        all_files = self.symbol_index.files()
+        plan = None
+        
+        # Every file, so unchanged files keep their static findings in incremental runs
+        if self.static_analysis:
+            self._run_static_analysis(all_files, codebase_path)
+        
+        if incremental:
+            plan = plan_incremental_review(
+                all_files, codebase_path, find_previous_report(REPORTS_DIR, codebase_path), self.symbol_index
+            )
+            to_review = set(plan["changed"]) | set(plan["importers"])
+            all_files = [f for f in all_files if relative_name(f, codebase_path) in to_review]
             
-            iterations_data.append(iteration_result)
+            print(f"♻️  Incremental: baseline {plan['previous_report'] or 'none'}")
+            print(f"   {len(plan['changed'])} changed, {len(plan['importers'])} importers, "
+                  f"{len(plan['carried_over'])} carried over")
         
-        # Calculate costs
-        total_input_tokens = sum(iter_data.get("prompt_tokens", 0) for iter_data in iterations_data)
-        total_output_tokens = sum(iter_data.get("completion_tokens", 0) for iter_data in iterations_data)
+        return all_files, plan
+    
+    def _run_static_analysis(self, files: List[Path], codebase_path: Path) -> None:
+        """Run the local ast analyzers over the candidate files"""
+        self.static_findings = analyze_files(files, codebase_path)
+        count = sum(len(found) for found in self.static_findings.values())
+        print(f"🔬 Static analysis: {count} findings in {len(self.static_findings)} files")
+    
+    def _start_adaptive(self, code_files: List[Path], contents) -> None:
+        """
+        Work out which focus areas to skip for the packed code and start
+        tracking new findings (unless a tracker is handed over, as in the deep pass)
+        """
+        self.skipped_focus = irrelevant_focus_areas(contents)
+        if self.yield_tracker is None:
+            codebase_path = self.symbol_index.codebase_path
+            self.yield_tracker = YieldTracker(
+                [relative_name(f, codebase_path) for f in code_files],
+                [finding for f in code_files for finding in self.static_findings.get(f, [])]
+            )
+    
+    def observe_yield(self, result: Dict[str, Any]) -> bool:
+        """
+        Record an iteration's new-finding count; True when the yield has dried up
+        """
+        if self.yield_tracker is None:
+            return False
+        result["novel_findings"] = self.yield_tracker.observe(result)
+        print(f"  New findings: {result['novel_findings']}")
+        return self.yield_tracker.exhausted
+    
+    def _triage_note(self, findings: List[Finding]) -> str:
+        """
+        Prompt section listing what triage flagged in the escalated files
+        """
+        lines = [
+            f"- {f.file}:{f.start_line or '?'} {f.location} - [{f.severity}] {f.title}"
+            for f in sorted(findings, key=lambda f: (severity_rank(f.severity), f.file, f.start_line or 0))
+        ]
+        if len(lines) > MAX_NOTE_LINES:
+            lines = lines[:MAX_NOTE_LINES] + [f"- ... and {len(lines) - MAX_NOTE_LINES} more"]
+        return (
+            "FLAGGED BY TRIAGE (a quick first pass over the whole codebase reported these; "
+            "check each in depth and look for related issues around them):\n" + "\n".join(lines)
+        )
+    
+    def adaptive_stats(self) -> Dict[str, Any]:
+        """New findings per iteration and the stop/skip decisions of this reviewer"""
+        if self.yield_tracker:
+            return self.yield_tracker.stats(self.stopped_after, self.skipped_focus)
+        return {"novel_findings": {}, "stopped_after": None, "skipped_focus_areas": self.skipped_focus}
+    
+    def _static_note(self, files: List[Path]) -> str:
+        """Prompt section listing the static findings for the files being sent"""
+        return coverage_note([finding for f in files for finding in self.static_findings.get(f, [])])
+    
+    def review_files(
+        self,
+        files: List[Path],
+        review_goals: str,
+        max_iterations: int,
+        parallel: bool,
+        max_workers: int,
+        token_budget: int,
+        ranking: str,
+        stream: bool = False,
+        first_iteration: int = 1,
+        last_iteration: Optional[int] = None,
+        line_ranges: Optional[Dict[Path, Tuple[int, int]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Pack and upload files (only the given line ranges of those in
+        line_ranges), then run iterations first_iteration..last_iteration
+        (default max_iterations) over them
+        """
+        last_iteration = last_iteration or max_iterations
+        packing, file_ids = self.pack_and_upload(files, token_budget, ranking, line_ranges)
         
-        if self.client.model == "claude-3-haiku-20240307":
-            input_cost = (total_input_tokens / 1_000_000) * 0.25
-            output_cost = (total_output_tokens / 1_000_000) * 1.25
+        if self.checkpoint:
+            self.checkpoint.append(
+                "context",
+                packing={
+                    key: [str(f) for f in packing[key]] if key.endswith("_files") else packing[key]
+                    for key in packing if key != "entries"
+                },
+                uploaded_files=self.client.uploaded_files,
+                file_ids=file_ids
+            )
+        
+        if not file_ids:
+            print("\n✅ No files need review")
+            iterations_data = []
+        elif parallel:
+            iterations_data = self._run_parallel_iterations(
+                file_ids, review_goals, max_iterations, max_workers,
+                list(range(first_iteration, last_iteration + 1))
+            )
         else:
-            input_cost = (total_input_tokens / 1_000_000) * 15.0
-            output_cost = (total_output_tokens / 1_000_000) * 75.0
+            iterations_data = self._run_sequential_iterations(
+                file_ids, review_goals, max_iterations, stream, first_iteration, last_iteration
+            )
+        
+        return {
+            "iterations": iterations_data,
+            "packing": packing,
+            "execution_mode": "parallel" if parallel else "sequential"
+        }
+    
+    def _review_by_risk(
+        self,
+        files: List[Path],
+        review_goals: str,
+        max_iterations: int,
+        parallel: bool,
+        max_workers: int,
+        token_budget: int,
+        ranking: str,
+        stream: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Review every file for the first RISK_SHALLOW_ITERATIONS focus areas,
+        then only the highest-risk RISK_DEEP_FRACTION of them for the rest
+        
+        The deep pass is a separate conversation with just those files
+        uploaded and is not checkpointed; resuming after a crash in it
+        starts the deep pass over (see _risk_deep_pass).
+        """
+        review = self.review_files(
+            files, review_goals, max_iterations, parallel, max_workers,
+            token_budget, ranking, stream, last_iteration=min(RISK_SHALLOW_ITERATIONS, max_iterations)
+        )
+        return self._risk_deep_pass(
+            review, review_goals, max_iterations, parallel, max_workers, token_budget, ranking, stream
+        )
+    
+    def _risk_deep_pass(
+        self,
+        review: Dict[str, Any],
+        review_goals: str,
+        max_iterations: int,
+        parallel: bool,
+        max_workers: int,
+        token_budget: int,
+        ranking: str,
+        stream: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Given the shallow review of every file, run the remaining focus
+        areas over the highest-risk files and merge them into the review
+        """
+        shallow = min(RISK_SHALLOW_ITERATIONS, max_iterations)
+        packing = review["packing"]
+        code_files = packing["complete_files"] + packing["partial_files"]
+        scores = {Path(path): values for path, values in packing["risk_scores"].items()}
+        if not scores:
+            scores = score_files({f: f.read_text(encoding='utf-8', errors='ignore') for f in code_files})
+        deep_files, _ = split_by_risk(scores, code_files, RISK_DEEP_FRACTION)
+        review["risk_tiers"] = {
+            "shallow_iterations": shallow,
+            "deep_files": [str(f) for f in deep_files],
+            "scores": {str(f): scores[f]["score"] for f in code_files if f in scores}
+        }
+        
+        if shallow >= max_iterations or not deep_files or self._deep_pass_blocked(shallow):
+            return review
+        
+        print(f"\n🎯 Deep pass: iterations {shallow + 1}-{max_iterations} on the {len(deep_files)} highest-risk files")
+        for file_path in deep_files:
+            print(f"   {file_path.name} (risk {scores[file_path]['score']:.2f})")
+        deep = self._deep_pass(
+            self.spawn(), deep_files, review_goals, max_iterations, parallel, max_workers,
+            token_budget, ranking, stream, first_iteration=shallow + 1
+        )
+        for iteration in deep:
+            iteration["risk_tier"] = "deep"
+        review["iterations"] = sorted(review["iterations"] + deep, key=lambda r: r["iteration"])
+        return review
+    
+    def _review_by_cascade(
+        self,
+        files: List[Path],
+        review_goals: str,
+        max_iterations: int,
+        parallel: bool,
+        max_workers: int,
+        token_budget: int,
+        ranking: str,
+        stream: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Triage every file for the first CASCADE_TRIAGE_ITERATIONS focus areas
+        on this reviewer's model (DEVELOPMENT_MODEL from the CLI), then run the
+        rest on PRODUCTION_MODEL over only the files with findings at or above
+        CASCADE_ESCALATE_SEVERITY, with those findings in the prompt
+        
+        Like the risk-tier deep pass, the escalated pass is a separate,
+        uncheckpointed conversation (see _cascade_escalation).
+        """
+        review = self.review_files(
+            files, review_goals, max_iterations, parallel, max_workers,
+            token_budget, ranking, stream, last_iteration=min(CASCADE_TRIAGE_ITERATIONS, max_iterations)
+        )
+        return self._cascade_escalation(
+            review, review_goals, max_iterations, parallel, max_workers, token_budget, ranking, stream
+        )
+    
+    def _cascade_escalation(
+        self,
+        review: Dict[str, Any],
+        review_goals: str,
+        max_iterations: int,
+        parallel: bool,
+        max_workers: int,
+        token_budget: int,
+        ranking: str,
+        stream: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Given the triage review of every file, escalate the flagged files
+        to PRODUCTION_MODEL for the remaining focus areas and merge them
+        into the review
+        """
+        triage = min(CASCADE_TRIAGE_ITERATIONS, max_iterations)
+        packing = review["packing"]
+        code_files = packing["complete_files"] + packing["partial_files"]
+        by_rel_path = {relative_name(f, self.symbol_index.codebase_path): f for f in code_files}
+        triaged = FindingsStore(
+            FindingsStore.from_iterations(review["iterations"], list(by_rel_path)).findings
+            + [finding for f in code_files for finding in self.static_findings.get(f, [])]
+        )
+        flagged = [f for f in triaged.at_least(CASCADE_ESCALATE_SEVERITY) if f.file in by_rel_path]
+        flagged_paths = {f.file for f in flagged}
+        escalated = [path for rel_path, path in by_rel_path.items() if rel_path in flagged_paths]
+        review["cascade"] = {
+            "triage_model": self.client.model,
+            "escalation_model": PRODUCTION_MODEL,
+            "triage_iterations": triage,
+            "escalate_severity": CASCADE_ESCALATE_SEVERITY,
+            "triage_files": len(code_files),
+            "escalated_files": [str(f) for f in escalated],
+            "flagged_findings": len(flagged)
+        }
+        
+        if triage >= max_iterations:
+            return review
+        if not escalated:
+            print(f"\n✅ Triage flagged nothing at {CASCADE_ESCALATE_SEVERITY} or above; no escalation")
+            # The cascade is done: the escalated focus areas are not needed, not missing
+            review["settled_iterations"] = list(range(triage + 1, max_iterations + 1))
+            return review
+        if self._deep_pass_blocked(triage):
+            return review
+        
+        print(f"\n🪜 Escalating {len(escalated)} of {len(code_files)} files to {PRODUCTION_MODEL}: "
+              f"iterations {triage + 1}-{max_iterations}")
+        for file_path in escalated:
+            print(f"   {file_path.name}")
+        escalation_reviewer = self.spawn(use_production_model=True)
+        escalation_reviewer.triage_note = self._triage_note(flagged)
+        escalation = self._deep_pass(
+            escalation_reviewer, escalated, review_goals, max_iterations, parallel, max_workers,
+            token_budget, ranking, stream, first_iteration=triage + 1
+        )
+        for iteration in escalation:
+            iteration["cascade"] = "escalated"
+        review["iterations"] = sorted(review["iterations"] + escalation, key=lambda r: r["iteration"])
+        return review
+    
+    def _deep_pass_blocked(self, done_iterations: int) -> bool:
+        """
+        Whether an adaptive stop or the cost limit rules out a follow-up pass
+        """
+        if self.yield_tracker and self.yield_tracker.exhausted:
+            self.stopped_after = done_iterations
+            print(f"\n🛑 Adaptive stop: the first {done_iterations} iterations found few new issues; skipping the deep pass")
+            return True
+        if self.cost_meter.halted:
+            print(f"\n💸 Cost limit ${self.cost_meter.max_cost:.4f} reached; skipping the deep pass")
+            return True
+        return False
+    
+    def _deep_pass(
+        self,
+        reviewer: "CleanIterativeReviewer",
+        files: List[Path],
+        review_goals: str,
+        max_iterations: int,
+        parallel: bool,
+        max_workers: int,
+        token_budget: int,
+        ranking: str,
+        stream: bool,
+        first_iteration: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Focus areas first_iteration onwards over a subset of files in the
+        spawned reviewer's own conversation; returns its iteration results
+        """
+        reviewer.yield_tracker = self.yield_tracker
+        deep = reviewer.review_files(
+            files, review_goals, max_iterations, parallel, max_workers,
+            token_budget, ranking, stream, first_iteration=first_iteration
+        )
+        self.skipped_focus.update(
+            (i, reason) for i, reason in reviewer.skipped_focus.items() if i >= first_iteration
+        )
+        self.stopped_after = reviewer.stopped_after
+        return deep["iterations"]
+    
+    def pack_and_upload(
+        self,
+        files: List[Path],
+        token_budget: int,
+        ranking: str,
+        line_ranges: Optional[Dict[Path, Tuple[int, int]]] = None
+    ):
+        """
+        Pack files under the input-token budget and upload the entries;
+        returns the packing summary and the uploaded file ids
+        """
+        packing = pack_files(
+            files, token_budget, min(CONTEXT_CHUNK_TOKENS, token_budget), ranking,
+            self.symbol_index, self.symbol_index.codebase_path, line_ranges
+        )
+        code_files = packing["complete_files"] + packing["partial_files"]
+        file_ids = []
+        if self.static_analysis:
+            self.static_note = self._static_note(code_files)
+        if self.adaptive:
+            self._start_adaptive(code_files, [entry["content"] for entry in packing["entries"]])
         
-        total_cost = input_cost + output_cost
+        print(f"📤 Uploading {len(packing['entries'])} items from {len(code_files)} files "
+              f"(~{packing['used_tokens']:,}/{token_budget:,} tokens, ranked by {ranking})...")
+        for entry in packing["entries"]:
+            file_ids.append(self.client.upload_content(entry["label"], entry["content"]))
+            print(f"   ✓ {entry['label']} (~{entry['tokens']:,} tokens)")
+        for skipped_file in packing["skipped_files"]:
+            print(f"   ⏭️  Over budget: {skipped_file.name}")
+        
+        return packing, file_ids
+    
+    def build_report(
+        self,
+        codebase_path: Path,
+        review_goals: str,
+        max_iterations: int,
+        review: Dict[str, Any],
+        start_time: datetime,
+        plan: Dict[str, Any] = None
+    ) -> Dict[str, Any]:
+        """
+        Assemble the JSON report from the iteration results
+        """
+        iterations_data = review["iterations"]
+        packing = review["packing"]
+        code_files = packing["complete_files"] + packing["partial_files"]
+        
+        # Calculate costs
+        total_input_tokens = sum(iter_data.get("prompt_tokens", 0) for iter_data in iterations_data)
+        total_output_tokens = sum(iter_data.get("completion_tokens", 0) for iter_data in iterations_data)
+        total_cache_write = sum(iter_data.get("cache_write_tokens", 0) for iter_data in iterations_data)
+        total_cache_read = sum(iter_data.get("cache_read_tokens", 0) for iter_data in iterations_data)
+        total_cost = sum(
+            estimate_cost(
+                iter_data.get("model") or self.client.model,
+                iter_data.get("prompt_tokens", 0), iter_data.get("completion_tokens", 0),
+                iter_data.get("cache_write_tokens", 0), iter_data.get("cache_read_tokens", 0)
+            )
+            for iter_data in iterations_data
+        )
         
         # Combine all analysis
         all_analysis = "\n\n".join([
@@ -148,12 +744,43 @@ class CleanIterativeReviewer:
             for iter_data in iterations_data
         ])
         
+        # Per-file hashes and findings make the next run incremental-capable
+        reviewed = [relative_name(f, codebase_path) for f in code_files]
+        file_hashes = compute_file_hashes(self._fully_reviewed(review, max_iterations), codebase_path, self.symbol_index)
+        findings_by_file = attribute_findings(iterations_data, reviewed)
+        store = FindingsStore.from_iterations(iterations_data, reviewed)
+        
+        if plan:
+            file_hashes.update(plan["carried_hashes"])
+            for rel_path, blocks in plan["carried_over"].items():
+                findings_by_file[rel_path] = blocks
+                # Carried-over findings keep iteration 0
+                for block in blocks:
+                    finding = parse_issue_block(block, 0, {Path(rel_path).name: rel_path})
+                    if finding:
+                        store.add(finding)
+            carried = format_carried_findings(plan["carried_over"], plan["previous_report"])
+            if carried:
+                all_analysis = f"{all_analysis}\n\n{carried}" if all_analysis else carried
+        
+        # Static findings cover every candidate file, including carried-over ones
+        static_count = 0
+        for static_findings in self.static_findings.values():
+            for finding in static_findings:
+                store.add(finding)
+                static_count += 1
+        
+        # Overlapping focus areas report the same issue more than once
+        deduped, dedup_stats = dedupe_findings(store.findings)
+        store = FindingsStore(deduped)
+        
         review_results = {
             "review_type": "iterative_focused",
             "timestamp": datetime.now().isoformat(),
             "codebase_path": str(codebase_path),
             "review_goals": review_goals,
             "max_iterations": max_iterations,
+            "execution_mode": review["execution_mode"],
             "actual_iterations": len(iterations_data),
             "files_analyzed": [str(f) for f in code_files],
             "model_used": self.client.model,
@@ -161,14 +788,126 @@ class CleanIterativeReviewer:
             "comprehensive_analysis": all_analysis,
             "tokens_used": {
                 "total_input": total_input_tokens,
-                "total_output": total_output_tokens
+                "total_output": total_output_tokens,
+                "total_cache_write": total_cache_write,
+                "total_cache_read": total_cache_read
             },
             "cost_estimate": total_cost,
-            "duration": str(datetime.now() - start_time)
+            "duration": str(datetime.now() - start_time),
+            "file_hashes": file_hashes,
+            "findings_by_file": findings_by_file,
+            "findings": store.to_list(),
+            "findings_summary": store.summary(),
+            "deduplication": dedup_stats,
+            "context_packing": {
+                "strategy": packing["strategy"],
+                "token_budget": packing["token_budget"],
+                "used_tokens": packing["used_tokens"],
+                "partial_files": [str(f) for f in packing["partial_files"]],
+                "skipped_files": [str(f) for f in packing["skipped_files"]]
+            }
+        }
+        
+        if plan:
+            review_results["incremental"] = {
+                "previous_report": plan["previous_report"],
+                "changed_files": plan["changed"],
+                "importer_files": plan["importers"],
+                "carried_over_files": sorted(plan["carried_over"])
+            }
+        
+        if packing.get("risk_scores"):
+            review_results["context_packing"]["risk_scores"] = {
+                relative_name(Path(path), codebase_path): values for path, values in packing["risk_scores"].items()
+            }
+        
+        if review.get("risk_tiers"):
+            tiers = review["risk_tiers"]
+            review_results["risk_tiers"] = {
+                "shallow_iterations": tiers["shallow_iterations"],
+                "deep_files": [relative_name(Path(f), codebase_path) for f in tiers["deep_files"]],
+                "scores": {relative_name(Path(f), codebase_path): score for f, score in tiers["scores"].items()}
+            }
+        
+        if review.get("cascade"):
+            review_results["cascade"] = {
+                **review["cascade"],
+                "escalated_files": [relative_name(Path(f), codebase_path) for f in review["cascade"]["escalated_files"]]
+            }
+        
+        if self.cost_meter.by_model or self.cost_meter.max_cost is not None:
+            review_results["cost_meter"] = {
+                **self.cost_meter.stats(),
+                "iterations_skipped": max_iterations - len(iterations_data)
+            }
+        
+        if self.adaptive:
+            # Sharded reviews bring their merged per-shard stats
+            review_results["adaptive"] = review.get("adaptive") or self.adaptive_stats()
+        
+        if self.static_analysis:
+            review_results["static_analysis"] = {
+                "findings": static_count,
+                "files": sorted(relative_name(f, codebase_path) for f in self.static_findings)
+            }
+        
+        if self.history_turns is not None:
+            review_results["history_policy"] = {
+                "keep_turns": self.history_turns,
+                "estimated_tokens_saved": sum(
+                    iter_data.get("history", {}).get("saved_tokens", 0) for iter_data in iterations_data
+                )
+            }
+        
+        if self.response_cache:
+            review_results["response_cache"] = self.response_cache.stats()
+        
+        review_results["rate_limiting"] = self.rate_limiter.stats()
+        
+        return review_results
+    
+    def _fully_reviewed(self, review: Dict[str, Any], max_iterations: int) -> List[Path]:
+        """
+        Complete files that every focus area covered (or that adaptive mode
+        skipped as not applicable)
+        
+        Only these get hashes in the report, so the next incremental run
+        reviews the rest again instead of carrying over an incomplete set
+        of findings (cost-limited or adaptively stopped runs, and the files
+        a risk-tier deep pass or cascade escalation did not include).
+        """
+        everything = set(range(1, max_iterations + 1))
+        complete = review["packing"]["complete_files"]
+        follow_up = {
+            Path(f) for f in review.get("risk_tiers", {}).get("deep_files", [])
+            + review.get("cascade", {}).get("escalated_files", [])
+        }
+        # Sharded reviews cover each shard separately; the rest are one shard
+        shards = review.get("shards") or {None: {"files": complete, "skipped_focus": list(self.skipped_focus)}}
+        covered = {
+            (file_path, index): set(shard["skipped_focus"])
+            for index, shard in shards.items() for file_path in shard["files"]
         }
+        for result in review["iterations"]:
+            index = result.get("shard")
+            tiered = result.get("risk_tier") == "deep" or result.get("cascade") == "escalated"
+            for file_path in shards[index]["files"]:
+                if not tiered or file_path in follow_up:
+                    covered[(file_path, index)].add(result["iteration"])
         
+        incomplete = {file_path for (file_path, _), iterations in covered.items() if not iterations >= everything}
+        return [f for f in complete if f not in incomplete]
+    
+    def save_reports(self, review_results: Dict[str, Any]):
+        """
+        Write JSON + Markdown reports and print the run summary
+        """
         # Save reports - BOTH JSON AND MARKDOWN IN REPORTS FOLDER
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        # Several reports can finish within the same second (batch mode)
+        base, suffix = timestamp, 2
+        while (REPORTS_DIR / f"review_{timestamp}.json").exists():
+            timestamp, suffix = f"{base}_{suffix}", suffix + 1
         
         # JSON Report (for processing)
         json_file = REPORTS_DIR / f"review_{timestamp}.json"
@@ -183,14 +922,221 @@ class CleanIterativeReviewer:
         
         print(f"\n✅ ITERATIVE REVIEW COMPLETED!")
         print(f"📊 Summary:")
-        print(f"   - Iterations: {len(iterations_data)}/{max_iterations}")
-        print(f"   - Files: {len(code_files)}")
-        print(f"   - Cost: ${total_cost:.4f}")
+        print(f"   - Iterations: {review_results['actual_iterations']}/{review_results['max_iterations']}")
+        print(f"   - Files: {len(review_results['files_analyzed'])}")
+        print(f"   - Cost: ${review_results['cost_estimate']:.4f}")
+        if self.response_cache:
+            cache_stats = review_results["response_cache"]
+            print(f"   - Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+        if review_results["rate_limiting"]["retries"]:
+            print(f"   - Retries: {review_results['rate_limiting']['retries']} "
+                  f"({review_results['rate_limiting']['throttled_seconds']}s backed off)")
         print(f"   - Duration: {review_results['duration']}")
         print(f"   - JSON: {json_file}")
         print(f"   - Markdown: {markdown_file}")
         
-        return review_results
+        return json_file, markdown_file
+    
+    def _run_sequential_iterations(
+        self,
+        file_ids: List[str],
+        review_goals: str,
+        max_iterations: int,
+        stream: bool = False,
+        first_iteration: int = 1,
+        last_iteration: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Run iterations one after another in a single conversation
+        
+        first_iteration > 1 continues an existing conversation (resume), or
+        opens a new one if there is none yet (risk-tier deep pass).
+        """
+        iterations_data = []
+        
+        last_iteration = last_iteration or max_iterations
+        for i in range(first_iteration, last_iteration + 1):
+            focus = get_focus_area(i)
+            if i in self.skipped_focus:
+                print(f"\n⏭️  ITERATION {i}: {focus} skipped - {self.skipped_focus[i]}")
+                continue
+            print(f"\n=== ITERATION {i}: {focus} ===")
+            
+            parser, on_text = self._live_stream() if stream else (None, None)
+            
+            try:
+                if not self.client.session_context:
+                    # Initial iteration
+                    prompt = self.build_initial_prompt(i, max_iterations, review_goals, focus)
+                    message = self.client.create_analysis_message(prompt, file_ids, on_text)
+                else:
+                    # Continuation iterations
+                    prompt = self.build_continuation_prompt(i, max_iterations, focus)
+                    message = self.client.continue_autonomous_session(prompt, on_text)
+            except anthropic.APIError as e:
+                # Retries are exhausted; keep the completed iterations for the report
+                print(f"\n✗ Iteration {i} failed - {e}")
+                break
+            except CostLimitExceeded as e:
+                print(f"\n💸 Stopping before iteration {i}: {e}")
+                break
+            
+            iteration_result = self.build_iteration_result(i, focus, message)
+            
+            if parser:
+                parser.finish()
+                print("\r".ljust(PROGRESS_WIDTH), end="\r")
+                iteration_result["streamed_issues"] = len(parser.issues)
+                iteration_result["first_issue_seconds"] = parser.first_issue_seconds
+            
+            if i > 1 and self.client.last_history_stats:
+                iteration_result["history"] = self.client.last_history_stats
+            
+            print(f"✓ Completed - {len(iteration_result['response'])} chars")
+            print(f"  Tokens: {iteration_result['prompt_tokens']} → {iteration_result['completion_tokens']}")
+            print(f"  {self._spend_line()}")
+            if iteration_result.get("history", {}).get("saved_tokens"):
+                print(f"  History: ~{iteration_result['history']['saved_tokens']:,} tokens saved by compaction")
+            exhausted = self.observe_yield(iteration_result)
+            
+            iterations_data.append(iteration_result)
+            if self.checkpoint:
+                self.checkpoint.append(
+                    "iteration", result=iteration_result, messages=self.client.session_context[-2:]
+                )
+            
+            if exhausted and i < last_iteration:
+                self.stopped_after = i
+                print(f"\n🛑 Adaptive stop: fewer than {self.yield_tracker.min_new_findings} new findings "
+                      f"in the last {self.yield_tracker.patience} iteration(s)")
+                break
+        
+        return iterations_data
+    
+    def _live_stream(self):
+        """
+        Stream parser plus text callback that show a running character count
+        and print each issue the moment its block is complete
+        """
+        parser = IssueStreamParser(
+            lambda block: print(f"\r  🔎 {summarize_issue(block)}".ljust(PROGRESS_WIDTH))
+        )
+        
+        def on_text(delta: str) -> None:
+            parser.feed(delta)
+            print(f"\r  ⏳ {len(parser.text):,} chars streamed", end="", flush=True)
+        
+        return parser, on_text
+    
+    def _run_parallel_iterations(
+        self,
+        file_ids: List[str],
+        review_goals: str,
+        max_iterations: int,
+        max_workers: int,
+        iterations: Optional[List[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Fan focus areas out over a bounded thread pool, each as an independent
+        request with the same file context, and return results in iteration order
+        
+        iterations restricts the run to those iteration numbers (resume).
+        """
+        iterations = iterations if iterations is not None else list(range(1, max_iterations + 1))
+        for i in iterations:
+            if i in self.skipped_focus:
+                print(f"⏭️  ITERATION {i}: {get_focus_area(i)} skipped - {self.skipped_focus[i]}")
+        iterations = [i for i in iterations if i not in self.skipped_focus]
+        max_workers = max(1, min(max_workers, len(iterations) or 1))
+        results: Dict[int, Dict[str, Any]] = {}
+        
+        def run_one(i: int) -> Dict[str, Any]:
+            focus = get_focus_area(i)
+            prompt = self.build_initial_prompt(i, max_iterations, review_goals, focus)
+            message = self.client.create_independent_message(prompt, file_ids)
+            return self.build_iteration_result(i, focus, message)
+        
+        print(f"\n🚀 Dispatching {len(iterations)} focus areas ({max_workers} concurrent)")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(run_one, i): i for i in iterations}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    iteration_result = future.result()
+                except Exception as e:
+                    print(f"✗ ITERATION {i}: {get_focus_area(i)} failed - {e}")
+                    continue
+                results[i] = iteration_result
+                if self.checkpoint:
+                    self.checkpoint.append("iteration", result=iteration_result)
+                print(f"✓ ITERATION {i}: {iteration_result['focus']} - {len(iteration_result['response'])} chars")
+                print(f"  Tokens: {iteration_result['prompt_tokens']} → {iteration_result['completion_tokens']}")
+                print(f"  {self._spend_line()}")
+        
+        return [results[i] for i in sorted(results)]
+    
+    def _spend_line(self) -> str:
+        """Running spend of the run, against the limit if there is one"""
+        meter = self.cost_meter
+        limit = f" of ${meter.max_cost:.4f}" if meter.max_cost is not None else ""
+        return f"Spend: ${meter.spent:.4f}{limit}"
+    
+    def build_initial_prompt(
+        self,
+        iteration: int,
+        max_iterations: int,
+        review_goals: str,
+        focus: str
+    ) -> str:
+        """Prompt that carries goals and output format (first or standalone iteration)"""
+        # With prompt caching the format lives in the cached system prompt
+        if self.client.system_prompt:
+            output_format = ""
+        else:
+            output_format = STRUCTURED_OUTPUT_FORMAT if self.structured else OUTPUT_FORMAT
+        return f"""
+                {get_iteration_prompt(iteration, max_iterations)}
+                
+                REVIEW GOALS: {review_goals}
+                
+                You are conducting ITERATION {iteration} of {max_iterations} for comprehensive code review.
+                {output_format}
+                {self.static_note}
+                {self.triage_note}
+                Focus on {focus.lower()}.
+                """
+    
+    def build_continuation_prompt(self, iteration: int, max_iterations: int, focus: str) -> str:
+        """Prompt for follow-up iterations in the same conversation"""
+        return f"""
+                {get_iteration_prompt(iteration, max_iterations)}
+                
+                This is ITERATION {iteration} of {max_iterations}. 
+                Focus on: {focus}
+                
+                Continue finding NEW issues and generating review comments.
+                Use the same structured format as before.
+                """
+    
+    def build_iteration_result(self, iteration: int, focus: str, message) -> Dict[str, Any]:
+        """Per-iteration record stored in iterations_detail"""
+        records = tool_findings(message.content)
+        result = {
+            "iteration": iteration,
+            "focus": focus,
+            "timestamp": datetime.now().isoformat(),
+            # Differs from the client's model when the cost meter downgraded the call
+            "model": getattr(message, "model", None) or self.client.model,
+            "prompt_tokens": getattr(message.usage, 'input_tokens', 0) if hasattr(message, 'usage') else 0,
+            "completion_tokens": getattr(message.usage, 'output_tokens', 0) if hasattr(message, 'usage') else 0,
+            "cache_write_tokens": getattr(message.usage, 'cache_creation_input_tokens', 0) or 0,
+            "cache_read_tokens": getattr(message.usage, 'cache_read_input_tokens', 0) or 0,
+            # Structured findings are also rendered as text for the report and history
+            "response": render_records(records) if records is not None else message_text(message)
+        }
+        if records is not None:
+            result["structured_findings"] = records
+        return result
     
     def _generate_markdown(self, results: Dict[str, Any]) -> str:
         """Generate markdown content"""
@@ -221,6 +1167,68 @@ class CleanIterativeReviewer:
         for i, file_path in enumerate(results['files_analyzed'], 1):
             lines.append(f"{i}. `{Path(file_path).name}`")
         
+        dedup = results.get('deduplication')
+        if dedup and dedup['duplicates_merged']:
+            lines.extend([
+                "",
+                f"🧹 **De-duplicated:** {dedup['findings_before']} findings → {dedup['findings_after']} "
+                f"({dedup['duplicates_merged']} reported by more than one iteration)"
+            ])
+        
+        incremental = results.get('incremental')
+        if incremental:
+            lines.extend([
+                "",
+                f"♻️ **Incremental run** against `{incremental['previous_report'] or 'no baseline'}`: "
+                f"{len(incremental['changed_files'])} changed, {len(incremental['importer_files'])} importers, "
+                f"{len(incremental['carried_over_files'])} files with carried-over findings"
+            ])
+        
+        cascade = results.get('cascade')
+        if cascade:
+            lines.extend([
+                "",
+                f"🪜 **Cascade:** {cascade['triage_iterations']} triage iterations on {cascade['triage_model']}; "
+                f"{len(cascade['escalated_files'])} of {cascade['triage_files']} files "
+                f"({cascade['flagged_findings']} {cascade['escalate_severity']}+ findings) escalated to {cascade['escalation_model']}"
+            ])
+        
+        adaptive = results.get('adaptive')
+        if adaptive and (adaptive['stopped_after'] or adaptive['skipped_focus_areas']):
+            notes = []
+            if adaptive['stopped_after']:
+                notes.append(f"stopped after iteration {adaptive['stopped_after']} (new findings dried up)")
+            for number, reason in sorted(adaptive['skipped_focus_areas'].items(), key=lambda item: int(item[0])):
+                notes.append(f"skipped {get_focus_area(int(number))} ({reason})")
+            lines.extend(["", "🛑 **Adaptive:** " + "; ".join(notes)])
+        
+        meter = results.get('cost_meter')
+        if meter and (meter['downgraded_calls'] or meter['refused_calls']):
+            lines.extend([
+                "",
+                f"💸 **Cost limit** ${meter['max_cost']:.4f}: {meter['downgraded_calls']} calls downgraded, "
+                f"{meter['refused_calls']} refused, {meter['iterations_skipped']} iterations skipped"
+            ])
+        
+        findings = FindingsStore.from_list(results.get('findings', []))
+        if findings:
+            lines.extend([
+                "",
+                "## 🚨 Findings by Severity",
+                ""
+            ])
+            for severity in sorted(findings.by_severity, key=severity_rank):
+                lines.append(f"### {severity} ({len(findings.by_severity[severity])})")
+                lines.append("")
+                for finding in findings.by_severity[severity]:
+                    where = ", ".join(v for v in (f"`{finding.file}`" if finding.file else "", finding.location) if v)
+                    seen_in = (f" _(iterations {', '.join(map(str, finding.iterations))})_"
+                               if len(finding.iterations) > 1 else "")
+                    if finding.source == "static":
+                        seen_in += " _(static analysis)_"
+                    lines.append(f"- **{finding.title}** ({finding.type})" + (f" - {where}" if where else "") + seen_in)
+                lines.append("")
+        
         lines.extend([
             "",
             "## 🔄 Iteration Summary",
@@ -233,13 +1241,23 @@ class CleanIterativeReviewer:
             focus = iteration['focus']
             tokens_in = iteration.get('prompt_tokens', 0)
             tokens_out = iteration.get('completion_tokens', 0)
+            saved = iteration.get('history', {}).get('saved_tokens', 0)
+            cache_read = iteration.get('cache_read_tokens', 0)
+            cache_write = iteration.get('cache_write_tokens', 0)
             
             emoji = self._get_emoji(focus)
+            shard = f" (shard {iteration['shard']})" if 'shard' in iteration else ""
+            if iteration.get('risk_tier') == 'deep':
+                shard += " (highest-risk files)"
+            if iteration.get('cascade') == 'escalated':
+                shard += f" (escalated to {iteration.get('model', PRODUCTION_MODEL)})"
             
             lines.extend([
-                f"### {emoji} Iteration {iter_num}: {focus}",
+                f"### {emoji} Iteration {iter_num}: {focus}{shard}",
                 "",
-                f"**Tokens:** {tokens_in:,} input → {tokens_out:,} output",
+                f"**Tokens:** {tokens_in:,} input → {tokens_out:,} output"
+                + (f" (~{saved:,} saved by history compaction)" if saved else "")
+                + (f" | prompt cache: {cache_read:,} read, {cache_write:,} written" if cache_read or cache_write else ""),
                 "",
                 "<details>",
                 f"<summary>View detailed findings from Iteration {iter_num}</summary>",
@@ -283,9 +1301,18 @@ class CleanIterativeReviewer:
         else: return "📝"
 
 
-def human_review_and_apply_fixes(json_file: Path = None) -> Dict[str, Any]:
+def human_review_and_apply_fixes(
+    json_file: Path = None,
+    fix_mode: str = "full",
+    cost_meter: Optional[CostMeter] = None
+) -> Dict[str, Any]:
     """
     Human review of results and optional fix application
+    
+    fix_mode "full" asks for complete fixed files, one request per affected
+    file; "targeted" asks for one function-scoped patch per affected region.
+    Both run their requests in parallel. Passing the review's cost_meter
+    (as `complete` does) keeps fix generation under the same --max-cost.
     """
     print(f"\n👤 HUMAN REVIEW & APPLY FIXES")
     print("=" * 50)
@@ -310,11 +1337,17 @@ def human_review_and_apply_fixes(json_file: Path = None) -> Dict[str, Any]:
     print(f"💰 Cost: ${results['cost_estimate']:.4f}")
     print()
     
-    # Show analysis preview
+    # Show findings (older reports only have the raw analysis text)
     analysis = results['comprehensive_analysis']
+    store = FindingsStore.from_list(results['findings']) if 'findings' in results else None
     print("📝 REVIEW FINDINGS PREVIEW:")
     print("-" * 30)
-    if len(analysis) > 1000:
+    if store is not None:
+        for severity in sorted(store.by_severity, key=severity_rank):
+            print(f"{severity}: {len(store.by_severity[severity])}")
+            for finding in store.by_severity[severity][:5]:
+                print(f"   - {finding.title} ({finding.file or '?'}, {finding.location or '?'})")
+    elif len(analysis) > 1000:
         print(analysis[:1000])
         print(f"... ({len(analysis) - 1000} more characters)")
     else:
@@ -339,9 +1372,80 @@ def human_review_and_apply_fixes(json_file: Path = None) -> Dict[str, Any]:
         print("Review complete - no fixes will be generated.")
         return {"approved": False, "decisions": decisions}
     
+    # Send only the structured findings at or above the chosen priority
+    if store is not None:
+        priority = decisions['priority_focus'].strip().capitalize()
+        selected = store.at_least(priority) if priority in SEVERITY_ORDER else store.findings
+        analysis = "\n\n".join(finding.to_block() for finding in selected)
+        print(f"\n📌 {len(selected)} of {len(store)} findings selected for fixing")
+    
+    if fix_mode == "targeted":
+        if store is not None:
+            return _apply_targeted_fixes(json_file, results, decisions, selected, cost_meter)
+        print("⚠️  Targeted fixes need structured findings; this report predates them, using full mode")
+    
     # Generate fixes
     print(f"\n🔧 GENERATING FIXES...")
     
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    fix_file = REPORTS_DIR / f"fixes_{timestamp}.json"
+    
+    if store is not None:
+        # One request per affected file, each with that file's source
+        from file_fixes import generate_file_fixes
+        
+        generated = generate_file_fixes(
+            selected, Path(results['codebase_path']), decisions, cost_meter=cost_meter
+        )
+        fix_results = {
+            "original_review": json_file.name,
+            "human_decisions": decisions,
+            "timestamp": datetime.now().isoformat(),
+            "fix_mode": "per_file",
+            "cost_estimate": estimate_cost(generated["model"], generated["input_tokens"], generated["output_tokens"]),
+            "applied_fixes": generated
+        }
+    else:
+        fix_results = _generate_single_request_fixes(json_file, decisions, analysis, cost_meter)
+    
+    with open(fix_file, 'w', encoding='utf-8') as f:
+        json.dump(fix_results, f, indent=2, ensure_ascii=False)
+    
+    print(f"✅ FIXES GENERATED!")
+    print(f"📄 Fixes saved: {fix_file}")
+    
+    # Ask about applying to files
+    apply_to_files = input("\nApply fixes to actual source files? (y/n): ").strip().lower() == 'y'
+    
+    if apply_to_files:
+        from simple_file_editor import apply_fixes_to_files
+        
+        codebase_path = Path(results['codebase_path'])
+        file_results = apply_fixes_to_files(str(fix_file), str(codebase_path))
+        
+        print(f"\n✅ FILES MODIFIED!")
+        if 'error' in file_results:
+            print(f"❌ Error: {file_results['error']}")
+            if 'debug_text' in file_results:
+                print("🔍 Debug output:")
+                print(file_results['debug_text'])
+        else:
+            print(f"📁 Files changed: {len(file_results.get('files_modified', []))}")
+            if file_results.get('backup_directory'):
+                print(f"📦 Backups: {file_results['backup_directory']}")
+    
+    return {"approved": True, "decisions": decisions, "fix_file": fix_file}
+
+
+def _generate_single_request_fixes(
+    json_file: Path,
+    decisions: Dict[str, Any],
+    analysis: str,
+    cost_meter: Optional[CostMeter] = None
+) -> Dict[str, Any]:
+    """
+    Fixes for every file in one request (reports without structured findings)
+    """
     fix_prompt = f"""
     Based on the review findings below, generate specific code fixes.
     
@@ -372,13 +1476,9 @@ def human_review_and_apply_fixes(json_file: Path = None) -> Dict[str, Any]:
     """
     
     # Generate fixes with new client session
-    fix_client = Claude4Client()
+    fix_client = Claude4Client(cost_meter=cost_meter)
     fix_message = fix_client.create_analysis_message(fix_prompt)
     
-    # Save fix results
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    fix_file = REPORTS_DIR / f"fixes_{timestamp}.json"
-    
     # Extract content properly
     fix_content = str(fix_message.content)
     if hasattr(fix_message.content, 'text'):
@@ -397,59 +1497,155 @@ def human_review_and_apply_fixes(json_file: Path = None) -> Dict[str, Any]:
         }
     }
     
+    return fix_results
+
+
+def _apply_targeted_fixes(
+    json_file: Path,
+    results: Dict[str, Any],
+    decisions: Dict[str, Any],
+    selected: List[Any],
+    cost_meter: Optional[CostMeter] = None
+) -> Dict[str, Any]:
+    """
+    Generate, save and optionally apply per-region patches for the selected findings
+    """
+    from targeted_fixes import apply_patches, generate_targeted_fixes
+    
+    codebase_path = Path(results['codebase_path'])
+    print(f"\n🔧 GENERATING TARGETED FIXES...")
+    generated = generate_targeted_fixes(selected, codebase_path, decisions, cost_meter=cost_meter)
+    
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    fix_file = REPORTS_DIR / f"fixes_{timestamp}.json"
+    fix_results = {
+        "original_review": json_file.name,
+        "human_decisions": decisions,
+        "timestamp": datetime.now().isoformat(),
+        "fix_mode": "targeted",
+        "cost_estimate": estimate_cost(generated["model"], generated["input_tokens"], generated["output_tokens"]),
+        "applied_fixes": generated
+    }
     with open(fix_file, 'w', encoding='utf-8') as f:
         json.dump(fix_results, f, indent=2, ensure_ascii=False)
     
-    print(f"✅ FIXES GENERATED!")
+    print(f"✅ {len(generated['patches'])} PATCHES GENERATED!")
     print(f"📄 Fixes saved: {fix_file}")
+    for patch in generated["patches"]:
+        print(f"\n--- {patch['file']} ({patch['symbol']}): {patch['summary']}")
+        print(patch["diff"] or "(no change)")
     
-    # Ask about applying to files
-    apply_to_files = input("\nApply fixes to actual source files? (y/n): ").strip().lower() == 'y'
-    
-    if apply_to_files:
-        from simple_file_editor import apply_fixes_to_files
-        
-        codebase_path = Path(results['codebase_path'])
-        file_results = apply_fixes_to_files(str(fix_file), str(codebase_path))
-        
+    if generated["patches"] and input("\nApply patches to actual source files? (y/n): ").strip().lower() == 'y':
+        file_results = apply_patches(generated["patches"], codebase_path)
         print(f"\n✅ FILES MODIFIED!")
-        if 'error' in file_results:
-            print(f"❌ Error: {file_results['error']}")
-            if 'debug_text' in file_results:
-                print("🔍 Debug output:")
-                print(file_results['debug_text'])
-        else:
-            print(f"📁 Files changed: {len(file_results.get('files_modified', []))}")
-            if file_results.get('backup_directory'):
-                print(f"📦 Backups: {file_results['backup_directory']}")
+        print(f"📁 Files changed: {len(file_results['files_modified'])}")
+        print(f"🩹 Patches applied: {file_results['patches_applied']} of {len(generated['patches'])}")
+        if file_results['backup_directory']:
+            print(f"📦 Backups: {file_results['backup_directory']}")
     
     return {"approved": True, "decisions": decisions, "fix_file": fix_file}
 
 
+def run_review_from_args(reviewer: CleanIterativeReviewer, args) -> Dict[str, Any]:
+    """
+    Dispatch review/complete CLI arguments to the plain or sharded pipeline
+    """
+    if args.risk_tiers and args.shard:
+        print("⚠️  --risk-tiers applies to unsharded reviews; ignoring it with --shard")
+    if args.cascade and args.shard:
+        print("⚠️  --cascade applies to unsharded reviews; ignoring it with --shard")
+    if args.cascade and args.risk_tiers and not args.shard:
+        print("⚠️  --cascade picks the files for the later focus areas itself; ignoring --risk-tiers")
+    
+    if args.shard:
+        from sharding import ShardedReviewer
+        
+        return ShardedReviewer(reviewer).run_sharded_review(
+            Path(args.codebase_path),
+            args.goals,
+            args.iterations,
+            max_workers=args.max_workers,
+            incremental=args.incremental,
+            token_budget=args.token_budget,
+            ranking=args.ranking
+        )
+    
+    if args.stream and args.parallel:
+        print("⚠️  --stream applies to sequential reviews; ignoring it with --parallel")
+    
+    return reviewer.run_iterative_review(
+        Path(args.codebase_path),
+        args.goals,
+        args.iterations,
+        parallel=args.parallel,
+        max_workers=args.max_workers,
+        incremental=args.incremental,
+        token_budget=args.token_budget,
+        ranking=args.ranking,
+        stream=args.stream,
+        risk_tiers=args.risk_tiers,
+        cascade=args.cascade
+    )
+
+
 def main():
     """Clean CLI interface"""
     import argparse
     
+    def non_negative_int(value):
+        number = int(value)
+        if number < 0:
+            raise argparse.ArgumentTypeError(f"must be >= 0, got {number}")
+        return number
+    
     parser = argparse.ArgumentParser(description="Clean Iterative Code Review")
     subparsers = parser.add_subparsers(dest='command', help='Commands')
     
+    # Spend limit shared by every command that calls the API
+    cost_parser = argparse.ArgumentParser(add_help=False)
+    cost_parser.add_argument('--max-cost', type=float, default=None, help='Hard spend limit in USD, checked before every API call')
+    cost_parser.add_argument('--on-cost-limit', choices=COST_LIMIT_ACTIONS, default='halt', help='Stop, or switch to the development model, when the next call would exceed --max-cost')
+    
+    # Review options shared by the review and complete commands
+    options_parser = argparse.ArgumentParser(add_help=False)
+    options_parser.add_argument('--goals', default="Find security vulnerabilities, performance issues, bugs, and code quality problems", help='Review goals')
+    options_parser.add_argument('--iterations', type=int, default=5, help='Number of iterations')
+    options_parser.add_argument('--production', action='store_true', help='Use expensive model')
+    options_parser.add_argument('--parallel', action='store_true', help='Run focus areas concurrently as independent requests')
+    options_parser.add_argument('--max-workers', type=int, default=MAX_PARALLEL_REQUESTS, help='Concurrency limit for --parallel')
+    options_parser.add_argument('--cache', action='store_true', help='Reuse cached responses for identical requests')
+    options_parser.add_argument('--incremental', action='store_true', help='Only re-review files changed since the last report')
+    options_parser.add_argument('--token-budget', type=int, default=INPUT_TOKEN_BUDGET, help='Estimated input tokens of source code to send')
+    options_parser.add_argument('--ranking', choices=RANKING_STRATEGIES, default='risk', help='Order in which files are packed into the budget')
+    options_parser.add_argument('--shard', action='store_true', help='Split the codebase into token-budget-sized shards reviewed in parallel')
+    options_parser.add_argument('--history-turns', type=non_negative_int, default=None, help='Resend only the file context, a findings summary and the last N turns')
+    options_parser.add_argument('--prompt-cache', action='store_true', help='Mark the instructions and file context as cacheable prompt prefix')
+    options_parser.add_argument('--stream', action='store_true', help='Stream responses and print issues as they complete')
+    options_parser.add_argument('--structured', action='store_true', help='Request findings through a JSON-schema tool instead of markdown')
+    options_parser.add_argument('--static', action='store_true', help='Report cheap ast-detectable issues locally and tell the model to skip them')
+    options_parser.add_argument('--risk-tiers', action='store_true', help='Run the later focus areas only on the highest-risk files')
+    options_parser.add_argument('--adaptive', action='store_true', help='Skip focus areas that do not apply and stop once iterations stop finding new issues')
+    options_parser.add_argument('--cascade', action='store_true', help='Triage every file with the cheap model, then run the later focus areas with the production model on flagged files only')
+    
     # Review command
-    review_parser = subparsers.add_parser('review', help='Run iterative review')
-    review_parser.add_argument('codebase_path', help='Path to codebase')
-    review_parser.add_argument('--goals', default="Find security vulnerabilities, performance issues, bugs, and code quality problems", help='Review goals')
-    review_parser.add_argument('--iterations', type=int, default=5, help='Number of iterations')
-    review_parser.add_argument('--production', action='store_true', help='Use expensive model')
+    review_parser = subparsers.add_parser('review', parents=[options_parser, cost_parser], help='Run iterative review')
+    review_parser.add_argument('codebase_path', nargs='+', help='Path to codebase (several with --batch)')
+    review_parser.add_argument('--batch', action='store_true', help='Review all paths through the Message Batches API (one batch per iteration)')
+    
+    # Resume command
+    resume_parser = subparsers.add_parser('resume', help='Continue an interrupted review from its checkpoint')
+    resume_parser.add_argument('checkpoint', help='reports/checkpoint_*.jsonl file')
+    resume_parser.add_argument('--stream', action='store_true', help='Stream responses and print issues as they complete')
     
     # Apply command
-    apply_parser = subparsers.add_parser('apply', help='Human review and apply fixes')
+    apply_parser = subparsers.add_parser('apply', parents=[cost_parser], help='Human review and apply fixes')
     apply_parser.add_argument('--json-file', help='Specific JSON file to use')
+    apply_parser.add_argument('--fix-mode', choices=('full', 'targeted'), default='full', help='Whole-file fixes, or one function-scoped patch per affected region')
     
     # Complete command
-    complete_parser = subparsers.add_parser('complete', help='Review then apply')
+    complete_parser = subparsers.add_parser('complete', parents=[options_parser, cost_parser], help='Review then apply')
     complete_parser.add_argument('codebase_path', help='Path to codebase')
-    complete_parser.add_argument('--goals', default="Find security vulnerabilities, performance issues, bugs, and code quality problems", help='Review goals')
-    complete_parser.add_argument('--iterations', type=int, default=5, help='Number of iterations')
-    complete_parser.add_argument('--production', action='store_true', help='Use expensive model')
+    complete_parser.add_argument('--fix-mode', choices=('full', 'targeted'), default='full', help='Whole-file fixes, or one function-scoped patch per affected region')
     
     args = parser.parse_args()
     
@@ -459,23 +1655,87 @@ def main():
     
     try:
         if args.command == 'review':
-            if not Path(args.codebase_path).exists():
-                print(f"❌ Path not found: {args.codebase_path}")
+            for codebase_path in args.codebase_path:
+                if not Path(codebase_path).exists():
+                    print(f"❌ Path not found: {codebase_path}")
+                    return 1
+            if len(args.codebase_path) > 1 and not args.batch:
+                print("❌ Reviewing several paths requires --batch")
                 return 1
+            if args.batch:
+                # The batch loop runs every codebase's iterations one batch at a time
+                unsupported = [
+                    flag for flag, value in (
+                        ('--shard', args.shard), ('--parallel', args.parallel), ('--stream', args.stream),
+                        ('--risk-tiers', args.risk_tiers), ('--cascade', args.cascade)
+                    ) if value
+                ]
+                if unsupported:
+                    print(f"❌ {', '.join(unsupported)} cannot be combined with --batch")
+                    return 1
             
-            reviewer = CleanIterativeReviewer(args.production)
-            results = reviewer.run_iterative_review(
-                Path(args.codebase_path),
-                args.goals,
-                args.iterations
+            reviewer = CleanIterativeReviewer(
+                # --cascade triages on DEVELOPMENT_MODEL and escalates to PRODUCTION_MODEL itself
+                args.production and not (args.cascade and not args.shard),
+                use_cache=args.cache,
+                history_turns=args.history_turns,
+                prompt_caching=args.prompt_cache,
+                structured=args.structured,
+                static_analysis=args.static,
+                max_cost=args.max_cost,
+                on_cost_limit=args.on_cost_limit,
+                adaptive=args.adaptive
             )
             
+            if args.batch:
+                from batch_review import BatchReviewer
+                
+                BatchReviewer(reviewer).run_batch_reviews(
+                    [Path(p) for p in args.codebase_path],
+                    args.goals,
+                    args.iterations,
+                    incremental=args.incremental,
+                    token_budget=args.token_budget,
+                    ranking=args.ranking
+                )
+                print("\n➡️  Next: Run 'python clean_review.py apply --json-file <report>' to review and apply fixes")
+                return 0
+            
+            args.codebase_path = args.codebase_path[0]
+            results = run_review_from_args(reviewer, args)
+            
             if "error" not in results:
                 print("\n➡️  Next: Run 'python clean_review.py apply' to review and apply fixes")
             
+        elif args.command == 'resume':
+            if not Path(args.checkpoint).exists():
+                print(f"❌ Checkpoint not found: {args.checkpoint}")
+                return 1
+            
+            settings = ReviewCheckpoint.load(Path(args.checkpoint))["start"]
+            reviewer = CleanIterativeReviewer(
+                settings["use_production_model"],
+                use_cache=settings["use_cache"],
+                history_turns=settings["history_turns"],
+                prompt_caching=settings["prompt_caching"],
+                structured=settings.get("structured", False),
+                static_analysis=settings.get("static_analysis", False),
+                max_cost=settings.get("max_cost"),
+                on_cost_limit=settings.get("on_cost_limit", "halt"),
+                adaptive=settings.get("adaptive", False)
+            )
+            results = reviewer.resume_review(Path(args.checkpoint), stream=args.stream)
+            
+            if "error" in results:
+                return 1
+            if "already_complete" not in results:
+                print("\n➡️  Next: Run 'python clean_review.py apply' to review and apply fixes")
+        
         elif args.command == 'apply':
             json_file = Path(args.json_file) if args.json_file else None
-            human_review_and_apply_fixes(json_file)
+            human_review_and_apply_fixes(
+                json_file, args.fix_mode, cost_meter=CostMeter(args.max_cost, args.on_cost_limit)
+            )
         
         elif args.command == 'complete':
             if not Path(args.codebase_path).exists():
@@ -483,18 +1743,24 @@ def main():
                 return 1
             
             # Step 1: Review
-            reviewer = CleanIterativeReviewer(args.production)
-            results = reviewer.run_iterative_review(
-                Path(args.codebase_path),
-                args.goals,
-                args.iterations
+            reviewer = CleanIterativeReviewer(
+                args.production and not (args.cascade and not args.shard),
+                use_cache=args.cache,
+                history_turns=args.history_turns,
+                prompt_caching=args.prompt_cache,
+                structured=args.structured,
+                static_analysis=args.static,
+                max_cost=args.max_cost,
+                on_cost_limit=args.on_cost_limit,
+                adaptive=args.adaptive
             )
+            results = run_review_from_args(reviewer, args)
             
             if "error" in results:
                 return 1
             
             # Step 2: Human review and apply
-            human_review_and_apply_fixes()
+            human_review_and_apply_fixes(fix_mode=args.fix_mode, cost_meter=reviewer.cost_meter)
         
         return 0
         
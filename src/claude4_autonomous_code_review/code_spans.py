@@ -0,0 +1,61 @@
+"""
+Line spans of the functions and classes in a Python source file
+"""
+import ast
+from typing import Dict, List, Optional, Tuple
+
+# qualified name (Class.method, outer.inner) -> (first line incl. decorators, last line)
+Spans = Dict[str, Tuple[int, int]]
+
+DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def symbol_spans(source: str) -> Spans:
+    """
+    1-based inclusive spans of every function and class, nested ones included
+    
+    Raises SyntaxError for sources that do not parse.
+    """
+    spans: Spans = {}
+    
+    def visit(node: ast.AST, prefix: str) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, DEFINITIONS):
+                qualname = f"{prefix}{child.name}"
+                start = min([child.lineno] + [d.lineno for d in child.decorator_list])
+                # Redefinitions keep the first span, like a name lookup in the index would
+                spans.setdefault(qualname, (start, child.end_lineno))
+                visit(child, f"{qualname}.")
+            else:
+                visit(child, prefix)
+    
+    visit(ast.parse(source), "")
+    return spans
+
+
+def innermost_span(spans: Spans, line: int) -> Optional[Tuple[str, int, int]]:
+    """The smallest definition containing a line, as (qualname, start, end)"""
+    containing = [(end - start, name, start, end) for name, (start, end) in spans.items() if start <= line <= end]
+    if not containing:
+        return None
+    _, name, start, end = min(containing)
+    return name, start, end
+
+
+def lookup(spans: Spans, name: str) -> List[Tuple[str, int, int]]:
+    """Definitions whose qualified name is, or ends with, the given (dotted) name"""
+    name = name.strip(".")
+    return [
+        (qualname, start, end)
+        for qualname, (start, end) in spans.items()
+        if qualname == name or qualname.endswith(f".{name}")
+    ]
+
+
+def statement_span(source: str, line: int) -> Optional[Tuple[int, int]]:
+    """Span of the top-level statement containing a line (decorators included)"""
+    for node in ast.parse(source).body:
+        start = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+        if start <= line <= node.end_lineno:
+            return start, node.end_lineno
+    return None
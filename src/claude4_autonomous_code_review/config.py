@@ -12,6 +12,19 @@ load_dotenv()
 DEVELOPMENT_MODEL = "claude-3-haiku-20240307"  # Cheap for testing ($0.25/$1.25 per million tokens)
 PRODUCTION_MODEL = "claude-4-opus"             # Expensive but powerful ($15/$75 per million tokens)
 
+# USD per million (input, output) tokens; unknown models are priced as PRODUCTION_MODEL
+MODEL_PRICING = {
+    "claude-3-haiku-20240307": (0.25, 1.25),
+    "claude-3-5-haiku-20241022": (0.80, 4.0),
+    "claude-3-5-sonnet-20241022": (3.0, 15.0),
+    "claude-sonnet-4-20250514": (3.0, 15.0),
+    "claude-4-opus": (15.0, 75.0),
+    "claude-opus-4-20250514": (15.0, 75.0),
+}
+CACHE_WRITE_PRICE_FACTOR = 1.25  # Prompt-cache writes bill at 1.25x the input price
+CACHE_READ_PRICE_FACTOR = 0.1    # and reads at 0.1x
+COST_ESTIMATE_MARGIN = 1.5       # Cost reservations assume up to this many times the estimated input tokens
+
 # API Configuration
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 if not ANTHROPIC_API_KEY:
@@ -34,5 +47,41 @@ REPORTS_DIR.mkdir(exist_ok=True)
 MAX_TOKENS = 4096
 TEMPERATURE = 0.1  # Low for consistent code analysis
 
+# Context packing settings
+INPUT_TOKEN_BUDGET = 100_000   # Estimated tokens of source code sent per review
+CONTEXT_CHUNK_TOKENS = 8_000   # Oversized files are split into chunks of at most this size
+
 # Iterative review settings
 DEFAULT_ITERATIONS = 5  # Default number of iterations for testing
+
+# Adaptive iteration settings (used with --adaptive)
+ADAPTIVE_MIN_ITERATIONS = 2    # Never stop before this many iterations have run
+ADAPTIVE_MIN_NEW_FINDINGS = 2  # An iteration with fewer new (de-duplicated) findings is low-yield
+ADAPTIVE_PATIENCE = 1          # Stop after this many low-yield iterations in a row
+
+# Risk-tiered review settings (used with --risk-tiers)
+RISK_SHALLOW_ITERATIONS = 2  # Focus areas run over every packed file
+RISK_DEEP_FRACTION = 0.25    # Share of files (highest risk first) that get the remaining focus areas
+
+# Model cascade settings (used with --cascade)
+CASCADE_TRIAGE_ITERATIONS = 2       # Focus areas DEVELOPMENT_MODEL runs over every packed file
+CASCADE_ESCALATE_SEVERITY = "High"  # Files with triage findings at or above this go to PRODUCTION_MODEL
+
+# Parallel review settings
+MAX_PARALLEL_REQUESTS = 4  # Upper bound on concurrent API calls in parallel mode
+
+# Response cache settings (used with --cache)
+RESPONSE_CACHE_DIR = PROJECT_ROOT / ".review_cache"
+RESPONSE_CACHE_MAX_BYTES = 200 * 1024 * 1024  # LRU eviction beyond this size
+
+# Message Batches settings (used with --batch)
+BATCH_POLL_SECONDS = 30  # Delay between batch status checks
+BATCH_PRICE_FACTOR = 0.5  # Batch requests bill at half the standard price
+
+# Rate limiting and retry settings
+RETRY_MAX_ATTEMPTS = 6  # Retries on 429/529/5xx/connection errors before giving up
+RETRY_BASE_DELAY = 1.0  # Seconds; doubled per attempt, with full jitter
+RETRY_MAX_DELAY = 60.0  # Upper bound on a single backoff delay
+
+# Targeted fix settings (used with apply --fix-mode targeted)
+FIX_MODULE_MAX_LINES = 200  # Files this short are attached whole when a finding names no function
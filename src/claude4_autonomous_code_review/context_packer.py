@@ -0,0 +1,212 @@
+"""
+Token-budgeted context packing for review uploads
+
+Ranks candidate files, then packs whole files (or chunks cut at top-level
+function/class boundaries) until the input-token budget is used up.
+"""
+import ast
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from incremental import relative_name
+from risk_scoring import score_files
+
+CHARS_PER_TOKEN = 4  # Rough average for source code
+
+RANKING_STRATEGIES = ("risk", "size", "path")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate without a tokenizer round-trip"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def rank_files(
+    sources: Dict[Path, str],
+    strategy: str = "risk",
+    scores: Optional[Dict[Path, Dict[str, float]]] = None
+) -> List[Path]:
+    """
+    Order candidate files for packing
+    
+    risk: highest risk_scoring score first (complexity, dangerous calls,
+          churn, size), smaller files on ties
+    size: smallest first (maximizes the number of files that fit)
+    path: alphabetical (stable, mirrors the old behaviour)
+    """
+    if strategy == "risk":
+        scores = scores if scores is not None else score_files(sources)
+        return sorted(sources, key=lambda p: (
+            -scores[p]["score"], len(sources[p]), str(p)
+        ))
+    if strategy == "size":
+        return sorted(sources, key=lambda p: (len(sources[p]), str(p)))
+    if strategy == "path":
+        return sorted(sources, key=str)
+    raise ValueError(f"Unknown ranking strategy: {strategy} (expected one of {RANKING_STRATEGIES})")
+
+
+def _start_line(node: ast.stmt) -> int:
+    """First line of a statement, decorators included"""
+    decorators = getattr(node, "decorator_list", [])
+    return min([node.lineno] + [d.lineno for d in decorators])
+
+
+def segment_starts(source: str) -> Tuple[List[int], List[int]]:
+    """
+    1-based start lines of top-level statements, and of statements
+    directly inside top-level classes (secondary cut points for big classes)
+    """
+    tree = ast.parse(source)
+    starts, member_starts = [], []
+    for node in tree.body:
+        starts.append(_start_line(node))
+        if isinstance(node, ast.ClassDef):
+            member_starts.extend(_start_line(member) for member in node.body)
+    return starts, member_starts
+
+
+def split_into_chunks(
+    source: str,
+    chunk_tokens: int,
+    segments: Optional[Tuple[List[int], List[int]]] = None
+) -> List[Tuple[int, int, str]]:
+    """
+    Split source into (start_line, end_line, text) chunks of at most
+    chunk_tokens, cutting only between top-level statements where possible
+    
+    segments are precomputed segment_starts (e.g. from the symbol index).
+    """
+    lines = source.splitlines(keepends=True)
+    if not lines:
+        return []
+    
+    if segments is not None:
+        starts, member_starts = segments
+    else:
+        try:
+            starts, member_starts = segment_starts(source)
+        except SyntaxError:
+            starts, member_starts = [], []
+    member_starts = set(member_starts)
+    # Module header (docstring/imports) stays with the first definition
+    boundaries = sorted({1} | {s for s in starts if s > 1})
+    segments = [(start, end - 1) for start, end in zip(boundaries, boundaries[1:] + [len(lines) + 1])]
+    
+    # Segments that are too large on their own are cut at the last method
+    # boundary before the limit, or at the limit itself if there is none
+    max_chars = chunk_tokens * CHARS_PER_TOKEN
+    fine_segments = []
+    for start, end in segments:
+        text = "".join(lines[start - 1:end])
+        if len(text) <= max_chars:
+            fine_segments.append((start, end))
+            continue
+        cursor, size, last_member = start, 0, None
+        for line_no in range(start, end + 1):
+            if line_no in member_starts and line_no > cursor:
+                last_member = line_no
+            size += len(lines[line_no - 1])
+            if size > max_chars and line_no > cursor:
+                cut = last_member if last_member else line_no
+                fine_segments.append((cursor, cut - 1))
+                cursor, last_member = cut, None
+                size = sum(len(line) for line in lines[cursor - 1:line_no])
+        fine_segments.append((cursor, end))
+    
+    # Greedily merge consecutive segments up to the chunk size
+    chunks = []
+    chunk_start, chunk_end, size = None, None, 0
+    for start, end in fine_segments:
+        seg_size = sum(len(line) for line in lines[start - 1:end])
+        if chunk_start is not None and size + seg_size > max_chars:
+            chunks.append((chunk_start, chunk_end))
+            chunk_start, size = None, 0
+        if chunk_start is None:
+            chunk_start = start
+        chunk_end, size = end, size + seg_size
+    if chunk_start is not None:
+        chunks.append((chunk_start, chunk_end))
+    
+    return [(start, end, "".join(lines[start - 1:end])) for start, end in chunks]
+
+
+def pack_files(
+    files: List[Path],
+    token_budget: int,
+    chunk_tokens: int,
+    strategy: str = "risk",
+    index: Optional[Any] = None,
+    codebase_path: Optional[Path] = None,
+    line_ranges: Optional[Dict[Path, Tuple[int, int]]] = None
+) -> Dict[str, Any]:
+    """
+    Select whole files or chunks that fit under token_budget
+    
+    Returns entries in upload order plus bookkeeping for the report:
+    files packed whole, files packed partially, and files skipped.
+    With a SymbolIndex, oversized files are cut at their indexed
+    boundaries instead of being parsed again. Entries are labelled with
+    their path relative to codebase_path (bare names without it), so the
+    model can tell same-named files apart. A file with an entry in
+    line_ranges contributes only the chunks inside that (start, end) range
+    and counts as complete when all of them fit.
+    """
+    sources = {}
+    for file_path in files:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            sources[file_path] = f.read()
+    
+    entries = []
+    complete, partial, skipped = [], [], []
+    used = 0
+    scores = score_files(sources) if strategy == "risk" else None
+    
+    for file_path in rank_files(sources, strategy, scores):
+        source = sources[file_path]
+        tokens = estimate_tokens(source)
+        label = relative_name(file_path, codebase_path) if codebase_path else file_path.name
+        line_range = (line_ranges or {}).get(file_path)
+        
+        if line_range is None and used + tokens <= token_budget:
+            entries.append({"path": file_path, "label": label, "content": source, "tokens": tokens})
+            complete.append(file_path)
+            used += tokens
+            continue
+        
+        # Too big for what is left: pack as many boundary-aligned chunks as fit
+        packed_any, packed_all = False, True
+        segments = index.segments(file_path) if index is not None else None
+        for start, end, text in split_into_chunks(source, chunk_tokens, segments):
+            if line_range and not line_range[0] <= start <= end <= line_range[1]:
+                continue
+            chunk_tokens_used = estimate_tokens(text)
+            if used + chunk_tokens_used > token_budget:
+                packed_all = False
+                continue
+            entries.append({
+                "path": file_path,
+                "label": f"{label} (lines {start}-{end})",
+                "content": text,
+                "tokens": chunk_tokens_used
+            })
+            used += chunk_tokens_used
+            packed_any = True
+        
+        if packed_any and packed_all:
+            complete.append(file_path)
+        elif packed_any:
+            partial.append(file_path)
+        else:
+            skipped.append(file_path)
+    
+    return {
+        "entries": entries,
+        "complete_files": complete,
+        "partial_files": partial,
+        "skipped_files": skipped,
+        "used_tokens": used,
+        "token_budget": token_budget,
+        "strategy": strategy,
+        "risk_scores": {str(path): values for path, values in (scores or {}).items()}
+    }
@@ -0,0 +1,197 @@
+"""
+Live spend tracking and a hard cost limit for one review run
+
+Every Messages API call is priced from its usage (cache tokens included)
+against MODEL_PRICING as soon as it returns. Before a call is sent its
+worst case is reserved: the estimated input times COST_ESTIMATE_MARGIN
+(priced as a prompt-cache write when caching is on) plus a full max_tokens
+reply, so concurrent requests cannot overshoot the limit together; a call that would
+cross the limit is refused, or with on_limit="downgrade" sent to
+DEVELOPMENT_MODEL instead when that still fits. Message Batches requests
+pass price_factor=BATCH_PRICE_FACTOR to be held and billed at batch prices.
+"""
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from config import (
+    CACHE_READ_PRICE_FACTOR, CACHE_WRITE_PRICE_FACTOR, COST_ESTIMATE_MARGIN, DEVELOPMENT_MODEL,
+    MODEL_PRICING, PRODUCTION_MODEL
+)
+
+logger = logging.getLogger(__name__)
+
+COST_LIMIT_ACTIONS = ("halt", "downgrade")
+
+
+class CostLimitExceeded(RuntimeError):
+    """The next call could push spend past the run's cost limit"""
+
+
+def model_pricing(model: str) -> Tuple[float, float]:
+    """USD per million (input, output) tokens"""
+    return MODEL_PRICING.get(model, MODEL_PRICING[PRODUCTION_MODEL])
+
+
+def estimate_cost(
+    model: str,
+    input_tokens: int,
+    output_tokens: int,
+    cache_write_tokens: int = 0,
+    cache_read_tokens: int = 0
+) -> float:
+    """
+    Dollar estimate for a token count on the given model
+    
+    Prompt-cache writes bill at CACHE_WRITE_PRICE_FACTOR and reads at
+    CACHE_READ_PRICE_FACTOR times the input price.
+    """
+    input_price, output_price = model_pricing(model)
+    
+    input_cost = (input_tokens / 1_000_000) * input_price
+    cache_cost = ((cache_write_tokens * CACHE_WRITE_PRICE_FACTOR
+                   + cache_read_tokens * CACHE_READ_PRICE_FACTOR) / 1_000_000) * input_price
+    output_cost = (output_tokens / 1_000_000) * output_price
+    
+    return input_cost + cache_cost + output_cost
+
+
+def worst_case_cost(
+    model: str,
+    estimated_input_tokens: int,
+    max_output_tokens: int,
+    cache_writes: bool = False
+) -> float:
+    """
+    Upper bound for one call: the input estimate with COST_ESTIMATE_MARGIN,
+    all of it billed as cache writes if the request may write the cache,
+    plus a full-length reply
+    """
+    input_tokens = int(estimated_input_tokens * COST_ESTIMATE_MARGIN)
+    if cache_writes:
+        return estimate_cost(model, 0, max_output_tokens, cache_write_tokens=input_tokens)
+    return estimate_cost(model, input_tokens, max_output_tokens)
+
+
+class CostMeter:
+    """
+    Thread-safe spend accumulator shared by every client of one review run
+    """
+    
+    def __init__(self, max_cost: Optional[float] = None, on_limit: str = "halt"):
+        if on_limit not in COST_LIMIT_ACTIONS:
+            raise ValueError(f"Unknown cost limit action: {on_limit} (expected one of {COST_LIMIT_ACTIONS})")
+        self.max_cost = max_cost
+        self.on_limit = on_limit
+        self._lock = threading.Lock()
+        self.spent = 0.0
+        self.reserved = 0.0
+        # model -> {"calls", "input_tokens", "output_tokens", "cache_write_tokens", "cache_read_tokens", "cost"}
+        self.by_model: Dict[str, Dict[str, float]] = {}
+        self.downgraded_calls = 0
+        self.refused_calls = 0
+    
+    @property
+    def halted(self) -> bool:
+        """Whether a call has been refused for exceeding the limit"""
+        return self.refused_calls > 0
+    
+    def reserve(
+        self,
+        model: str,
+        estimated_input_tokens: int,
+        max_output_tokens: int,
+        price_factor: float = 1.0,
+        cache_writes: bool = False
+    ) -> Tuple[str, float]:
+        """
+        Model to send the next call to and the worst-case cost held for it
+        (see worst_case_cost)
+        
+        Raises CostLimitExceeded when neither the requested model nor (with
+        on_limit="downgrade") DEVELOPMENT_MODEL fits in what is left.
+        """
+        with self._lock:
+            candidates = [model]
+            if self.on_limit == "downgrade" and model != DEVELOPMENT_MODEL:
+                candidates.append(DEVELOPMENT_MODEL)
+            
+            for candidate in candidates:
+                worst_case = worst_case_cost(
+                    candidate, estimated_input_tokens, max_output_tokens, cache_writes
+                ) * price_factor
+                if self.max_cost is None or self.spent + self.reserved + worst_case <= self.max_cost:
+                    if candidate != model:
+                        self.downgraded_calls += 1
+                        logger.warning(f"Cost limit: sending call to {candidate} instead of {model}")
+                    self.reserved += worst_case
+                    return candidate, worst_case
+            
+            self.refused_calls += 1
+            worst_case = worst_case_cost(model, estimated_input_tokens, max_output_tokens, cache_writes) * price_factor
+            raise CostLimitExceeded(
+                f"cost limit ${self.max_cost:.4f} reached (spent ${self.spent:.4f}, "
+                f"next call up to ${worst_case:.4f})"
+            )
+    
+    def release(self, reserved: float) -> None:
+        """Drop the reservation of a call that failed"""
+        with self._lock:
+            self.reserved = max(0.0, self.reserved - reserved)
+    
+    def settle(self, model: str, usage: Any, reserved: float = 0.0, price_factor: float = 1.0) -> float:
+        """
+        Replace a call's reservation with its actual cost; returns that cost
+        """
+        tokens = {
+            "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+            "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+            "cache_write_tokens": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+            "cache_read_tokens": getattr(usage, "cache_read_input_tokens", 0) or 0
+        }
+        return self.record(model, reserved=reserved, price_factor=price_factor, **tokens)
+    
+    def record(
+        self,
+        model: str,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        cache_write_tokens: int = 0,
+        cache_read_tokens: int = 0,
+        calls: int = 1,
+        reserved: float = 0.0,
+        price_factor: float = 1.0
+    ) -> float:
+        """Add spend for token counts (also used to seed a resumed run)"""
+        cost = estimate_cost(model, input_tokens, output_tokens, cache_write_tokens, cache_read_tokens) * price_factor
+        with self._lock:
+            self.reserved = max(0.0, self.reserved - reserved)
+            self.spent += cost
+            entry = self.by_model.setdefault(model, {
+                "calls": 0, "input_tokens": 0, "output_tokens": 0,
+                "cache_write_tokens": 0, "cache_read_tokens": 0, "cost": 0.0
+            })
+            entry["calls"] += calls
+            entry["input_tokens"] += input_tokens
+            entry["output_tokens"] += output_tokens
+            entry["cache_write_tokens"] += cache_write_tokens
+            entry["cache_read_tokens"] += cache_read_tokens
+            entry["cost"] += cost
+        return cost
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Spend summary for the JSON report
+        """
+        with self._lock:
+            return {
+                "spent": round(self.spent, 6),
+                "max_cost": self.max_cost,
+                "on_limit": self.on_limit,
+                "downgraded_calls": self.downgraded_calls,
+                "refused_calls": self.refused_calls,
+                "by_model": {
+                    model: {**entry, "cost": round(entry["cost"], 6)}
+                    for model, entry in self.by_model.items()
+                }
+            }
@@ -0,0 +1,143 @@
+"""
+Semantic de-duplication of findings across iterations
+
+Overlapping focus areas (e.g. race conditions under both "Error Handling"
+and "Concurrency") report the same issue with different wording. Findings
+in the same file are clustered by title similarity (token-set Jaccard,
+with MinHash/LSH to find candidate pairs cheaply) and location; each
+cluster keeps one canonical finding tagged with every iteration that
+reported it.
+"""
+import hashlib
+import re
+from itertools import combinations
+from typing import Dict, List, Set, Tuple
+
+from findings import Finding, severity_rank
+
+NUM_PERMUTATIONS = 32
+BANDS = 16  # 2 rows per band: pairs with Jaccard 0.5 become candidates ~99% of the time
+MERSENNE_PRIME = (1 << 61) - 1
+
+# Line ranges this close are treated as the same location (models cite lines loosely)
+LINE_SLACK = 3
+# Same location: titles this similar are the same issue
+TITLE_THRESHOLD = 0.5
+# Unknown or different location: require near-identical titles
+STRICT_TITLE_THRESHOLD = 0.8
+
+STOPWORDS = {
+    "a", "an", "the", "in", "of", "on", "for", "to", "and", "or", "with", "without",
+    "is", "are", "be", "by", "at", "from", "via", "into", "potential", "possible", "issue"
+}
+
+_PERMUTATIONS = [
+    (int.from_bytes(hashlib.sha256(f"a{i}".encode()).digest()[:8], "big") % MERSENNE_PRIME or 1,
+     int.from_bytes(hashlib.sha256(f"b{i}".encode()).digest()[:8], "big") % MERSENNE_PRIME)
+    for i in range(NUM_PERMUTATIONS)
+]
+
+
+def title_tokens(text: str) -> Set[str]:
+    """Lower-cased content words with a crude plural/verb-suffix strip"""
+    tokens = set()
+    for word in re.findall(r'[a-z0-9]+', text.lower()):
+        if word in STOPWORDS:
+            continue
+        for suffix in ("ing", "ed", "es", "s"):
+            if len(word) > len(suffix) + 3 and word.endswith(suffix):
+                word = word[:-len(suffix)]
+                break
+        tokens.add(word)
+    return tokens
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def minhash(tokens: Set[str]) -> Tuple[int, ...]:
+    """MinHash signature of a token set"""
+    if not tokens:
+        return tuple([MERSENNE_PRIME] * NUM_PERMUTATIONS)
+    hashes = [int.from_bytes(hashlib.blake2b(t.encode(), digest_size=8).digest(), "big") for t in tokens]
+    return tuple(min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def same_location(first: Finding, second: Finding) -> bool:
+    """Overlapping (or nearly adjacent) line ranges, or the same named location"""
+    if first.start_line and second.start_line:
+        return (first.start_line <= (second.end_line or second.start_line) + LINE_SLACK
+                and second.start_line <= (first.end_line or first.start_line) + LINE_SLACK)
+    first_tokens, second_tokens = title_tokens(first.location), title_tokens(second.location)
+    return bool(first_tokens) and first_tokens == second_tokens
+
+
+def _candidate_pairs(signatures: List[Tuple[int, ...]]) -> Set[Tuple[int, int]]:
+    """Index pairs sharing at least one LSH band"""
+    rows = NUM_PERMUTATIONS // BANDS
+    pairs = set()
+    for band in range(BANDS):
+        buckets: Dict[Tuple[int, ...], List[int]] = {}
+        for index, signature in enumerate(signatures):
+            buckets.setdefault(signature[band * rows:(band + 1) * rows], []).append(index)
+        for members in buckets.values():
+            pairs.update(combinations(members, 2))
+    return pairs
+
+
+def _canonical(cluster: List[Finding]) -> Finding:
+    """Most severe, then most detailed, then earliest finding of a cluster"""
+    best = min(cluster, key=lambda f: (severity_rank(f.severity), -len(f.description), f.iteration))
+    iterations = sorted({n for finding in cluster for n in (finding.iterations or [finding.iteration])})
+    merged = Finding(**{name: getattr(best, name) for name in Finding.__slots__})
+    merged.iterations = iterations
+    merged.iteration = iterations[0]
+    return merged
+
+
+def dedupe_findings(findings: List[Finding]) -> Tuple[List[Finding], Dict[str, int]]:
+    """
+    Cluster duplicate findings and keep one canonical finding per cluster
+    
+    Returns the surviving findings (in order of first appearance) and counts
+    for the report.
+    """
+    parent = list(range(len(findings)))
+    
+    def root(index: int) -> int:
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+    
+    by_file: Dict[str, List[int]] = {}
+    for index, finding in enumerate(findings):
+        by_file.setdefault(finding.file.lower(), []).append(index)
+    
+    tokens = [title_tokens(finding.title) for finding in findings]
+    for members in by_file.values():
+        if len(members) < 2:
+            continue
+        signatures = [minhash(tokens[index]) for index in members]
+        for i, j in _candidate_pairs(signatures):
+            first, second = members[i], members[j]
+            # Static findings are already one per pattern and definition
+            if findings[first].source == findings[second].source == "static":
+                continue
+            similarity = jaccard(tokens[first], tokens[second])
+            threshold = (TITLE_THRESHOLD if same_location(findings[first], findings[second])
+                         else STRICT_TITLE_THRESHOLD)
+            if similarity >= threshold:
+                parent[root(second)] = root(first)
+    
+    clusters: Dict[int, List[Finding]] = {}
+    for index, finding in enumerate(findings):
+        clusters.setdefault(root(index), []).append(finding)
+    
+    kept = [_canonical(clusters[key]) for key in sorted(clusters)]
+    return kept, {
+        "findings_before": len(findings),
+        "findings_after": len(kept),
+        "duplicates_merged": len(findings) - len(kept)
+    }
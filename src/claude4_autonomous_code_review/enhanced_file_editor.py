@@ -1,13 +1,144 @@
 """
 Fixed Enhanced File Editor with Correct Regex Patterns
 """
+import ast
+import hashlib
 import json
 import re
+import textwrap
 from pathlib import Path
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 import shutil
+from bisect import bisect_left, bisect_right
 from datetime import datetime
 
+from code_spans import Spans, lookup, symbol_spans
+from symbol_index import SymbolIndex
+
+# One alternation scanned once over the fix text: fenced code, **File:** headers, file names
+FIX_TOKEN = re.compile(
+    r'```(?:python)?\n(?P<code>.*?)```'
+    r'|\*\*\s*File:\s*(?P<header>[^*]+?)\s*\*\*'
+    r'|(?P<mention>[\w.-]+\.py)\b',
+    re.DOTALL | re.IGNORECASE
+)
+MENTION = re.compile(r'[\w.-]+\.py\b', re.IGNORECASE)
+DEFINITION_LINE = re.compile(r'^\s*(?:async\s+def|def|class)\b')
+
+# Matched against the text on the line that opens a code block
+FILE_MENTION_PATTERNS = [
+    re.compile(r'(?:In|File)\s+([\w_]+\.py)', re.IGNORECASE),
+    re.compile(r'([\w_]+\.py)[^\n]*?(?:should be|needs to be|fix)', re.IGNORECASE),
+    re.compile(r'(?:Fix for|Update)\s+([\w_]+\.py)', re.IGNORECASE)
+]
+
+
+def _parse_spans(source: str) -> Optional[Spans]:
+    """Definition spans of a source, or None if it does not parse"""
+    try:
+        return symbol_spans(source)
+    except (SyntaxError, ValueError):
+        return None
+
+
+def _dedent(text: str) -> str:
+    """Remove the common indentation, leaving whitespace-only lines otherwise intact"""
+    lines = text.splitlines(keepends=True)
+    margin = min((len(line) - len(line.lstrip()) for line in lines if line.strip()), default=0)
+    if not margin:
+        return text
+    return "".join(line[min(margin, len(line.rstrip("\r\n"))):] for line in lines)
+
+
+def _resolve_name(spans: Spans, name: str) -> Optional[str]:
+    """Qualified name of a definition by exact name, else by a unique name suffix"""
+    if name in spans:
+        return name
+    matches = lookup(spans, name)
+    return matches[0][0] if len(matches) == 1 else None
+
+
+def _resolve_target(spans: Spans, name: str) -> Optional[Tuple[int, int]]:
+    """Span of a definition by exact qualified name, else by a unique name suffix"""
+    qualname = _resolve_name(spans, name)
+    return spans[qualname] if qualname else None
+
+
+def _direct_members(spans: Spans, qualname: str) -> List[str]:
+    """Names of the definitions directly inside a definition, in source order"""
+    prefix = f"{qualname}."
+    members = [name[len(prefix):] for name in spans if name.startswith(prefix)]
+    return sorted((m for m in members if "." not in m), key=lambda m: spans[prefix + m])
+
+
+def _is_class(lines: List[str], span: Tuple[int, int]) -> bool:
+    """Whether the definition at span (decorators first) is a class"""
+    for line in lines[span[0] - 1:span[1]]:
+        if DEFINITION_LINE.match(line):
+            return line.lstrip().startswith("class")
+    return False
+
+
+def _module_statements(source: str) -> set:
+    """
+    Names bound by a module's top-level imports and assignments (what a
+    whole-file replacement must still contain)
+    """
+    names = set()
+    for node in ast.parse(source).body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.update(f"import {alias.asname or alias.name}" for alias in node.names)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            names.update(f"assign {ast.unparse(target)}" for target in targets)
+    return names
+
+
+def _mention_key(name: str) -> str:
+    """Lower-cased bare file name of a mention, without an upload id prefix"""
+    return re.sub(r'^file_\d+_', '', name.rsplit("/", 1)[-1].lower())
+
+
+class FixTextIndex:
+    """
+    Fenced code blocks, **File:** headers and file-name mentions of a fix
+    text, with their offsets, collected in a single scan
+    """
+    
+    def __init__(self, text: str):
+        self.text = text
+        self.blocks: List[Tuple[int, str]] = []     # (offset, code)
+        self.headers: List[Tuple[int, str]] = []    # (end offset, file name)
+        self.mentions: List[Tuple[int, str]] = []   # (offset, lower-cased bare file name)
+        
+        for match in FIX_TOKEN.finditer(text):
+            if match.group("code") is not None:
+                self.blocks.append((match.start(), match.group("code")))
+                # File names inside code (e.g. a leading comment) count as mentions too
+                code_start = match.start("code")
+                for inner in MENTION.finditer(match.group("code")):
+                    self.mentions.append((code_start + inner.start(), _mention_key(inner.group())))
+            elif match.group("header") is not None:
+                self.headers.append((match.end(), match.group("header")))
+                self.mentions.append((match.start("header"), _mention_key(match.group("header").strip())))
+            else:
+                self.mentions.append((match.start(), _mention_key(match.group("mention"))))
+        
+        self.mentions.sort()
+        self._block_starts = [start for start, _ in self.blocks]
+    
+    def block_after(self, offset: int) -> Optional[Tuple[int, str]]:
+        """First code block starting at or after offset"""
+        i = bisect_left(self._block_starts, offset)
+        return self.blocks[i] if i < len(self.blocks) else None
+    
+    def block_near(self, offset: int, distance: int) -> Optional[Tuple[int, str]]:
+        """First code block starting less than distance characters from offset"""
+        i = bisect_right(self._block_starts, offset - distance)
+        if i < len(self.blocks) and self._block_starts[i] < offset + distance:
+            return self.blocks[i]
+        return None
+
 
 class EnhancedCodeFileEditor:
     """
@@ -17,6 +148,8 @@ class EnhancedCodeFileEditor:
     def __init__(self, backup_original_files: bool = True):
         self.backup_original_files = backup_original_files
         self.backup_dir = None
+        # Persistent symbol index of the codebase being edited - see _codebase_index
+        self._symbol_index: Optional[SymbolIndex] = None
         
     def apply_fixes_from_report(self, report_file: Path, codebase_path: Path) -> Dict[str, Any]:
         """
@@ -107,6 +240,9 @@ class EnhancedCodeFileEditor:
                 print(f"❌ {error_msg}")
                 results["errors"].append(error_msg)
         
+        # The edited files are re-indexed on the next run
+        self._symbol_index = None
+        
         print(f"\n✅ ENHANCED FILE EDITING COMPLETED")
         print(f"📊 Summary:")
         print(f"   - Files detected: {results['debug_info']['total_files_detected']}")
@@ -121,123 +257,102 @@ class EnhancedCodeFileEditor:
     def _enhanced_parse_fixes(self, fixes_text: str, codebase_path: Path) -> Dict[Path, List[Dict]]:
         """
         Enhanced parsing with multiple strategies to extract fixes
+        
+        The text is tokenized once (FixTextIndex) and the codebase indexed
+        once, so every strategy is a walk over the index rather than another
+        scan of the text or the files.
         """
+        index = FixTextIndex(fixes_text)
+        symbols = self._codebase_index(codebase_path)
         file_fixes = {}
         
         # Strategy 1: Look for explicit file headers like "**File: filename.py**"
-        file_fixes.update(self._parse_explicit_file_headers(fixes_text, codebase_path))
+        file_fixes.update(self._parse_explicit_file_headers(index, codebase_path))
         
         # Strategy 2: Look for filename mentions with code blocks
-        file_fixes.update(self._parse_filename_with_codeblocks(fixes_text, codebase_path))
+        file_fixes.update(self._parse_filename_with_codeblocks(index, symbols))
         
         # Strategy 3: Look for function/class fixes and match to files
-        file_fixes.update(self._parse_function_fixes(fixes_text, codebase_path))
+        file_fixes.update(self._parse_function_fixes(index, codebase_path))
         
         # Strategy 4: Look for "In file X" or "File X contains" patterns
-        file_fixes.update(self._parse_file_mentions(fixes_text, codebase_path))
+        file_fixes.update(self._parse_file_mentions(index, codebase_path))
         
         return file_fixes
     
-    def _parse_explicit_file_headers(self, text: str, codebase_path: Path) -> Dict[Path, List[Dict]]:
+    def _codebase_index(self, codebase_path: Path) -> SymbolIndex:
         """
-        Parse explicit file headers like **File: filename.py**
+        Symbol index of the codebase (file names and defined functions/classes),
+        loaded and refreshed once per run and shared by every strategy
+        """
+        codebase_path = Path(codebase_path)
+        if self._symbol_index is None or self._symbol_index.codebase_path != codebase_path:
+            self._symbol_index = SymbolIndex.open(codebase_path)
+        return self._symbol_index
+    
+    def _parse_explicit_file_headers(self, index: "FixTextIndex", codebase_path: Path) -> Dict[Path, List[Dict]]:
+        """
+        Parse explicit file headers like **File: filename.py** directly followed by a code block
         """
         file_fixes = {}
         
-        # Pattern: **File: filename.py** followed by code block
-        pattern = r'\*\*\s*File:\s*([^*]+?)\s*\*\*\s*```(?:python)?\n(.*?)```'
-        matches = re.findall(pattern, text, re.DOTALL | re.IGNORECASE)
-        
-        for filename, code in matches:
-            filename = filename.strip()
+        for header_end, filename in index.headers:
+            block = index.block_after(header_end)
+            if block is None or index.text[header_end:block[0]].strip():
+                continue
+            
             # Remove any file_X_ prefix that Claude might add
-            clean_filename = re.sub(r'^file_\d+_', '', filename)
+            clean_filename = re.sub(r'^file_\d+_', '', filename.strip())
             
             file_path = codebase_path / clean_filename
             if file_path.exists():
-                if file_path not in file_fixes:
-                    file_fixes[file_path] = []
-                
-                file_fixes[file_path].append({
+                file_fixes.setdefault(file_path, []).append({
                     "type": "code_replacement",
-                    "new_code": code.strip(),
+                    "new_code": block[1].strip(),
                     "description": f"Fix from explicit header for {clean_filename}",
                     "method": "explicit_header"
                 })
         
         return file_fixes
     
-    def _parse_filename_with_codeblocks(self, text: str, codebase_path: Path) -> Dict[Path, List[Dict]]:
+    def _parse_filename_with_codeblocks(self, index: "FixTextIndex", symbols: SymbolIndex) -> Dict[Path, List[Dict]]:
         """
         Find filenames mentioned near code blocks
         """
         file_fixes = {}
         
-        # Find all Python files in the codebase
-        py_files = list(codebase_path.glob("*.py"))
-        
-        for py_file in py_files:
-            filename = py_file.name
-            
-            # Look for mentions of this file near code blocks
-            file_pattern = re.escape(filename)
-            
-            # Find all positions where the file is mentioned
-            file_mentions = []
-            for match in re.finditer(file_pattern, text, re.IGNORECASE):
-                file_mentions.append(match.start())
-            
-            if not file_mentions:
+        for file_pos, mention in index.mentions:
+            py_file = symbols.file_named(mention)
+            if py_file is None:
                 continue
             
-            # Find all code blocks
-            code_blocks = []
-            for match in re.finditer(r'```(?:python)?\n(.*?)```', text, re.DOTALL):
-                code_blocks.append((match.start(), match.end(), match.group(1).strip()))
-            
-            # Match file mentions to nearby code blocks
-            for file_pos in file_mentions:
-                for code_start, code_end, code in code_blocks:
-                    # If file mention is within 500 chars of code block
-                    if abs(file_pos - code_start) < 500:
-                        if py_file not in file_fixes:
-                            file_fixes[py_file] = []
-                        
-                        file_fixes[py_file].append({
-                            "type": "code_replacement",
-                            "new_code": code,
-                            "description": f"Fix near filename mention for {filename}",
-                            "method": "filename_proximity"
-                        })
-                        break
+            # First code block starting within 500 chars of the mention
+            block = index.block_near(file_pos, 500)
+            if block is not None:
+                file_fixes.setdefault(py_file, []).append({
+                    "type": "code_replacement",
+                    "new_code": block[1].strip(),
+                    "description": f"Fix near filename mention for {py_file.name}",
+                    "method": "filename_proximity"
+                })
         
         return file_fixes
     
-    def _parse_function_fixes(self, text: str, codebase_path: Path) -> Dict[Path, List[Dict]]:
+    def _parse_function_fixes(self, index: "FixTextIndex", codebase_path: Path) -> Dict[Path, List[Dict]]:
         """
         Parse function-specific fixes and match to files containing those functions
         """
         file_fixes = {}
         
-        # Find function definitions in code blocks
-        code_blocks = re.findall(r'```(?:python)?\n(.*?)```', text, re.DOTALL)
-        
-        for code in code_blocks:
+        for _, code in index.blocks:
             # Find function names in the code
             func_matches = re.findall(r'def\s+(\w+)\s*\(', code)
             class_matches = re.findall(r'class\s+(\w+)\s*[\(:]', code)
             
-            all_names = func_matches + class_matches
-            
-            for name in all_names:
+            for name in func_matches + class_matches:
                 # Find which files contain this function/class
-                matching_files = self._find_files_with_name(name, codebase_path)
-                
-                for file_path in matching_files:
-                    if file_path not in file_fixes:
-                        file_fixes[file_path] = []
-                    
-                    file_fixes[file_path].append({
+                for file_path in self._find_files_with_name(name, codebase_path):
+                    file_fixes.setdefault(file_path, []).append({
                         "type": "function_replacement",
                         "new_code": code.strip(),
                         "target_name": name,
@@ -247,29 +362,23 @@ class EnhancedCodeFileEditor:
         
         return file_fixes
     
-    def _parse_file_mentions(self, text: str, codebase_path: Path) -> Dict[Path, List[Dict]]:
+    def _parse_file_mentions(self, index: "FixTextIndex", codebase_path: Path) -> Dict[Path, List[Dict]]:
         """
-        Parse patterns like "In file X" or "File X contains"
+        Parse patterns like "In file X" or "Fix for X" on the line that opens a code block
         """
         file_fixes = {}
         
-        # Patterns for file mentions
-        patterns = [
-            r'(?:In|File)\s+([\w_]+\.py)[^\n]*?```(?:python)?\n(.*?)```',
-            r'([\w_]+\.py)[^\n]*?(?:should be|needs to be|fix)[^\n]*?```(?:python)?\n(.*?)```',
-            r'(?:Fix for|Update)\s+([\w_]+\.py)[^\n]*?```(?:python)?\n(.*?)```'
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.DOTALL | re.IGNORECASE)
-            
-            for filename, code in matches:
+        for block_start, code in index.blocks:
+            line = index.text[index.text.rfind("\n", 0, block_start) + 1:block_start]
+            for pattern in FILE_MENTION_PATTERNS:
+                match = pattern.search(line)
+                if not match:
+                    continue
+                
+                filename = match.group(1)
                 file_path = codebase_path / filename
                 if file_path.exists():
-                    if file_path not in file_fixes:
-                        file_fixes[file_path] = []
-                    
-                    file_fixes[file_path].append({
+                    file_fixes.setdefault(file_path, []).append({
                         "type": "code_replacement",
                         "new_code": code.strip(),
                         "description": f"Fix from file mention for {filename}",
@@ -278,24 +387,20 @@ class EnhancedCodeFileEditor:
         
         return file_fixes
     
+    def _indexed_spans(self, file_path: Path, content: str) -> Optional[Spans]:
+        """
+        Definition spans of a file from the symbol index when its content is unchanged
+        """
+        index = self._symbol_index
+        if index is not None and index.content_hash(file_path) == hashlib.sha256(content.encode('utf-8')).hexdigest():
+            return index.spans(file_path)
+        return _parse_spans(content)
+    
     def _find_files_with_name(self, name: str, codebase_path: Path) -> List[Path]:
         """
         Find files that contain a specific function or class name
         """
-        matching_files = []
-        
-        for py_file in codebase_path.glob("*.py"):
-            try:
-                with open(py_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    
-                # Look for function or class definitions
-                if re.search(rf'(?:def|class)\s+{re.escape(name)}\s*[\(:]', content):
-                    matching_files.append(py_file)
-            except Exception:
-                continue
-        
-        return matching_files
+        return self._codebase_index(codebase_path).files_defining(name)
     
     def _apply_fixes_to_file(self, file_path: Path, fixes: List[Dict], results: Dict):
         """
@@ -315,14 +420,21 @@ class EnhancedCodeFileEditor:
         
         modified_content = original_content
         fixes_applied_to_file = []
+        # Taken from the symbol index (or parsed once); each applied fix is
+        # re-parsed to validate it, and that parse is what the next fix uses
+        spans = self._indexed_spans(file_path, original_content)
         
         for i, fix in enumerate(fixes, 1):
             print(f"  🔧 Applying fix {i}/{len(fixes)}: {fix['method']}")
             
             try:
-                new_content = self._apply_single_fix(modified_content, fix, file_path)
+                new_content = self._apply_single_fix(modified_content, fix, file_path, spans)
                 if new_content != modified_content:
-                    modified_content = new_content
+                    new_spans = _parse_spans(new_content)
+                    if spans is not None and new_spans is None:
+                        print(f"     ❌ Skipped: fix would leave the file unparseable")
+                        continue
+                    modified_content, spans = new_content, new_spans
                     fixes_applied_to_file.append(fix["description"])
                     print(f"     ✓ Applied: {fix['description']}")
                 else:
@@ -341,35 +453,38 @@ class EnhancedCodeFileEditor:
         else:
             print(f"  ℹ️  No changes made to file")
     
-    def _apply_single_fix(self, content: str, fix: Dict, file_path: Path) -> str:
+    def _apply_single_fix(self, content: str, fix: Dict, file_path: Path, spans: Optional[Spans] = None) -> str:
         """
         Apply a single fix to content with multiple strategies
+        
+        Definitions in the fix replace the same-named definitions in the file
+        by line span (decorators, methods and nested defs included); a class
+        missing some of the original's methods is spliced method by method. A
+        fix that redefines every top-level definition and keeps the module's
+        imports and assignments replaces the whole file; import blocks replace
+        the imports; only new definitions are appended.
         """
         new_code = fix["new_code"]
-        
-        if fix["type"] == "function_replacement" and "target_name" in fix:
-            # Replace specific function/class
-            target_name = fix["target_name"]
+        if spans is None:
+            spans = _parse_spans(content)
+        code = _dedent(new_code)
+        code_spans = _parse_spans(code)
+        
+        if spans is not None and code_spans is not None:
+            if fix["type"] == "function_replacement" and "target_name" in fix:
+                names = [fix["target_name"]]
+            else:
+                top_level = {name for name in spans if "." not in name}
+                names = [name for name in code_spans if "." not in name]
+                if top_level and top_level <= set(names) and _module_statements(content) <= _module_statements(code):
+                    # Complete fixed version of the file
+                    return code if code.endswith("\n") else code + "\n"
             
-            # Try to replace the function
-            pattern = rf'((?:def|class)\s+{re.escape(target_name)}\s*[\(:].*?)(?=\n(?:def|class|\Z))'
-            
-            if re.search(pattern, content, re.DOTALL):
-                return re.sub(pattern, new_code, content, flags=re.DOTALL)
+            replaced = self._splice_definitions(content, spans, code, code_spans, names)
+            if replaced is not None:
+                return replaced
         
-        elif fix["type"] == "code_replacement":
-            # Multiple strategies for code replacement
-            
-            # Strategy 1: If new code contains function/class, replace existing one
-            func_matches = re.findall(r'def\s+(\w+)\s*\(', new_code)
-            class_matches = re.findall(r'class\s+(\w+)\s*[\(:]', new_code)
-            
-            for name in func_matches + class_matches:
-                pattern = rf'((?:def|class)\s+{re.escape(name)}\s*[\(:].*?)(?=\n(?:def|class|\Z))'
-                if re.search(pattern, content, re.DOTALL):
-                    return re.sub(pattern, new_code, content, flags=re.DOTALL)
-            
-            # Strategy 2: Look for similar code patterns
+        if fix["type"] == "code_replacement":
             # If new code has imports, try to replace imports section
             if new_code.strip().startswith('import ') or new_code.strip().startswith('from '):
                 lines = content.split('\n')
@@ -393,8 +508,75 @@ class EnhancedCodeFileEditor:
                 if imports_added:
                     return '\n'.join(new_lines)
         
-        # Fallback: Append at end with clear marker
-        return content + f"\n\n# === CLAUDE GENERATED FIX ({fix['method']}) ===\n" + new_code + "\n# === END CLAUDE FIX ===\n"
+        # Fallback: definitions the file does not have yet go at the end with a clear marker
+        if code_spans and not any(_resolve_target(spans or {}, name) for name in code_spans if "." not in name):
+            return content + f"\n\n# === CLAUDE GENERATED FIX ({fix['method']}) ===\n" + code + "\n# === END CLAUDE FIX ===\n"
+        
+        return content
+    
+    def _splice_definitions(
+        self,
+        content: str,
+        spans: Spans,
+        code: str,
+        code_spans: Spans,
+        names: List[str]
+    ) -> Optional[str]:
+        """
+        Replace the named definitions of content with their versions from code,
+        re-indented to the original's level; None when none of them match
+        
+        A class in code that lacks some of the original's members (usually
+        just the fixed method) is spliced member by member, its new members
+        going after the original class body.
+        """
+        lines = content.splitlines(keepends=True)
+        code_lines = code.splitlines(keepends=True)
+        
+        # (start, end) -> block; an insertion after line n is keyed (n + 1, n)
+        splices: Dict[Tuple[int, int], str] = {}
+        
+        def block_for(source: str, indent: str) -> str:
+            start, end = code_spans[source]
+            block = textwrap.indent(_dedent("".join(code_lines[start - 1:end])), indent)
+            return block if block.endswith("\n") else block + "\n"
+        
+        def indent_of(line_number: int) -> str:
+            line = lines[line_number - 1]
+            return line[:len(line) - len(line.lstrip())]
+        
+        def splice(target: str, source: str) -> None:
+            span = spans[target]
+            if any(start <= span[1] and span[0] <= end for start, end in splices):
+                return
+            original_members = _direct_members(spans, target)
+            fixed_members = _direct_members(code_spans, source)
+            if _is_class(lines, span) and set(original_members) - set(fixed_members):
+                member_indent = indent_of(spans[f"{target}.{original_members[0]}"][0])
+                added = []
+                for member in fixed_members:
+                    if member in original_members:
+                        splice(f"{target}.{member}", f"{source}.{member}")
+                    else:
+                        added.append(block_for(f"{source}.{member}", member_indent))
+                if added:
+                    splices[(span[1] + 1, span[1])] = "\n" + "\n".join(added)
+                return
+            splices[span] = block_for(source, indent_of(span[0]))
+        
+        for name in names:
+            target = _resolve_name(spans, name)
+            source = _resolve_name(code_spans, name)
+            if target is not None and source is not None:
+                splice(target, source)
+        
+        if not splices:
+            return None
+        
+        # Bottom-up, so earlier spans keep their line numbers
+        for (start, end), block in sorted(splices.items(), reverse=True):
+            lines[start - 1:end] = [block]
+        return "".join(lines)
 
 
 def apply_fixes_to_files(report_file: str, codebase_path: str):
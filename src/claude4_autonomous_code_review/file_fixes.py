@@ -0,0 +1,158 @@
+"""
+Per-file fix generation: one request per affected file, run through a worker pool
+
+Each request carries the findings for one file plus that file's source and
+asks for the complete fixed file, so responses stay well under the output
+limit and the slowest file no longer holds up all the others. Replies are
+joined into the `applied_fixes.generated_fixes` text the file editors parse.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from claude4_client import Claude4Client, message_text
+from config import MAX_PARALLEL_REQUESTS
+from cost_meter import CostMeter
+from findings import Finding
+from rate_limiter import RateLimiter
+from symbol_index import SymbolIndex
+from targeted_fixes import resolve_file
+
+FILE_FIX_PROMPT = """Based on the review findings below, generate specific code fixes for {file}.
+
+HUMAN APPROVAL:
+- Reviewer: {reviewer}
+- Priority: {priority}
+- Notes: {notes}
+
+FINDINGS TO ADDRESS:
+{issues}
+
+CURRENT SOURCE OF {file}:
+```python
+{source}
+```
+
+Reply in this EXACT format:
+
+**File: {file}**
+```python
+# Complete fixed version of the code
+# Include all necessary imports
+# Fix all identified issues
+```
+
+Provide the complete file contents, not just snippets."""
+
+UNPLACED_FIX_PROMPT = """Based on the review findings below, generate specific code fixes.
+
+HUMAN APPROVAL:
+- Reviewer: {reviewer}
+- Priority: {priority}
+- Notes: {notes}
+
+FINDINGS TO ADDRESS:
+{issues}
+
+Generate fixes in this EXACT format for each file:
+
+**File: filename.py**
+```python
+# Complete fixed version of the code
+```
+
+Provide complete file contents, not just snippets."""
+
+
+def group_by_file(findings: List[Finding], codebase_path: Path) -> Dict[Optional[Path], List[Finding]]:
+    """
+    Findings keyed by the source file they refer to (None when it cannot be found)
+    """
+    groups: Dict[Optional[Path], List[Finding]] = {}
+    index = SymbolIndex.open(codebase_path)
+    for finding in findings:
+        groups.setdefault(resolve_file(finding.file, index), []).append(finding)
+    return groups
+
+
+def request_file_fix(
+    client: Claude4Client,
+    file_path: Optional[Path],
+    findings: List[Finding],
+    codebase_path: Path,
+    decisions: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Fix request for one file (or for the findings no file could be found for)
+    """
+    fields = {
+        "reviewer": decisions.get("reviewer_name", ""),
+        "priority": decisions.get("priority_focus", ""),
+        "notes": decisions.get("notes", ""),
+        "issues": "\n\n".join(finding.to_block() for finding in findings)
+    }
+    if file_path is None:
+        prompt = UNPLACED_FIX_PROMPT.format(**fields)
+        label = None
+    else:
+        label = file_path.relative_to(codebase_path).as_posix()
+        source = file_path.read_text(encoding='utf-8', errors='ignore')
+        prompt = FILE_FIX_PROMPT.format(file=label, source=source.rstrip("\n"), **fields)
+    
+    message = client.create_independent_message(prompt)
+    # A reply cut off at max_tokens would overwrite the file with half of it
+    if message.stop_reason == "max_tokens":
+        raise ValueError("response truncated at max_tokens")
+    
+    return {
+        "file": label,
+        "findings": len(findings),
+        "text": message_text(message),
+        "input_tokens": message.usage.input_tokens,
+        "output_tokens": message.usage.output_tokens
+    }
+
+
+def generate_file_fixes(
+    findings: List[Finding],
+    codebase_path: Path,
+    decisions: Dict[str, Any],
+    use_production_model: bool = False,
+    max_workers: int = MAX_PARALLEL_REQUESTS,
+    rate_limiter: Optional[RateLimiter] = None,
+    cost_meter: Optional[CostMeter] = None
+) -> Dict[str, Any]:
+    """
+    Generate complete fixed files, one request per file, in parallel
+    """
+    codebase_path = Path(codebase_path)
+    groups = group_by_file(findings, codebase_path)
+    print(f"🗂️  {len(groups)} fix requests for {len(findings)} findings (≤ {max_workers} at a time)")
+    
+    client = Claude4Client(use_production_model, rate_limiter=rate_limiter, cost_meter=cost_meter)
+    replies, failed = [], []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(groups) or 1))) as executor:
+        futures = {
+            executor.submit(request_file_fix, client, file_path, group, codebase_path, decisions): file_path
+            for file_path, group in groups.items()
+        }
+        for future in as_completed(futures):
+            file_path = futures[future]
+            label = file_path.relative_to(codebase_path).as_posix() if file_path else "(unlocated findings)"
+            try:
+                replies.append(future.result())
+                print(f"✓ {label}")
+            except Exception as e:
+                failed.append({"file": label, "error": str(e)})
+                print(f"✗ {label} - {e}")
+    
+    # Stable order regardless of completion order; unlocated findings last
+    replies.sort(key=lambda reply: (reply["file"] is None, reply["file"] or ""))
+    return {
+        "model": client.model,
+        "generated_fixes": "\n\n".join(reply["text"] for reply in replies),
+        "files": [reply["file"] for reply in replies if reply["file"]],
+        "failed": failed,
+        "input_tokens": sum(reply["input_tokens"] for reply in replies),
+        "output_tokens": sum(reply["output_tokens"] for reply in replies)
+    }
@@ -0,0 +1,280 @@
+"""
+Structured findings parsed from the `## Issue:` blocks of review responses
+
+Each block becomes a compact Finding record; FindingsStore keeps them with
+indexes by file, severity and type so the viewer, markdown report and fix
+generation can select findings without re-parsing the raw responses.
+
+In structured mode the model reports findings through the FINDINGS_TOOL
+schema instead, and the tool input is read directly with no text parsing.
+"""
+import re
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from incremental import CHUNK_SUFFIX, ISSUE_HEADER, UPLOAD_PREFIX, file_lookup, report_path, split_issue_blocks
+
+SEVERITY_ORDER = ("Critical", "High", "Medium", "Low")
+FIELD = re.compile(r'^[ \t]*[-*]?[ \t]*\*\*([A-Za-z][A-Za-z ]*?):?\*\*:?[ \t]*(.*)$')
+LINE_RANGE = re.compile(r'\blines?\s+(\d+)(?:\s*[-–]\s*(\d+))?', re.IGNORECASE)
+
+FINDINGS_TOOL = {
+    "name": "report_findings",
+    "description": "Report every code review issue found in this iteration.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "findings": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "title": {"type": "string", "description": "Short issue title"},
+                        "type": {"type": "string", "description": "Security, Performance, Bug, Quality, ..."},
+                        "severity": {"type": "string", "enum": list(SEVERITY_ORDER)},
+                        "file": {"type": "string", "description": "File name as shown in the file headers"},
+                        "location": {"type": "string", "description": "Function or class name"},
+                        "start_line": {"type": "integer"},
+                        "end_line": {"type": "integer"},
+                        "description": {"type": "string"},
+                        "impact": {"type": "string"},
+                        "recommendation": {"type": "string"}
+                    },
+                    "required": ["title", "type", "severity", "file", "description", "recommendation"]
+                }
+            }
+        },
+        "required": ["findings"]
+    }
+}
+
+
+@dataclass(slots=True)
+class Finding:
+    """One reported issue"""
+    title: str
+    type: str
+    severity: str
+    file: str
+    location: str
+    description: str
+    impact: str
+    recommendation: str
+    iteration: int = 0
+    start_line: Optional[int] = None
+    end_line: Optional[int] = None
+    # Every iteration that reported this issue (filled in by dedup.dedupe_findings)
+    iterations: List[int] = field(default_factory=list)
+    # "review" for model findings, "static" for static_analysis findings
+    source: str = "review"
+
+    def to_block(self) -> str:
+        """Render back to the `## Issue:` format used in prompts and reports"""
+        location = self.location
+        if self.start_line and not LINE_RANGE.search(location):
+            lines = f"lines {self.start_line}-{self.end_line or self.start_line}"
+            location = f"{location} ({lines})" if location else lines
+        return "\n".join([
+            f"## Issue: {self.title}",
+            f"- **Type**: {self.type}",
+            f"- **Severity**: {self.severity}",
+            f"- **File**: {self.file}",
+            f"- **Location**: {location}",
+            f"- **Description**: {self.description}",
+            f"- **Impact**: {self.impact}",
+            f"- **Recommendation**: {self.recommendation}"
+        ])
+
+
+def normalize_severity(value: str) -> str:
+    """Map free-form severity text onto SEVERITY_ORDER (unknown stays as written)"""
+    lowered = value.lower()
+    for level in SEVERITY_ORDER:
+        if level.lower() in lowered:
+            return level
+    return value.strip() or "Unknown"
+
+
+def normalize_file_name(value: str) -> str:
+    """Bare file name from a **File** value, without upload ids or chunk labels"""
+    name = CHUNK_SUFFIX.sub("", value.strip().strip("`").strip())
+    return UPLOAD_PREFIX.sub("", Path(name).name)
+
+
+def parse_issue_block(block: str, iteration: int = 0, lookup: Optional[Dict[str, str]] = None) -> Optional[Finding]:
+    """
+    Parse one `## Issue:` block; fields may span several lines
+    
+    lookup (from incremental.file_lookup) maps reported file names to
+    report paths (relative to the codebase).
+    """
+    lines = block.strip().splitlines()
+    if not lines or not ISSUE_HEADER.match(lines[0]):
+        return None
+    
+    fields: Dict[str, List[str]] = {}
+    current = None
+    for line in lines[1:]:
+        match = FIELD.match(line)
+        if match:
+            current = match.group(1).strip().lower()
+            fields[current] = [match.group(2).strip()]
+        elif current and line.strip():
+            fields[current].append(line.strip())
+    
+    def field(name: str) -> str:
+        return " ".join(fields.get(name, [])).strip()
+    
+    line_range = LINE_RANGE.search(field("location"))
+    return Finding(
+        title=lines[0].split("Issue:", 1)[-1].strip(),
+        type=field("type") or "Unknown",
+        severity=normalize_severity(field("severity")),
+        file=report_path(field("file"), lookup or {}),
+        location=field("location"),
+        description=field("description"),
+        impact=field("impact"),
+        recommendation=field("recommendation"),
+        iteration=iteration,
+        start_line=int(line_range.group(1)) if line_range else None,
+        end_line=int(line_range.group(2) or line_range.group(1)) if line_range else None
+    )
+
+
+def tool_findings(content: Iterable[Any]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Raw finding records from FINDINGS_TOOL calls in a message's content,
+    or None if the message did not call the tool
+    """
+    records = None
+    for block in content:
+        block = block.model_dump() if hasattr(block, "model_dump") else block
+        if block.get("type") == "tool_use" and block.get("name") == FINDINGS_TOOL["name"]:
+            records = (records or []) + list((block.get("input") or {}).get("findings", []))
+    return records
+
+
+def finding_from_record(record: Dict[str, Any], iteration: int = 0, lookup: Optional[Dict[str, str]] = None) -> Finding:
+    """Finding from one FINDINGS_TOOL record (missing optional fields become empty)"""
+    
+    def line(key: str) -> Optional[int]:
+        try:
+            return int(record[key]) if record.get(key) is not None else None
+        except (TypeError, ValueError):
+            return None
+    
+    start_line = line("start_line")
+    return Finding(
+        title=str(record.get("title", "")).strip(),
+        type=str(record.get("type", "")).strip() or "Unknown",
+        severity=normalize_severity(str(record.get("severity", ""))),
+        file=report_path(str(record.get("file", "")), lookup or {}),
+        location=str(record.get("location", "")).strip(),
+        description=str(record.get("description", "")).strip(),
+        impact=str(record.get("impact", "")).strip(),
+        recommendation=str(record.get("recommendation", "")).strip(),
+        iteration=iteration,
+        start_line=start_line,
+        end_line=line("end_line") or start_line
+    )
+
+
+def render_records(records: List[Dict[str, Any]]) -> str:
+    """FINDINGS_TOOL records as `## Issue:` text (for reports and history summaries)"""
+    return "\n\n".join(finding_from_record(record).to_block() for record in records)
+
+
+def parse_findings(text: str, iteration: int = 0, lookup: Optional[Dict[str, str]] = None) -> List[Finding]:
+    """All findings in a response"""
+    findings = []
+    for block in split_issue_blocks(text):
+        finding = parse_issue_block(block, iteration, lookup)
+        if finding:
+            findings.append(finding)
+    return findings
+
+
+class FindingsStore:
+    """
+    Findings with indexes by file, severity and type
+    """
+    
+    def __init__(self, findings: Iterable[Finding] = ()):
+        self.findings: List[Finding] = []
+        self.by_file: Dict[str, List[Finding]] = {}
+        self.by_severity: Dict[str, List[Finding]] = {}
+        self.by_type: Dict[str, List[Finding]] = {}
+        for finding in findings:
+            self.add(finding)
+    
+    @classmethod
+    def from_iterations(cls, iterations_detail: List[Dict[str, Any]], rel_paths: List[str]) -> "FindingsStore":
+        """Parse every iteration response, attributing files to report paths"""
+        lookup = file_lookup(rel_paths)
+        
+        store = cls()
+        for iteration in iterations_detail:
+            number = iteration.get("iteration", 0)
+            if "structured_findings" in iteration:
+                findings = [finding_from_record(r, number, lookup) for r in iteration["structured_findings"]]
+            else:
+                findings = parse_findings(iteration.get("response", ""), number, lookup)
+            for finding in findings:
+                store.add(finding)
+        return store
+    
+    @classmethod
+    def from_list(cls, records: List[Dict[str, Any]]) -> "FindingsStore":
+        """Load the `findings` list of a JSON report"""
+        return cls(Finding(**record) for record in records)
+    
+    def add(self, finding: Finding) -> None:
+        self.findings.append(finding)
+        self.by_file.setdefault(finding.file, []).append(finding)
+        self.by_severity.setdefault(finding.severity, []).append(finding)
+        self.by_type.setdefault(finding.type, []).append(finding)
+    
+    def query(
+        self,
+        file: Optional[str] = None,
+        severity: Optional[str] = None,
+        type: Optional[str] = None
+    ) -> List[Finding]:
+        """Findings matching every given criterion, in insertion order"""
+        candidates = self.findings
+        for index, key in ((self.by_file, file), (self.by_severity, severity), (self.by_type, type)):
+            if key is not None:
+                selected = {id(finding) for finding in index.get(key, [])}
+                candidates = [finding for finding in candidates if id(finding) in selected]
+        return candidates
+    
+    def at_least(self, severity: str) -> List[Finding]:
+        """Findings at or above a severity level (all findings for an unknown level)"""
+        if severity not in SEVERITY_ORDER:
+            return list(self.findings)
+        levels = SEVERITY_ORDER[:SEVERITY_ORDER.index(severity) + 1]
+        return [finding for finding in self.findings if finding.severity in levels]
+    
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Counts per severity, type and file for the JSON report"""
+        return {
+            "by_severity": {
+                level: len(self.by_severity[level])
+                for level in sorted(self.by_severity, key=severity_rank)
+            },
+            "by_type": dict(Counter(finding.type for finding in self.findings).most_common()),
+            "by_file": {path: len(items) for path, items in sorted(self.by_file.items())}
+        }
+    
+    def to_list(self) -> List[Dict[str, Any]]:
+        return [asdict(finding) for finding in self.findings]
+    
+    def __len__(self) -> int:
+        return len(self.findings)
+
+
+def severity_rank(severity: str) -> int:
+    """Sort key: Critical first, unknown levels last"""
+    return SEVERITY_ORDER.index(severity) if severity in SEVERITY_ORDER else len(SEVERITY_ORDER)
@@ -0,0 +1,110 @@
+"""
+Bounded conversation history for long iterative sessions
+
+The full session_context is kept for the record, but each request only
+sends the first file-context turn, an extractive summary of the findings
+from older turns, and the last N turns verbatim.
+"""
+import re
+from typing import Any, Dict, List, Tuple
+
+from context_packer import estimate_tokens
+from findings import render_records, tool_findings
+from incremental import split_issue_blocks
+
+FIELD_LINE = re.compile(r'\*\*(Severity|File|Location)\*\*:\s*(.+)')
+
+
+def content_text(content: Any) -> str:
+    """
+    Plain text of a message's content (string or list of content blocks);
+    structured findings tool calls are rendered as `## Issue:` text
+    """
+    if isinstance(content, str):
+        return content
+    
+    parts = []
+    for block in content:
+        records = tool_findings([block])
+        if records is not None:
+            parts.append(render_records(records))
+        elif isinstance(block, dict):
+            parts.append(block.get("text", "") or "")
+        else:
+            parts.append(getattr(block, "text", "") or "")
+    return "".join(parts)
+
+
+def _without_tool_results(message: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Drop tool_result blocks whose tool_use turn was compacted away
+    """
+    content = message["content"]
+    if isinstance(content, str):
+        return message
+    kept = [block for block in content if not (isinstance(block, dict) and block.get("type") == "tool_result")]
+    return {"role": message["role"], "content": kept}
+
+
+def summarize_issue(block: str) -> str:
+    """
+    One-line summary of an issue block: severity, title, file and location
+    """
+    title = block.splitlines()[0].split("Issue:", 1)[-1].strip()
+    fields = {name: value.strip() for name, value in FIELD_LINE.findall(block)}
+    where = ", ".join(v for v in (fields.get("File"), fields.get("Location")) if v)
+    return f"[{fields.get('Severity', '?')}] {title}" + (f" ({where})" if where else "")
+
+
+def summarize_findings(replies: List[str]) -> str:
+    """
+    One line per issue block across the given replies
+    """
+    lines = [f"- {summarize_issue(block)}" for reply in replies for block in split_issue_blocks(reply)]
+    
+    if not lines:
+        return "Earlier iterations reported no structured issues."
+    return "Summary of issues already reported in earlier iterations (do not repeat them):\n" + "\n".join(lines)
+
+
+def compact_history(
+    session_context: List[Dict[str, Any]],
+    keep_turns: int
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Build the message list to send for the next request
+    
+    session_context must end with the pending user instruction. Returns the
+    compacted messages and token estimates for the full vs sent history.
+    """
+    full_tokens = sum(estimate_tokens(content_text(m["content"])) for m in session_context)
+    
+    # [user0, assistant0, user1, assistant1, ..., pending user]
+    completed_turns = (len(session_context) - 1) // 2
+    if completed_turns <= keep_turns + 1:
+        return session_context, {
+            "full_history_tokens": full_tokens,
+            "sent_history_tokens": full_tokens,
+            "saved_tokens": 0
+        }
+    
+    first_user = session_context[0]
+    recent = session_context[-(2 * keep_turns + 1):]
+    older_replies = [
+        content_text(m["content"])
+        for m in session_context[1:len(session_context) - len(recent)]
+        if m["role"] == "assistant"
+    ]
+    
+    messages = [
+        first_user,
+        {"role": "assistant", "content": summarize_findings(older_replies)},
+        _without_tool_results(recent[0]),
+        *recent[1:]
+    ]
+    sent_tokens = sum(estimate_tokens(content_text(m["content"])) for m in messages)
+    return messages, {
+        "full_history_tokens": full_tokens,
+        "sent_history_tokens": sent_tokens,
+        "saved_tokens": full_tokens - sent_tokens
+    }
@@ -0,0 +1,214 @@
+"""
+Incremental review support: per-file content hashes, change detection
+against the previous report, and carry-over of findings for unchanged files
+"""
+import ast
+import hashlib
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+ISSUE_HEADER = re.compile(r'(?m)^[ \t]*#{2,3}\s*Issue:')
+FILE_LINE = re.compile(r'\*\*File\*\*:\s*`?([^`\n]+?)`?\s*$', re.MULTILINE)
+# Upload ids (file_3_name.py) and chunk labels (name.py (lines 1-80)) echoed back as file names
+UPLOAD_PREFIX = re.compile(r'^file_\d+_')
+CHUNK_SUFFIX = re.compile(r'\s*\(lines \d+-\d+\)$')
+
+
+def relative_name(file_path: Path, codebase_path: Path) -> str:
+    """Stable report key for a file: POSIX path relative to the codebase"""
+    return Path(file_path).relative_to(codebase_path).as_posix()
+
+
+def file_lookup(rel_paths: Iterable[str]) -> Dict[str, str]:
+    """
+    Reported file name -> report path: every relative path, plus the bare
+    name of each file whose name is unique among rel_paths
+    """
+    rel_paths = list(rel_paths)
+    basenames = Counter(Path(rel_path).name for rel_path in rel_paths)
+    lookup = {rel_path: rel_path for rel_path in rel_paths}
+    for rel_path in rel_paths:
+        if basenames[Path(rel_path).name] == 1:
+            lookup.setdefault(Path(rel_path).name, rel_path)
+    return lookup
+
+
+def report_path(value: str, lookup: Dict[str, str]) -> str:
+    """
+    Report path for a **File** value: an exact relative path, a longer path
+    ending in one, or a unique bare name; otherwise the cleaned value
+    """
+    path = CHUNK_SUFFIX.sub("", value.strip().strip("`").strip()).replace("\\", "/")
+    path = UPLOAD_PREFIX.sub("", path[2:] if path.startswith("./") else path)
+    if path in lookup:
+        return lookup[path]
+    suffixes = {rel for rel in lookup.values() if path.endswith(f"/{rel}")}
+    if len(suffixes) == 1:
+        return suffixes.pop()
+    return path
+
+
+def compute_file_hashes(files: List[Path], codebase_path: Path, index: Optional[Any] = None) -> Dict[str, str]:
+    """
+    SHA-256 of each file's bytes, keyed by relative path
+    
+    Hashes already held by a SymbolIndex are reused instead of re-reading the file.
+    """
+    hashes = {}
+    for file_path in files:
+        digest = index.content_hash(file_path) if index is not None else None
+        if digest is None:
+            with open(file_path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+        hashes[relative_name(file_path, codebase_path)] = digest
+    return hashes
+
+
+def find_previous_report(reports_dir: Path, codebase_path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Latest review report for the same codebase that recorded file hashes
+    """
+    target = str(Path(codebase_path).resolve())
+    candidates = sorted(reports_dir.glob("review_*.json"), key=lambda x: x.stat().st_mtime, reverse=True)
+    
+    for json_file in candidates:
+        try:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            continue
+        
+        if "file_hashes" not in report:
+            continue
+        if str(Path(report.get("codebase_path", "")).resolve()) != target:
+            continue
+        
+        report["_report_file"] = json_file.name
+        return report
+    
+    return None
+
+
+def module_names(rel_path: str) -> Set[str]:
+    """Names other files could import this file by (dotted path and its suffixes)"""
+    parts = list(Path(rel_path).with_suffix("").parts)
+    if parts and parts[-1] == "__init__":
+        parts = parts[:-1]
+    return {".".join(parts[i:]) for i in range(len(parts))} if parts else set()
+
+
+def imported_modules(source: str) -> Set[str]:
+    """Module names referenced by import statements (including `from x import y` as x.y)"""
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return set()
+    
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if base:
+                modules.add(base)
+            for alias in node.names:
+                modules.add(f"{base}.{alias.name}" if base else alias.name)
+    return modules
+
+
+def find_direct_importers(changed: Set[str], files: List[Path], codebase_path: Path) -> Set[str]:
+    """
+    Files (relative paths) that directly import any of the changed files
+    """
+    changed_names = set()
+    for rel_path in changed:
+        changed_names |= module_names(rel_path)
+    
+    importers = set()
+    for file_path in files:
+        rel_path = relative_name(file_path, codebase_path)
+        if rel_path in changed:
+            continue
+        source = file_path.read_text(encoding='utf-8', errors='ignore')
+        if imported_modules(source) & changed_names:
+            importers.add(rel_path)
+    return importers
+
+
+def split_issue_blocks(text: str) -> List[str]:
+    """
+    Split a response into its `## Issue:` blocks
+    """
+    starts = [m.start() for m in ISSUE_HEADER.finditer(text)]
+    return [text[start:end].strip() for start, end in zip(starts, starts[1:] + [len(text)])]
+
+
+def attribute_findings(iterations_detail: List[Dict[str, Any]], rel_paths: List[str]) -> Dict[str, List[str]]:
+    """
+    Group issue blocks from all iterations by the file named in their **File** line
+    """
+    lookup = file_lookup(rel_paths)
+    
+    findings: Dict[str, List[str]] = {}
+    for iteration in iterations_detail:
+        for block in split_issue_blocks(iteration.get("response", "")):
+            match = FILE_LINE.search(block)
+            if not match:
+                continue
+            rel_path = report_path(match.group(1), lookup)
+            if rel_path in lookup:
+                findings.setdefault(rel_path, []).append(block)
+    return findings
+
+
+def plan_incremental_review(
+    files: List[Path],
+    codebase_path: Path,
+    previous_report: Optional[Dict[str, Any]],
+    index: Optional[Any] = None
+) -> Dict[str, Any]:
+    """
+    Decide which files need a fresh review and which findings carry over
+    """
+    current_hashes = compute_file_hashes(files, codebase_path, index)
+    
+    if not previous_report:
+        return {
+            "previous_report": None,
+            "file_hashes": current_hashes,
+            "changed": sorted(current_hashes),
+            "importers": [],
+            "carried_over": {},
+            "carried_hashes": {}
+        }
+    
+    previous_hashes = previous_report.get("file_hashes", {})
+    previous_findings = previous_report.get("findings_by_file", {})
+    
+    changed = {rel for rel, digest in current_hashes.items() if previous_hashes.get(rel) != digest}
+    importers = find_direct_importers(changed, files, codebase_path)
+    to_review = changed | importers
+    
+    unchanged = [rel for rel in current_hashes if rel not in to_review]
+    return {
+        "previous_report": previous_report.get("_report_file"),
+        "file_hashes": current_hashes,
+        "changed": sorted(changed),
+        "importers": sorted(importers),
+        "carried_over": {rel: previous_findings.get(rel, []) for rel in unchanged},
+        "carried_hashes": {rel: current_hashes[rel] for rel in unchanged}
+    }
+
+
+def format_carried_findings(carried_over: Dict[str, List[str]], previous_report: str) -> str:
+    """
+    Carried-over findings as a section appended to comprehensive_analysis
+    """
+    blocks = [block for rel in sorted(carried_over) for block in carried_over[rel]]
+    if not blocks:
+        return ""
+    return f"=== CARRIED OVER FROM {previous_report} (unchanged files) ===\n" + "\n\n".join(blocks)
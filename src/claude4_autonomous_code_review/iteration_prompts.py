@@ -114,6 +114,52 @@ ITERATION_PROMPTS = {
     """
 }
 
+OUTPUT_FORMAT = """
+                OUTPUT FORMAT - For each issue provide:
+                ## Issue: [Brief Title]
+                - **Type**: [Security/Performance/Bug/Code Quality]
+                - **Severity**: [Critical/High/Medium/Low]  
+                - **File**: [filename]
+                - **Location**: [line/function]
+                - **Description**: [detailed explanation]
+                - **Impact**: [what could go wrong]
+                - **Recommendation**: [what should be done]
+                """
+
+# Structured mode: findings go through the report_findings tool instead
+STRUCTURED_OUTPUT_FORMAT = """
+                OUTPUT FORMAT - Report every issue through the report_findings tool,
+                using the file name shown in the file headers and the affected line range.
+                """
+
+REVIEW_INSTRUCTIONS = """
+You are an expert code reviewer running a multi-iteration review of the
+uploaded files. Each iteration has its own focus area; report only issues
+you can tie to a concrete file and location.
+"""
+
+# Static instructions shared by every iteration; sent as a cacheable system
+# prompt when prompt caching is enabled
+REVIEW_SYSTEM_PROMPT = REVIEW_INSTRUCTIONS + OUTPUT_FORMAT
+STRUCTURED_SYSTEM_PROMPT = REVIEW_INSTRUCTIONS + STRUCTURED_OUTPUT_FORMAT
+
+FOCUS_AREAS = {
+    1: "Security & Critical Bugs",
+    2: "Performance & Resources",
+    3: "Input Validation & Data Flow",
+    4: "Error Handling & Edge Cases",
+    5: "Architecture & Design",
+    6: "Concurrency & Thread Safety",
+    7: "Configuration & Environment",
+    8: "Integration & API Security",
+    9: "Business Logic & Domain Rules",
+    10: "Comprehensive Risk Assessment"
+}
+
+def get_focus_area(iteration_number: int) -> str:
+    """Get short focus area label for specific iteration"""
+    return FOCUS_AREAS.get(iteration_number, f"Deep Analysis {iteration_number}")
+
 def get_iteration_prompt(iteration_number: int, max_iterations: int) -> str:
     """Get focused prompt for specific iteration"""
     
@@ -0,0 +1,190 @@
+"""
+Rate-limit-aware request scheduling with jittered exponential backoff
+
+The Messages API reports the remaining request and token budgets (and when
+they reset) in anthropic-ratelimit-* response headers. RateLimiter keeps
+the latest values, reserves budget locally before each call so concurrent
+threads don't all spend the same allowance, and makes callers wait for the
+reset instead of running into a 429. Calls that still fail with 429, 529,
+other 5xx or connection errors are retried with backoff.
+"""
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Mapping, Optional, TypeVar
+
+import anthropic
+
+from config import RETRY_BASE_DELAY, RETRY_MAX_ATTEMPTS, RETRY_MAX_DELAY
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {408, 409, 429}
+# Wait this long when a budget is exhausted but the server sent no reset time
+DEFAULT_RESET_SECONDS = 5.0
+BUDGETS = ("requests", "input-tokens", "output-tokens")
+
+
+def _reset_epoch(value: Optional[str]) -> Optional[float]:
+    """Epoch seconds of an RFC 3339 reset header"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """429, 529/5xx, timeouts and connection failures are worth retrying"""
+    if isinstance(error, anthropic.APIConnectionError):
+        return True
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS or error.status_code >= 500
+    return False
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Server-requested delay from a retry-after header, if any"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return max(0.0, float(response.headers.get("retry-after", "")))
+    except ValueError:
+        return None
+
+
+class RateLimiter:
+    """
+    Thread-safe scheduler shared by every client of one review run
+    """
+    
+    def __init__(
+        self,
+        max_attempts: int = RETRY_MAX_ATTEMPTS,
+        base_delay: float = RETRY_BASE_DELAY,
+        max_delay: float = RETRY_MAX_DELAY
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._condition = threading.Condition()
+        # budget name -> {"remaining": int, "limit": int, "reset": epoch seconds}
+        self._budgets: Dict[str, Dict[str, Any]] = {}
+        self.retries = 0
+        self.throttled_seconds = 0.0
+    
+    def call(
+        self,
+        send: Callable[[], T],
+        estimated_input_tokens: int = 0,
+        retryable: Callable[[Exception], bool] = is_retryable
+    ) -> T:
+        """
+        Run send() once the budgets allow it, retrying transient failures
+        """
+        attempt = 0
+        while True:
+            self.acquire(estimated_input_tokens)
+            try:
+                return send()
+            except Exception as e:
+                attempt += 1
+                if not retryable(e) or attempt > self.max_attempts:
+                    raise
+                delay = self.backoff_delay(attempt, retry_after_seconds(e))
+                logger.warning(f"Request failed ({e.__class__.__name__}), retry {attempt}/{self.max_attempts} in {delay:.1f}s")
+                with self._condition:
+                    self.retries += 1
+                    self.throttled_seconds += delay
+                time.sleep(delay)
+    
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Full-jitter exponential backoff, never shorter than retry-after
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+    
+    def acquire(self, estimated_input_tokens: int = 0) -> None:
+        """
+        Block until a request of this size fits the known budgets, then reserve it
+        """
+        with self._condition:
+            while True:
+                wait = self._wait_seconds(estimated_input_tokens)
+                if wait <= 0:
+                    break
+                logger.info(f"Rate limit budget exhausted, waiting {wait:.1f}s")
+                self.throttled_seconds += wait
+                self._condition.wait(timeout=wait)
+            
+            self._reserve("requests", 1)
+            self._reserve("input-tokens", estimated_input_tokens)
+    
+    def update(self, headers: Mapping[str, str]) -> None:
+        """
+        Replace local estimates with the budgets reported by the server
+        """
+        with self._condition:
+            for name in BUDGETS:
+                remaining = headers.get(f"anthropic-ratelimit-{name}-remaining")
+                if remaining is None:
+                    continue
+                try:
+                    self._budgets[name] = {
+                        "remaining": int(remaining),
+                        "limit": int(headers.get(f"anthropic-ratelimit-{name}-limit", 0)) or None,
+                        "reset": _reset_epoch(headers.get(f"anthropic-ratelimit-{name}-reset"))
+                    }
+                except ValueError:
+                    continue
+            self._condition.notify_all()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Counters for the JSON report
+        """
+        with self._condition:
+            return {
+                "retries": self.retries,
+                "throttled_seconds": round(self.throttled_seconds, 2),
+                "budgets": {
+                    name: {"remaining": budget["remaining"], "limit": budget["limit"]}
+                    for name, budget in self._budgets.items()
+                }
+            }
+    
+    def _wait_seconds(self, estimated_input_tokens: int) -> float:
+        """Seconds until the request fits, 0 if it fits now (caller holds the lock)"""
+        now = time.time()
+        needed = {"requests": 1, "input-tokens": estimated_input_tokens, "output-tokens": 1}
+        wait = 0.0
+        for name, amount in needed.items():
+            budget = self._budgets.get(name)
+            if not budget:
+                continue
+            if budget["reset"] is not None and budget["reset"] <= now:
+                # Window has rolled over; trust the server again on the next response
+                del self._budgets[name]
+                continue
+            # A request larger than the whole limit can never fit; let it through
+            if budget["remaining"] >= amount or (budget["limit"] and amount > budget["limit"]):
+                continue
+            if budget["reset"] is None:
+                budget["reset"] = now + DEFAULT_RESET_SECONDS
+            wait = max(wait, budget["reset"] - now)
+        return wait
+    
+    def _reserve(self, name: str, amount: int) -> None:
+        """Spend budget locally until the next response reports the real value"""
+        budget = self._budgets.get(name)
+        if budget:
+            budget["remaining"] -= amount
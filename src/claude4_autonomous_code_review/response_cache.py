@@ -0,0 +1,138 @@
+"""
+Content-addressed on-disk cache for Messages API responses
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from anthropic.types import Message
+
+logger = logging.getLogger(__name__)
+
+
+def to_jsonable(obj: Any) -> Any:
+    """json.dumps fallback for SDK content blocks stored in session_context"""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json", exclude_none=True)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ResponseCache:
+    """
+    Persistent response cache keyed by a hash of the full request.
+    
+    One JSON file per entry; file mtime doubles as the LRU clock, so the
+    least recently used entries are evicted once max_bytes is exceeded.
+    """
+    
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        # key -> size in bytes, oldest first
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        for path in sorted(self.cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime):
+            self._entries[path.stem] = path.stat().st_size
+        self._total_bytes = sum(self._entries.values())
+    
+    @staticmethod
+    def make_key(model: str, temperature: float, max_tokens: int, messages: List[Any], **extra: Any) -> str:
+        """
+        Hash of everything that determines the response
+        """
+        payload = {
+            "model": model,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "messages": messages,
+            **extra
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=to_jsonable, ensure_ascii=False)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[Message]:
+        """
+        Return the cached message (with zeroed usage, since it cost nothing) or None
+        """
+        path = self._path(key)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                os.utime(path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Dropping unreadable cache entry {key}: {e}")
+                self._forget(key)
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+        
+        message = Message.model_validate(data)
+        message.usage.input_tokens = 0
+        message.usage.output_tokens = 0
+        # No prompt-cache write or read happened either
+        message.usage.cache_creation_input_tokens = 0
+        message.usage.cache_read_input_tokens = 0
+        return message
+    
+    def put(self, key: str, message: Message) -> None:
+        """
+        Store a response and evict least recently used entries over the size bound
+        """
+        data = json.dumps(message.model_dump(mode="json"), ensure_ascii=False)
+        path = self._path(key)
+        
+        with self._lock:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            
+            self._forget(key, delete=False)
+            size = path.stat().st_size
+            self._entries[key] = size
+            self._total_bytes += size
+            
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                self._forget(oldest)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Counters for the JSON report
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": len(self._entries),
+            "size_bytes": self._total_bytes
+        }
+    
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+    
+    def _forget(self, key: str, delete: bool = True) -> None:
+        """Drop an entry from the index (caller holds the lock)"""
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+        if delete:
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
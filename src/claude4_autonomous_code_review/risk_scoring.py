@@ -0,0 +1,135 @@
+"""
+Per-file risk scores from cheap local signals
+
+Cyclomatic complexity and dangerous calls come from the file's ast (files
+that do not parse count risky constructs with RISK_PATTERNS instead), size
+from its line count and churn from the local git history (commits touching
+the file in the last RISK_CHURN_DAYS days). Each signal is scaled to 0-1
+against the largest value among the candidates and the weighted sum is the
+file's score, so the ranking is relative to the files being reviewed.
+"""
+import ast
+import logging
+import os
+import re
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from static_analysis import DANGEROUS_CALLS, call_name
+
+logger = logging.getLogger(__name__)
+
+RISK_WEIGHTS = {"complexity": 0.35, "dangerous_calls": 0.35, "churn": 0.2, "size": 0.1}
+RISK_CHURN_DAYS = 180
+
+# Risky constructs counted as dangerous calls in files ast cannot parse
+RISK_PATTERNS = re.compile(
+    r'\beval\s*\(|\bexec\s*\(|pickle\.loads?|yaml\.load\s*\(|shell\s*=\s*True|os\.system|'
+    r'subprocess\.|\bexcept\s*:|password|secret|api_key|SELECT\s.+\sFROM|INSERT\s+INTO',
+    re.IGNORECASE
+)
+
+BRANCH_NODES = (
+    ast.If, ast.IfExp, ast.For, ast.AsyncFor, ast.While, ast.ExceptHandler,
+    ast.With, ast.AsyncWith, ast.Assert, ast.comprehension
+)
+
+
+def cyclomatic_complexity(tree: ast.AST) -> int:
+    """
+    Sum of McCabe complexity over every function (module-level code counts as one)
+    """
+    total = 1
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            total += 1
+        elif isinstance(node, BRANCH_NODES):
+            total += 1 + (len(node.ifs) if isinstance(node, ast.comprehension) else 0)
+        elif isinstance(node, ast.BoolOp):
+            total += len(node.values) - 1
+        elif isinstance(node, ast.match_case):
+            total += 1
+    return total
+
+
+def dangerous_call_count(tree: ast.AST) -> int:
+    """Calls that execute code or commands, or deserialize untrusted data"""
+    count = 0
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        name = call_name(node)
+        shell = any(
+            k.arg == "shell" and isinstance(k.value, ast.Constant) and k.value.value is True
+            for k in node.keywords
+        )
+        if name in DANGEROUS_CALLS or name == "yaml.load" or name.startswith("subprocess.") or shell:
+            count += 1
+    return count
+
+
+def git_churn(files: List[Path], since_days: int = RISK_CHURN_DAYS) -> Dict[Path, int]:
+    """
+    Commits touching each file in the last since_days days (empty outside a git repository)
+    """
+    if not files:
+        return {}
+    resolved = {Path(f).resolve(): Path(f) for f in files}
+    base = Path(os.path.commonpath([str(p.parent) for p in resolved]))
+    try:
+        top = subprocess.run(
+            ["git", "-C", str(base), "rev-parse", "--show-toplevel"],
+            capture_output=True, text=True, timeout=30, check=True
+        ).stdout.strip()
+        log = subprocess.run(
+            ["git", "-C", top, "log", f"--since={since_days} days ago", "--format=", "--name-only",
+             "--", str(base)],
+            capture_output=True, text=True, timeout=60, check=True
+        ).stdout
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.debug(f"No git churn for {base}: {e}")
+        return {}
+    
+    churn: Dict[Path, int] = {}
+    for line in log.splitlines():
+        if not line:
+            continue
+        original = resolved.get((Path(top) / line).resolve())
+        if original is not None:
+            churn[original] = churn.get(original, 0) + 1
+    return churn
+
+
+def file_signals(source: str) -> Dict[str, int]:
+    """Raw complexity, dangerous-call and size signals of one file"""
+    try:
+        tree = ast.parse(source)
+        complexity, dangerous = cyclomatic_complexity(tree), dangerous_call_count(tree)
+    except (SyntaxError, ValueError):
+        # Unparseable files (or other languages) rank by risky constructs, size and churn
+        complexity, dangerous = 1, len(RISK_PATTERNS.findall(source))
+    return {"complexity": complexity, "dangerous_calls": dangerous, "size": len(source.splitlines())}
+
+
+def score_files(sources: Dict[Path, str]) -> Dict[Path, Dict[str, float]]:
+    """
+    Raw signals plus the weighted 0-1 `score` for every file
+    """
+    churn = git_churn(list(sources))
+    signals = {path: {**file_signals(source), "churn": churn.get(path, 0)} for path, source in sources.items()}
+    peaks = {name: max((s[name] for s in signals.values()), default=0) or 1 for name in RISK_WEIGHTS}
+    for values in signals.values():
+        values["score"] = round(sum(
+            weight * values[name] / peaks[name] for name, weight in RISK_WEIGHTS.items()
+        ), 4)
+    return signals
+
+
+def split_by_risk(scores: Dict[Path, Dict[str, float]], files: List[Path], fraction: float) -> Tuple[List[Path], List[Path]]:
+    """
+    The highest-scoring `fraction` of files (at least one) and the rest
+    """
+    ranked = sorted(files, key=lambda p: (-scores.get(p, {}).get("score", 0), str(p)))
+    cut = max(1, round(len(ranked) * fraction)) if ranked else 0
+    return ranked[:cut], ranked[cut:]
@@ -0,0 +1,321 @@
+"""
+Sharded review for codebases larger than one context window
+
+Files are partitioned into context-sized shards that keep import-connected
+files together (a file too big for one shard is spread over several, each
+reviewing a run of its chunks), every shard runs its own iteration loop in
+parallel, and the findings are merged and de-duplicated into a single report.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from clean_review import CleanIterativeReviewer
+from config import CONTEXT_CHUNK_TOKENS, INPUT_TOKEN_BUDGET, MAX_PARALLEL_REQUESTS
+from context_packer import estimate_tokens, split_into_chunks
+from findings import FindingsStore
+from incremental import format_carried_findings, imported_modules, module_names, relative_name
+from iteration_prompts import get_focus_area
+
+
+def build_import_graph(files: List[Path], codebase_path: Path) -> Dict[Path, Set[Path]]:
+    """
+    Undirected graph linking files that import one another
+    """
+    by_module: Dict[str, List[Path]] = {}
+    for file_path in files:
+        for name in module_names(relative_name(file_path, codebase_path)):
+            by_module.setdefault(name, []).append(file_path)
+    
+    graph: Dict[Path, Set[Path]] = {file_path: set() for file_path in files}
+    for file_path in files:
+        source = file_path.read_text(encoding='utf-8', errors='ignore')
+        for module in imported_modules(source):
+            for target in by_module.get(module, []):
+                if target != file_path:
+                    graph[file_path].add(target)
+                    graph[target].add(file_path)
+    return graph
+
+
+def split_oversized(
+    files: List[Path],
+    shard_token_budget: int,
+    chunk_tokens: int,
+    index: Optional[Any] = None
+) -> Tuple[List[Path], List[Tuple[Path, int, int]]]:
+    """
+    Files that fit in one shard, and (path, start_line, end_line) runs of
+    chunks covering every file that does not, each run filling at most one shard
+    
+    chunk_tokens and index must match what pack_files gets, so the runs
+    line up with the chunks it cuts.
+    """
+    fitting, parts = [], []
+    for file_path in files:
+        source = file_path.read_text(encoding='utf-8', errors='ignore')
+        if estimate_tokens(source) <= shard_token_budget:
+            fitting.append(file_path)
+            continue
+        
+        segments = index.segments(file_path) if index is not None else None
+        run, size = None, 0
+        for start, end, text in split_into_chunks(source, chunk_tokens, segments):
+            tokens = estimate_tokens(text)
+            if run and size + tokens > shard_token_budget:
+                parts.append((file_path, *run))
+                run, size = None, 0
+            run = (run[0] if run else start, end)
+            size += tokens
+        if run:
+            parts.append((file_path, *run))
+    return fitting, parts
+
+
+def partition_into_shards(
+    files: List[Path],
+    codebase_path: Path,
+    shard_token_budget: int
+) -> List[List[Path]]:
+    """
+    Group files into shards of at most shard_token_budget estimated tokens,
+    keeping import-connected components together where they fit (files
+    over the budget go through split_oversized first)
+    """
+    tokens = {f: estimate_tokens(f.read_text(encoding='utf-8', errors='ignore')) for f in files}
+    graph = build_import_graph(files, codebase_path)
+    
+    # Connected components in BFS order, so neighbours stay adjacent when split
+    components, seen = [], set()
+    for root in sorted(files, key=str):
+        if root in seen:
+            continue
+        component, queue = [], deque([root])
+        seen.add(root)
+        while queue:
+            node = queue.popleft()
+            component.append(node)
+            for neighbour in sorted(graph[node] - seen, key=str):
+                seen.add(neighbour)
+                queue.append(neighbour)
+        components.append(component)
+    
+    # Oversized components are cut into budget-sized runs
+    groups = []
+    for component in components:
+        group, size = [], 0
+        for file_path in component:
+            if group and size + tokens[file_path] > shard_token_budget:
+                groups.append(group)
+                group, size = [], 0
+            group.append(file_path)
+            size += tokens[file_path]
+        groups.append(group)
+    
+    # First-fit decreasing bin packing of the groups into shards
+    shards: List[Tuple[int, List[Path]]] = []
+    for group in sorted(groups, key=lambda g: -sum(tokens[f] for f in g)):
+        size = sum(tokens[f] for f in group)
+        for index, (used, members) in enumerate(shards):
+            if used + size <= shard_token_budget:
+                shards[index] = (used + size, members + group)
+                break
+        else:
+            shards.append((size, list(group)))
+    
+    return [members for _, members in shards]
+
+
+class ShardedReviewer:
+    """
+    Runs CleanIterativeReviewer's iteration loop per shard and merges the results
+    """
+    
+    def __init__(self, reviewer: CleanIterativeReviewer):
+        self.reviewer = reviewer
+    
+    def run_sharded_review(
+        self,
+        codebase_path: Path,
+        review_goals: str,
+        max_iterations: int = 5,
+        max_workers: int = MAX_PARALLEL_REQUESTS,
+        incremental: bool = False,
+        token_budget: int = INPUT_TOKEN_BUDGET,
+        ranking: str = "risk"
+    ) -> Dict[str, Any]:
+        """
+        Review every shard in parallel and write one merged report
+        """
+        codebase_path = Path(codebase_path)
+        start_time = datetime.now()
+        
+        print(f"🧩 SHARDED CODE REVIEW ({max_iterations} iterations per shard)")
+        print("=" * 50)
+        print(f"📁 Path: {codebase_path}")
+        print(f"🎯 Goals: {review_goals}")
+        print(f"🤖 Model: {self.reviewer.client.model}")
+        print()
+        
+        all_files, plan = self.reviewer.select_files(codebase_path, incremental)
+        files, parts = split_oversized(
+            all_files, token_budget, min(CONTEXT_CHUNK_TOKENS, token_budget), self.reviewer.symbol_index
+        )
+        # (files, line ranges) per shard; a part of an oversized file is a shard of its own
+        shards: List[Tuple[List[Path], Dict[Path, Tuple[int, int]]]] = [
+            (shard, {}) for shard in partition_into_shards(files, codebase_path, token_budget)
+        ]
+        shards += [([path], {path: (start, end)}) for path, start, end in parts]
+        
+        print(f"🧩 {len(all_files)} files -> {len(shards)} shards (≤ ~{token_budget:,} tokens each)")
+        for index, (shard, line_ranges) in enumerate(shards, 1):
+            if line_ranges:
+                start, end = line_ranges[shard[0]]
+                print(f"   Shard {index}: {shard[0].name} lines {start}-{end}")
+            else:
+                print(f"   Shard {index}: {len(shard)} files")
+        
+        def run_shard(index: int, shard: List[Path], line_ranges: Dict[Path, Tuple[int, int]]) -> Dict[str, Any]:
+            reviewer = self.reviewer.spawn()
+            review = reviewer.review_files(
+                shard, review_goals, max_iterations, False, 1, token_budget, ranking, line_ranges=line_ranges
+            )
+            for iteration in review["iterations"]:
+                iteration["shard"] = index
+            review["skipped_focus"] = sorted(reviewer.skipped_focus)
+            if reviewer.adaptive:
+                review["adaptive"] = reviewer.adaptive_stats()
+            return review
+        
+        shard_reviews: Dict[int, Dict[str, Any]] = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(shards) or 1))) as executor:
+            futures = {
+                executor.submit(run_shard, index, shard, line_ranges): index
+                for index, (shard, line_ranges) in enumerate(shards, 1)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    shard_reviews[index] = future.result()
+                    print(f"✓ Shard {index} completed")
+                except Exception as e:
+                    print(f"✗ Shard {index} failed - {e}")
+        
+        merged = self._merge_reviews(shard_reviews, token_budget, ranking)
+        review_results = self.reviewer.build_report(
+            codebase_path, review_goals, max_iterations, merged, start_time, plan
+        )
+        
+        # build_report has already de-duplicated the merged findings; rebuild
+        # the analysis and per-file blocks from them, one section per focus area
+        reviewed = {
+            relative_name(file_path, codebase_path)
+            for file_path in merged["packing"]["complete_files"] + merged["packing"]["partial_files"]
+        }
+        by_iteration: Dict[int, List[str]] = {}
+        findings_by_file = dict(plan["carried_over"]) if plan else {}
+        for finding in FindingsStore.from_list(review_results["findings"]).findings:
+            if finding.source != "review" or finding.iteration == 0:
+                continue
+            by_iteration.setdefault(finding.iteration, []).append(finding.to_block())
+            if finding.file in reviewed:
+                findings_by_file.setdefault(finding.file, []).append(finding.to_block())
+        
+        analysis = "\n\n".join(
+            f"=== ITERATION {number}: {get_focus_area(number)} ===\n" + "\n\n".join(by_iteration[number])
+            for number in sorted(by_iteration)
+        )
+        if plan:
+            carried = format_carried_findings(plan["carried_over"], plan["previous_report"])
+            if carried:
+                analysis = f"{analysis}\n\n{carried}" if analysis else carried
+        
+        review_results["review_type"] = "sharded"
+        review_results["actual_iterations"] = len({iteration["iteration"] for iteration in merged["iterations"]})
+        review_results["comprehensive_analysis"] = analysis
+        review_results["findings_by_file"] = findings_by_file
+        review_results["sharding"] = {
+            "shard_token_budget": token_budget,
+            "shards": [
+                [
+                    relative_name(f, codebase_path) + (" (lines {}-{})".format(*line_ranges[f]) if f in line_ranges else "")
+                    for f in shard
+                ]
+                for shard, line_ranges in shards
+            ],
+            "failed_shards": [i for i in range(1, len(shards) + 1) if i not in shard_reviews]
+        }
+        
+        self.reviewer.save_reports(review_results)
+        return review_results
+    
+    def _merge_reviews(self, shard_reviews: Dict[int, Dict[str, Any]], token_budget: int, ranking: str) -> Dict[str, Any]:
+        """
+        Combine per-shard review_files results into one review
+        
+        A file spread over several shards is complete only if every part was.
+        """
+        reviews = [shard_reviews[index] for index in sorted(shard_reviews)]
+        iterations, complete, partial, skipped, used = [], [], [], [], 0
+        risk_scores = {}
+        for review in reviews:
+            risk_scores.update(review["packing"]["risk_scores"])
+            iterations.extend(review["iterations"])
+            complete.extend(review["packing"]["complete_files"])
+            partial.extend(review["packing"]["partial_files"])
+            skipped.extend(review["packing"]["skipped_files"])
+            used += review["packing"]["used_tokens"]
+        
+        iterations.sort(key=lambda item: (item["iteration"], item["shard"]))
+        partial = list(dict.fromkeys(partial + [f for f in complete if f in skipped]))
+        complete = [f for f in dict.fromkeys(complete) if f not in partial]
+        skipped = [f for f in dict.fromkeys(skipped) if f not in partial]
+        merged = {
+            "iterations": iterations,
+            "packing": {
+                "complete_files": complete,
+                "partial_files": partial,
+                "skipped_files": skipped,
+                "used_tokens": used,
+                "token_budget": token_budget,
+                "strategy": ranking,
+                "risk_scores": risk_scores
+            },
+            "execution_mode": "sharded",
+            # What each shard covered, for the report's incremental hashes
+            "shards": {
+                index: {
+                    "files": review["packing"]["complete_files"] + review["packing"]["partial_files"],
+                    "skipped_focus": review["skipped_focus"]
+                }
+                for index, review in shard_reviews.items()
+            }
+        }
+        if any("adaptive" in review for review in reviews):
+            merged["adaptive"] = self._merge_adaptive(
+                {index: review["adaptive"] for index, review in shard_reviews.items() if "adaptive" in review}
+            )
+        return merged
+    
+    def _merge_adaptive(self, by_shard: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        One adaptive summary for the report: new findings summed per
+        iteration, focus areas skipped in every shard, and a stop only when
+        every shard stopped early (at the latest such iteration)
+        """
+        novel: Dict[int, int] = {}
+        for stats in by_shard.values():
+            for iteration, count in stats["novel_findings"].items():
+                novel[iteration] = novel.get(iteration, 0) + count
+        stops = [stats["stopped_after"] for stats in by_shard.values()]
+        skipped = set.intersection(*(set(stats["skipped_focus_areas"]) for stats in by_shard.values()))
+        first = next(iter(by_shard.values()))
+        return {
+            **first,
+            "novel_findings": dict(sorted(novel.items())),
+            "stopped_after": max(stops) if all(stops) else None,
+            "skipped_focus_areas": {i: first["skipped_focus_areas"][i] for i in sorted(skipped)},
+            "shards": by_shard
+        }
@@ -9,6 +9,8 @@ from typing import Dict, List, Any
 import shutil
 from datetime import datetime
 
+from symbol_index import SymbolIndex
+
 
 class SimpleFileEditor:
     """
@@ -159,8 +161,9 @@ class SimpleFileEditor:
         """
         print("🔍 PARSING DEBUG:")
         
-        # Get list of Python files in codebase
-        py_files = list(codebase_path.glob("*.py"))
+        # Get list of Python files in codebase (from the persistent symbol index)
+        index = SymbolIndex.open(codebase_path)
+        py_files = index.files()
         print(f"  - Found {len(py_files)} Python files in codebase:")
         for f in py_files:
             print(f"    * {f.name}")
@@ -177,7 +180,7 @@ class SimpleFileEditor:
             print(f"    * Found file reference: '{filename}'")
             
             # Try to match to actual files
-            matched_file = self._find_matching_file(filename, py_files)
+            matched_file = self._find_matching_file(filename, py_files, index)
             if matched_file:
                 file_fixes[matched_file] = code.strip()
                 print(f"      ✓ Matched to: {matched_file.name}")
@@ -223,7 +226,7 @@ class SimpleFileEditor:
         
         return file_fixes
     
-    def _find_matching_file(self, filename: str, py_files: List[Path]) -> Path:
+    def _find_matching_file(self, filename: str, py_files: List[Path], index: SymbolIndex = None) -> Path:
         """
         Find the best matching file for a given filename
         """
@@ -232,7 +235,12 @@ class SimpleFileEditor:
         # Clean up filename - remove common prefixes
         clean_filename = re.sub(r'^(?:file_\d+_)?', '', filename)
         
-        # Direct matches
+        # Direct matches (O(1) through the index when there is one)
+        if index is not None:
+            matched = index.file_named(clean_filename) or index.file_named(filename)
+            if matched:
+                return matched
+        
         for py_file in py_files:
             if py_file.name == clean_filename:
                 return py_file
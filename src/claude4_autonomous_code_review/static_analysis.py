@@ -0,0 +1,275 @@
+"""
+Local ast-based pre-analysis run before the LLM iterations
+
+Cheap-to-find patterns (eval/exec, unsafe deserialization, shell=True,
+mutable default arguments, bare except, nested loops over the same
+collection, string += in loops, unmemoized multiple recursion) are reported
+as structured findings without spending tokens. The review prompt then
+lists them as already covered so the iterations look for everything else.
+"""
+import ast
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from findings import Finding
+from incremental import relative_name
+
+MAX_NOTE_LINES = 200  # Prompt lists at most this many covered findings
+
+MUTABLE_LITERALS = (ast.List, ast.Dict, ast.Set, ast.ListComp, ast.DictComp, ast.SetComp)
+MUTABLE_FACTORIES = {"list", "dict", "set", "defaultdict", "OrderedDict", "deque"}
+MEMO_DECORATORS = {"lru_cache", "cache", "cached", "memoize"}
+
+# call name -> (title, severity, description, recommendation)
+DANGEROUS_CALLS = {
+    "eval": ("Use of eval()", "Critical",
+             "eval() executes arbitrary expressions; with external input this is code injection.",
+             "Parse the input explicitly (ast.literal_eval for literals) instead of evaluating it."),
+    "exec": ("Use of exec()", "Critical",
+             "exec() runs arbitrary code; with external input this is code injection.",
+             "Remove exec() or dispatch to a fixed set of known functions."),
+    "pickle.loads": ("Unsafe deserialization (pickle.loads)", "High",
+                     "Unpickling untrusted data can execute arbitrary code.",
+                     "Use a data-only format such as JSON for untrusted input."),
+    "pickle.load": ("Unsafe deserialization (pickle.load)", "High",
+                    "Unpickling untrusted data can execute arbitrary code.",
+                    "Use a data-only format such as JSON for untrusted input."),
+    "marshal.loads": ("Unsafe deserialization (marshal.loads)", "High",
+                      "marshal is not safe against malicious data.",
+                      "Use a data-only format such as JSON for untrusted input."),
+    "os.system": ("Shell command via os.system", "High",
+                  "os.system passes the command through the shell; interpolated input enables command injection.",
+                  "Use subprocess.run with an argument list and shell=False."),
+    "os.popen": ("Shell command via os.popen", "High",
+                 "os.popen passes the command through the shell; interpolated input enables command injection.",
+                 "Use subprocess.run with an argument list and shell=False."),
+}
+
+
+def call_name(node: ast.Call) -> str:
+    """Dotted name of the called function (`pickle.loads`, `eval`), or ''"""
+    parts = []
+    func = node.func
+    while isinstance(func, ast.Attribute):
+        parts.append(func.attr)
+        func = func.value
+    if isinstance(func, ast.Name):
+        parts.append(func.id)
+        return ".".join(reversed(parts))
+    return ""
+
+
+def loop_collection(node: ast.AST) -> Optional[str]:
+    """
+    What a `for` loop iterates over: X for `X`, `enumerate(X)`,
+    `range(len(X))` and `range(i, len(X))`; None when unclear
+    """
+    if isinstance(node, ast.Call):
+        name = call_name(node)
+        if name in ("enumerate", "sorted", "reversed") and node.args:
+            return loop_collection(node.args[0])
+        if name == "range":
+            for arg in node.args:
+                if isinstance(arg, ast.Call) and call_name(arg) == "len" and arg.args:
+                    return loop_collection(arg.args[0])
+        return None
+    if isinstance(node, (ast.Name, ast.Attribute)):
+        return ast.unparse(node)
+    return None
+
+
+def _is_str_value(node: ast.AST) -> bool:
+    return isinstance(node, ast.JoinedStr) or (isinstance(node, ast.Constant) and isinstance(node.value, str))
+
+
+class _Analyzer(ast.NodeVisitor):
+    """Collects findings for one module, tracking the enclosing definition and loops"""
+    
+    def __init__(self, rel_path: str):
+        self.rel_path = rel_path
+        self.findings: List[Finding] = []
+        self.scope: List[str] = []
+        self.loops: List[Optional[str]] = []
+        self.str_names: List[set] = [set()]
+        self.reported = set()
+    
+    def report(self, node: ast.AST, title: str, type_: str, severity: str,
+               description: str, impact: str, recommendation: str) -> None:
+        location = ".".join(self.scope) or "<module>"
+        # One finding per pattern and definition keeps loops from flooding the report
+        key = (title, location)
+        if key in self.reported:
+            return
+        self.reported.add(key)
+        self.findings.append(Finding(
+            title=title,
+            type=type_,
+            severity=severity,
+            file=self.rel_path,
+            location=location,
+            description=description,
+            impact=impact,
+            recommendation=recommendation,
+            start_line=node.lineno,
+            end_line=getattr(node, "end_lineno", None) or node.lineno,
+            source="static"
+        ))
+    
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        defaults = node.args.defaults + [d for d in node.args.kw_defaults if d is not None]
+        for default in defaults:
+            mutable = isinstance(default, MUTABLE_LITERALS) or (
+                isinstance(default, ast.Call) and call_name(default).split(".")[-1] in MUTABLE_FACTORIES
+            )
+            if mutable:
+                self.scope.append(node.name)
+                self.report(
+                    node, "Mutable default argument", "Bug", "Medium",
+                    f"`{node.name}` uses `{ast.unparse(default)}` as a default; it is created once and shared by every call.",
+                    "State leaks between calls that rely on the default.",
+                    "Default to None and create the object inside the function."
+                )
+                self.scope.pop()
+                break
+        
+        decorators = {
+            (call_name(d) if isinstance(d, ast.Call) else ast.unparse(d)).split(".")[-1]
+            for d in node.decorator_list
+        }
+        self_calls = [
+            call for call in ast.walk(node)
+            if isinstance(call, ast.Call) and call_name(call) in (node.name, f"self.{node.name}")
+        ]
+        if len(self_calls) >= 2 and not decorators & MEMO_DECORATORS:
+            self.scope.append(node.name)
+            self.report(
+                node, "Exponential recursion without memoization", "Performance", "Medium",
+                f"`{node.name}` calls itself {len(self_calls)} times per invocation without caching results.",
+                "Running time grows exponentially with the input.",
+                "Memoize (functools.lru_cache) or rewrite iteratively."
+            )
+            self.scope.pop()
+        
+        self.scope.append(node.name)
+        outer_loops, self.loops = self.loops, []
+        self.str_names.append(set())
+        self.generic_visit(node)
+        self.str_names.pop()
+        self.loops = outer_loops
+        self.scope.pop()
+    
+    visit_AsyncFunctionDef = visit_FunctionDef
+    
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self.scope.append(node.name)
+        self.generic_visit(node)
+        self.scope.pop()
+    
+    def visit_For(self, node: ast.For) -> None:
+        collection = loop_collection(node.iter)
+        if collection and collection in self.loops:
+            self.report(
+                node, "Nested loop over the same collection", "Performance", "Medium",
+                f"A loop over `{collection}` runs inside another loop over `{collection}` (O(n^2)).",
+                "Quadratic time on large inputs.",
+                "Use a set or dict for membership tests, or collections.Counter, in a single pass."
+            )
+        self.loops.append(collection)
+        self.generic_visit(node)
+        self.loops.pop()
+    
+    visit_AsyncFor = visit_For
+    
+    def visit_While(self, node: ast.While) -> None:
+        self.loops.append(None)
+        self.generic_visit(node)
+        self.loops.pop()
+    
+    def visit_Assign(self, node: ast.Assign) -> None:
+        if _is_str_value(node.value):
+            self.str_names[-1].update(t.id for t in node.targets if isinstance(t, ast.Name))
+        self.generic_visit(node)
+    
+    def visit_AugAssign(self, node: ast.AugAssign) -> None:
+        if self.loops and isinstance(node.op, ast.Add) and isinstance(node.target, ast.Name):
+            if _is_str_value(node.value) or node.target.id in self.str_names[-1]:
+                self.report(
+                    node, "String concatenation in a loop", "Performance", "Low",
+                    f"`{node.target.id} += ...` builds a string inside a loop, copying it on every pass.",
+                    "Quadratic time in the length of the result.",
+                    "Collect the parts in a list and ''.join() them once."
+                )
+        self.generic_visit(node)
+    
+    def visit_Call(self, node: ast.Call) -> None:
+        name = call_name(node)
+        if name in DANGEROUS_CALLS:
+            title, severity, description, recommendation = DANGEROUS_CALLS[name]
+            self.report(node, title, "Security", severity, description,
+                        "Attacker-controlled input can run code on the host.", recommendation)
+        if name == "yaml.load" and len(node.args) < 2 and not any(k.arg == "Loader" for k in node.keywords):
+            self.report(
+                node, "Unsafe yaml.load", "Security", "High",
+                "yaml.load without a safe Loader can construct arbitrary Python objects.",
+                "Attacker-controlled input can run code on the host.",
+                "Use yaml.safe_load."
+            )
+        for keyword in node.keywords:
+            if keyword.arg == "shell" and isinstance(keyword.value, ast.Constant) and keyword.value.value is True:
+                self.report(
+                    node, "Shell command with shell=True", "Security", "High",
+                    f"`{name or 'call'}` runs its command through the shell.",
+                    "Interpolated input enables command injection.",
+                    "Pass an argument list and keep shell=False."
+                )
+        self.generic_visit(node)
+    
+    def visit_ExceptHandler(self, node: ast.ExceptHandler) -> None:
+        if node.type is None:
+            self.report(
+                node, "Bare except clause", "Quality", "Low",
+                "`except:` also catches KeyboardInterrupt and SystemExit and hides real errors.",
+                "Failures are silently swallowed.",
+                "Catch the specific exceptions expected (at most `except Exception`)."
+            )
+        self.generic_visit(node)
+
+
+def analyze_source(source: str, rel_path: str) -> List[Finding]:
+    """Findings for one module's source (none if it does not parse)"""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return []
+    analyzer = _Analyzer(rel_path)
+    analyzer.visit(tree)
+    return analyzer.findings
+
+
+def analyze_files(files: List[Path], codebase_path: Path) -> Dict[Path, List[Finding]]:
+    """Findings per file, for the files that have any"""
+    results = {}
+    for file_path in files:
+        source = Path(file_path).read_text(encoding='utf-8', errors='ignore')
+        found = analyze_source(source, relative_name(file_path, codebase_path))
+        if found:
+            results[file_path] = found
+    return results
+
+
+def coverage_note(findings: List[Finding]) -> str:
+    """
+    Prompt section listing what static analysis already reported
+    """
+    if not findings:
+        return ""
+    lines = [
+        f"- {f.file}:{f.start_line} {f.location} - {f.title}"
+        for f in sorted(findings, key=lambda f: (f.file, f.start_line or 0))
+    ]
+    if len(lines) > MAX_NOTE_LINES:
+        lines = lines[:MAX_NOTE_LINES] + [f"- ... and {len(lines) - MAX_NOTE_LINES} more"]
+    return (
+        "ALREADY FOUND BY STATIC ANALYSIS (reported separately - do not report these again; "
+        "spend this iteration on other issues):\n" + "\n".join(lines)
+    )
@@ -0,0 +1,54 @@
+"""
+Incremental parsing of streamed review responses
+"""
+import time
+from typing import Callable, List, Optional
+
+from incremental import ISSUE_HEADER
+
+
+class IssueStreamParser:
+    """
+    Accumulates streamed text and reports each `## Issue:` block as soon as
+    it is complete (i.e. when the next header starts, or the stream ends)
+    """
+    
+    # Re-scan a little of the old text so headers split across deltas are found
+    _HEADER_OVERLAP = 16
+    
+    def __init__(self, on_issue: Callable[[str], None]):
+        self.on_issue = on_issue
+        self.text = ""
+        self.issues: List[str] = []
+        # Seconds from the parser's creation (request start) to the first complete issue
+        self.first_issue_seconds: Optional[float] = None
+        self._started = time.monotonic()
+        self._block_start: Optional[int] = None
+        self._scan_from = 0
+    
+    def feed(self, delta: str) -> None:
+        """Add a text delta and emit any blocks it completes"""
+        self.text += delta
+        
+        for match in ISSUE_HEADER.finditer(self.text, self._scan_from):
+            if self._block_start is not None and match.start() <= self._block_start:
+                continue
+            if self._block_start is not None:
+                self._emit(self.text[self._block_start:match.start()])
+            self._block_start = match.start()
+        
+        self._scan_from = max(self._scan_from, len(self.text) - self._HEADER_OVERLAP)
+    
+    def finish(self) -> None:
+        """Emit the trailing block once the stream has ended"""
+        if self._block_start is not None:
+            self._emit(self.text[self._block_start:])
+            self._block_start = None
+    
+    def _emit(self, block: str) -> None:
+        block = block.strip()
+        if block:
+            if self.first_issue_seconds is None:
+                self.first_issue_seconds = round(time.monotonic() - self._started, 2)
+            self.issues.append(block)
+            self.on_issue(block)
@@ -0,0 +1,199 @@
+"""
+Persistent symbol index of a reviewed codebase
+
+One JSON file per codebase (in .symbol_index/, next to reports/) records
+for every Python file its mtime, size, content hash, top-level cut points
+and the line span of each function and class by qualified name. refresh()
+re-reads only files whose mtime or size changed and re-parses only those
+whose hash changed, so later runs cost one stat per file.
+
+Kept free of config imports so the file editors can use it without an API key.
+"""
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from code_spans import Spans, symbol_spans
+from context_packer import segment_starts
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIR = Path(__file__).parent.parent.parent / ".symbol_index"
+INDEX_VERSION = 1
+
+
+def _skipped(rel_path: Path) -> bool:
+    """Editor backups, caches and hidden directories are not part of the codebase"""
+    return any(
+        part.startswith(("backup_", ".")) or part == "__pycache__"
+        for part in rel_path.parts[:-1]
+    )
+
+
+def index_file(source: bytes) -> Dict[str, Any]:
+    """
+    Hash, cut points and definition spans of one file's content
+    """
+    entry: Dict[str, Any] = {"sha256": hashlib.sha256(source).hexdigest()}
+    text = source.decode("utf-8", errors="ignore")
+    try:
+        entry["symbols"] = symbol_spans(text)
+        entry["segments"] = segment_starts(text)
+    except (SyntaxError, ValueError):
+        entry["symbols"], entry["segments"] = {}, None
+    return entry
+
+
+class SymbolIndex:
+    """
+    Module path -> {mtime, size, sha256, symbols, segments}, with in-memory
+    lookups by file name and by defined name
+    """
+    
+    def __init__(self, codebase_path: Union[str, Path], index_dir: Path = INDEX_DIR):
+        self.codebase_path = Path(codebase_path)
+        self.root = self.codebase_path.resolve()
+        digest = hashlib.sha256(str(self.root).encode("utf-8")).hexdigest()[:16]
+        self.path = Path(index_dir) / f"{digest}.json"
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._by_file_name: Dict[str, List[str]] = {}
+        self._by_symbol: Dict[str, List[str]] = {}
+        
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION and data.get("codebase_path") == str(self.root):
+                self.entries = data["files"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Rebuilding unreadable symbol index {self.path}: {e}")
+    
+    @classmethod
+    def open(cls, codebase_path: Union[str, Path], index_dir: Path = INDEX_DIR) -> "SymbolIndex":
+        """Load the stored index for a codebase and bring it up to date"""
+        index = cls(codebase_path, index_dir)
+        index.refresh()
+        return index
+    
+    def refresh(self) -> Dict[str, int]:
+        """
+        Re-index new and modified files, drop deleted ones, and save if anything changed
+        """
+        stats = {"files": 0, "reread": 0, "reparsed": 0, "removed": 0}
+        current: Dict[str, Dict[str, Any]] = {}
+        
+        for file_path in self.codebase_path.rglob("*.py"):
+            rel = file_path.relative_to(self.codebase_path)
+            if _skipped(rel):
+                continue
+            key = rel.as_posix()
+            try:
+                stat = file_path.stat()
+            except OSError:
+                continue
+            
+            entry = self.entries.get(key)
+            if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                current[key] = entry
+                continue
+            
+            stats["reread"] += 1
+            with open(file_path, 'rb') as f:
+                source = f.read()
+            digest = hashlib.sha256(source).hexdigest()
+            if entry and entry["sha256"] == digest:
+                # Touched but unchanged: keep the parse
+                entry = dict(entry)
+            else:
+                stats["reparsed"] += 1
+                entry = index_file(source)
+            entry["mtime_ns"], entry["size"] = stat.st_mtime_ns, stat.st_size
+            current[key] = entry
+        
+        stats["files"] = len(current)
+        stats["removed"] = len(set(self.entries) - set(current))
+        changed = stats["reread"] or stats["removed"]
+        self.entries = current
+        self._build_lookups()
+        if changed:
+            self.save()
+        return stats
+    
+    def save(self) -> None:
+        """Write the index atomically"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "version": INDEX_VERSION,
+                "codebase_path": str(self.root),
+                "files": self.entries
+            }, f)
+        os.replace(tmp_path, self.path)
+    
+    def files(self) -> List[Path]:
+        """Every indexed file, in path order"""
+        return [self.codebase_path / key for key in sorted(self.entries)]
+    
+    def file_named(self, name: str) -> Optional[Path]:
+        """
+        File by relative path, else by bare name (case-insensitive, shallowest first)
+        """
+        key = Path(name).as_posix()
+        if key in self.entries:
+            return self.codebase_path / key
+        matches = self.files_named(name)
+        return matches[0] if matches else None
+    
+    def files_named(self, name: str) -> List[Path]:
+        """Every file with this bare name (case-insensitive), shallowest first"""
+        return [self.codebase_path / key for key in self._by_file_name.get(Path(name).name.lower(), [])]
+    
+    def files_defining(self, name: str) -> List[Path]:
+        """Files defining a function or class with this (unqualified) name"""
+        return [self.codebase_path / key for key in self._by_symbol.get(name, [])]
+    
+    def spans(self, file_path: Union[str, Path]) -> Optional[Spans]:
+        """Definition spans of an indexed file"""
+        entry = self.entries.get(self._key(file_path))
+        if entry is None:
+            return None
+        return {name: tuple(span) for name, span in entry["symbols"].items()}
+    
+    def segments(self, file_path: Union[str, Path]) -> Optional[Tuple[List[int], List[int]]]:
+        """Top-level and class-member start lines (context_packer cut points)"""
+        entry = self.entries.get(self._key(file_path))
+        if entry is None or entry["segments"] is None:
+            return None
+        return tuple(entry["segments"])
+    
+    def content_hash(self, file_path: Union[str, Path]) -> Optional[str]:
+        """SHA-256 of an indexed file's bytes"""
+        entry = self.entries.get(self._key(file_path))
+        return entry["sha256"] if entry else None
+    
+    def _key(self, file_path: Union[str, Path]) -> Optional[str]:
+        """Index key (relative POSIX path) of a file inside the codebase"""
+        file_path = Path(file_path)
+        try:
+            rel = file_path.relative_to(self.codebase_path)
+            if ".." not in rel.parts:
+                return rel.as_posix()
+        except ValueError:
+            pass
+        try:
+            return file_path.resolve().relative_to(self.root).as_posix()
+        except ValueError:
+            return None
+    
+    def _build_lookups(self) -> None:
+        """Name -> files maps for O(1) resolution"""
+        self._by_file_name, self._by_symbol = {}, {}
+        for key in sorted(self.entries, key=lambda k: (k.count("/"), k)):
+            self._by_file_name.setdefault(key.rsplit("/", 1)[-1].lower(), []).append(key)
+            for name in {qualname.rsplit(".", 1)[-1] for qualname in self.entries[key]["symbols"]}:
+                self._by_symbol.setdefault(name, []).append(key)
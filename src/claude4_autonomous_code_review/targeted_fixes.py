@@ -0,0 +1,333 @@
+"""
+Targeted fix generation: one function-scoped patch per source region
+
+Findings are mapped to the smallest enclosing function or class (or the
+top-level statement, or the whole file if it is short), findings sharing
+a region are grouped, and each region is sent on its own with only that
+source attached. Patches replace exactly the region's lines and are
+applied bottom-up per file, so they never shift one another.
+"""
+import ast
+import difflib
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from claude4_client import Claude4Client
+from code_spans import innermost_span, lookup, statement_span, symbol_spans
+from config import FIX_MODULE_MAX_LINES, MAX_PARALLEL_REQUESTS
+from cost_meter import CostMeter
+from findings import Finding, normalize_file_name
+from rate_limiter import RateLimiter
+from symbol_index import SymbolIndex
+
+IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*')
+HUNK_HEADER = re.compile(r'^@@ -(\d+)(,\d+)? \+(\d+)(,\d+)? @@', re.MULTILINE)
+
+PATCH_TOOL = {
+    "name": "submit_patch",
+    "description": "Submit the fixed replacement for the source region shown.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "replacement": {
+                "type": "string",
+                "description": "Complete new text for exactly the lines shown, with their original indentation"
+            },
+            "summary": {"type": "string", "description": "One sentence describing the change"}
+        },
+        "required": ["replacement", "summary"]
+    }
+}
+
+PATCH_PROMPT = """Fix the following issue(s) in {file}, lines {start}-{end} ({symbol}).
+
+HUMAN APPROVAL:
+- Reviewer: {reviewer}
+- Notes: {notes}
+
+ISSUES:
+{issues}
+
+SOURCE ({file}, lines {start}-{end}):
+```python
+{source}
+```
+
+Call submit_patch with the complete replacement for exactly these lines.
+Keep the original indentation, leave unrelated behaviour unchanged and do
+not add code that belongs outside this region (new imports are fine only
+if the region is the whole file)."""
+
+
+def resolve_file(name: str, index: SymbolIndex) -> Optional[Path]:
+    """
+    Source file a finding refers to: the relative path, else a unique
+    file-name match among the indexed files (editor backups excluded)
+    """
+    if not name:
+        return None
+    rel_path = Path(name).as_posix()
+    if rel_path in index.entries:
+        return index.codebase_path / rel_path
+    # The index holds Python files only
+    candidate = index.codebase_path / rel_path
+    if candidate.suffix != ".py" and candidate.is_file():
+        return candidate
+    matches = index.files_named(normalize_file_name(name))
+    return matches[0] if len(matches) == 1 else None
+
+
+def locate_region(finding: Finding, source: str) -> Optional[Tuple[str, int, int]]:
+    """
+    (symbol, start_line, end_line) of the smallest region that covers a finding
+    """
+    line_count = len(source.splitlines())
+    try:
+        spans = symbol_spans(source)
+    except SyntaxError:
+        spans = None
+    
+    if spans is not None and finding.start_line and finding.start_line <= line_count:
+        span = innermost_span(spans, finding.start_line)
+        if span:
+            return span
+        statement = statement_span(source, finding.start_line)
+        if statement:
+            return f"lines {statement[0]}-{statement[1]}", statement[0], statement[1]
+    
+    if spans is not None:
+        for name in IDENTIFIER.findall(finding.location or ""):
+            matches = lookup(spans, name)
+            if len(matches) == 1:
+                return matches[0]
+    
+    if 0 < line_count <= FIX_MODULE_MAX_LINES:
+        return "<module>", 1, line_count
+    return None
+
+
+def plan_regions(findings: List[Finding], codebase_path: Path) -> Tuple[List[Dict[str, Any]], List[Finding]]:
+    """
+    Group findings into non-overlapping regions per file
+    
+    Returns the regions and the findings that could not be located
+    (including those in files that cannot be read as UTF-8, which a
+    line-range patch could not be written back to safely).
+    """
+    by_file: Dict[Path, List[Tuple[str, int, int, Finding]]] = {}
+    sources: Dict[Path, Optional[str]] = {}
+    unplaced = []
+    index = SymbolIndex.open(codebase_path)
+    
+    for finding in findings:
+        file_path = resolve_file(finding.file, index)
+        if file_path is None:
+            unplaced.append(finding)
+            continue
+        if file_path not in sources:
+            try:
+                sources[file_path] = file_path.read_text(encoding='utf-8')
+            except (UnicodeDecodeError, OSError) as e:
+                print(f"⚠️  Cannot read {file_path.name}: {e}")
+                sources[file_path] = None
+        if sources[file_path] is None:
+            unplaced.append(finding)
+            continue
+        region = locate_region(finding, sources[file_path])
+        if region is None:
+            unplaced.append(finding)
+            continue
+        by_file.setdefault(file_path, []).append((*region, finding))
+    
+    regions = []
+    for file_path, located in by_file.items():
+        lines = sources[file_path].splitlines(keepends=True)
+        # Overlapping regions (a method and its class) merge into their union
+        merged: List[Dict[str, Any]] = []
+        for symbol, start, end, finding in sorted(located, key=lambda r: (r[1], -r[2])):
+            if merged and start <= merged[-1]["end_line"]:
+                current = merged[-1]
+                current["end_line"] = max(current["end_line"], end)
+                if symbol not in current["symbols"]:
+                    current["symbols"].append(symbol)
+                current["findings"].append(finding)
+            else:
+                merged.append({"symbols": [symbol], "start_line": start, "end_line": end, "findings": [finding]})
+        
+        for region in merged:
+            region["file"] = file_path.relative_to(codebase_path).as_posix()
+            region["symbol"] = ", ".join(region.pop("symbols"))
+            region["original"] = "".join(lines[region["start_line"] - 1:region["end_line"]])
+            regions.append(region)
+    
+    return regions, unplaced
+
+
+def region_diff(rel_path: str, start_line: int, original: str, replacement: str) -> str:
+    """
+    Unified diff of a region replacement, with hunk headers in file line numbers
+    """
+    diff = "".join(difflib.unified_diff(
+        original.splitlines(keepends=True),
+        replacement.splitlines(keepends=True),
+        f"a/{rel_path}", f"b/{rel_path}"
+    ))
+    offset = start_line - 1
+    return HUNK_HEADER.sub(
+        lambda m: f"@@ -{int(m.group(1)) + offset}{m.group(2) or ''} +{int(m.group(3)) + offset}{m.group(4) or ''} @@",
+        diff
+    )
+
+
+def request_patch(client: Claude4Client, region: Dict[str, Any], decisions: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Ask for the replacement of one region and return the patch record
+    """
+    prompt = PATCH_PROMPT.format(
+        file=region["file"],
+        start=region["start_line"],
+        end=region["end_line"],
+        symbol=region["symbol"],
+        reviewer=decisions.get("reviewer_name", ""),
+        notes=decisions.get("notes", ""),
+        issues="\n\n".join(finding.to_block() for finding in region["findings"]),
+        source=region["original"].rstrip("\n")
+    )
+    message = client.create_independent_message(prompt)
+    
+    # A truncated tool call would splice half a function into the file
+    if message.stop_reason == "max_tokens":
+        raise ValueError("response truncated at max_tokens")
+    call = next((b for b in message.content if getattr(b, "type", None) == "tool_use"), None)
+    if call is None or not isinstance(call.input.get("replacement"), str):
+        raise ValueError("no submit_patch call in response")
+    
+    replacement = call.input["replacement"]
+    if region["original"].endswith("\n") and not replacement.endswith("\n"):
+        replacement += "\n"
+    
+    return {
+        "file": region["file"],
+        "start_line": region["start_line"],
+        "end_line": region["end_line"],
+        "symbol": region["symbol"],
+        "findings": [finding.title for finding in region["findings"]],
+        "summary": call.input.get("summary", ""),
+        "original": region["original"],
+        "replacement": replacement,
+        "diff": region_diff(region["file"], region["start_line"], region["original"], replacement),
+        "input_tokens": message.usage.input_tokens,
+        "output_tokens": message.usage.output_tokens
+    }
+
+
+def generate_targeted_fixes(
+    findings: List[Finding],
+    codebase_path: Path,
+    decisions: Dict[str, Any],
+    use_production_model: bool = False,
+    max_workers: int = MAX_PARALLEL_REQUESTS,
+    rate_limiter: Optional[RateLimiter] = None,
+    cost_meter: Optional[CostMeter] = None
+) -> Dict[str, Any]:
+    """
+    Generate one patch per region in parallel
+    """
+    codebase_path = Path(codebase_path)
+    regions, unplaced = plan_regions(findings, codebase_path)
+    print(f"🎯 {len(regions)} regions for {len(findings) - len(unplaced)} findings")
+    if unplaced:
+        print(f"⚠️  {len(unplaced)} findings could not be located in the source and were skipped")
+    
+    client = Claude4Client(
+        use_production_model, rate_limiter=rate_limiter, output_tool=PATCH_TOOL, cost_meter=cost_meter
+    )
+    patches, failed = [], []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(regions) or 1))) as executor:
+        futures = {executor.submit(request_patch, client, region, decisions): region for region in regions}
+        for future in as_completed(futures):
+            region = futures[future]
+            where = f"{region['file']}:{region['start_line']}-{region['end_line']} ({region['symbol']})"
+            try:
+                patches.append(future.result())
+                print(f"✓ {where}")
+            except Exception as e:
+                failed.append({"file": region["file"], "symbol": region["symbol"], "error": str(e)})
+                print(f"✗ {where} - {e}")
+    
+    patches.sort(key=lambda p: (p["file"], p["start_line"]))
+    return {
+        "model": client.model,
+        "patches": patches,
+        "failed": failed,
+        "unplaced_findings": [finding.title for finding in unplaced],
+        "input_tokens": sum(p["input_tokens"] for p in patches),
+        "output_tokens": sum(p["output_tokens"] for p in patches)
+    }
+
+
+def apply_patches(patches: List[Dict[str, Any]], codebase_path: Path, backup: bool = True) -> Dict[str, Any]:
+    """
+    Splice patches into their files by line range, last region first
+    
+    A patch is skipped when its region no longer matches the file (the
+    source changed since generation) or when the patched file would not
+    parse; the other patches of that file are still applied.
+    """
+    codebase_path = Path(codebase_path)
+    backup_dir = codebase_path / f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}" if backup else None
+    
+    by_file: Dict[str, List[Dict[str, Any]]] = {}
+    for patch in patches:
+        by_file.setdefault(patch["file"], []).append(patch)
+    
+    modified, applied, skipped = [], 0, []
+    for rel_path, file_patches in sorted(by_file.items()):
+        file_path = codebase_path / rel_path
+        try:
+            lines = file_path.read_text(encoding='utf-8').splitlines(keepends=True)
+        except (UnicodeDecodeError, OSError) as e:
+            skipped.extend(
+                {"file": rel_path, "symbol": patch["symbol"], "reason": f"cannot read file: {e}"}
+                for patch in file_patches
+            )
+            continue
+        changed = False
+        
+        for patch in sorted(file_patches, key=lambda p: -p["start_line"]):
+            start, end = patch["start_line"], patch["end_line"]
+            if "".join(lines[start - 1:end]) != patch["original"]:
+                skipped.append({"file": rel_path, "symbol": patch["symbol"], "reason": "source changed since generation"})
+                continue
+            candidate = lines[:start - 1] + patch["replacement"].splitlines(keepends=True) + lines[end:]
+            try:
+                ast.parse("".join(candidate))
+            except SyntaxError as e:
+                skipped.append({"file": rel_path, "symbol": patch["symbol"], "reason": f"patched file does not parse: {e}"})
+                continue
+            lines, changed = candidate, True
+            applied += 1
+        
+        if not changed:
+            continue
+        if backup_dir:
+            backup_path = backup_dir / rel_path
+            backup_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(file_path, backup_path)
+        file_path.write_text("".join(lines), encoding='utf-8')
+        modified.append(rel_path)
+        print(f"  ✅ Patched: {rel_path}")
+    
+    for item in skipped:
+        print(f"  ⚠️  Skipped {item['file']} ({item['symbol']}): {item['reason']}")
+    
+    return {
+        "files_modified": modified,
+        "patches_applied": applied,
+        "patches_skipped": skipped,
+        "backup_directory": str(backup_dir) if backup_dir and modified else None
+    }
@@ -5,6 +5,8 @@ import json
 import sys
 from pathlib import Path
 
+from findings import FindingsStore, severity_rank
+
 def view_latest_results():
     """View the latest review results"""
     
@@ -50,6 +52,16 @@ def view_latest_results():
         if markdown_file.exists():
             print(f"📄 Markdown Report: {markdown_file}")
         
+        # Structured findings (reports written before they existed only have the previews)
+        if results.get('findings'):
+            store = FindingsStore.from_list(results['findings'])
+            print(f"🚨 Findings: {len(store)}")
+            for severity in sorted(store.by_severity, key=severity_rank):
+                print(f"   {severity}: {len(store.by_severity[severity])}")
+            for finding in store.at_least("High")[:10]:
+                print(f"   - [{finding.severity}] {finding.title} ({finding.file or '?'}, {finding.location or '?'})")
+            print()
+        
         # Iteration summary
         print("🔍 Iteration Summary:")
         print("-" * 40)
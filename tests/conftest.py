@@ -0,0 +1,55 @@
+"""
+Shared test setup: the package modules use flat imports (as when run from
+their own directory), and config asks for an API key when none is set
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+sys.path.insert(0, str(Path(__file__).parent.parent / "src" / "claude4_autonomous_code_review"))
+
+
+@pytest.fixture
+def workspace(monkeypatch, tmp_path):
+    """
+    Reports and symbol indexes under tmp_path instead of the project root;
+    returns the reports directory
+    """
+    import clean_review
+    from symbol_index import SymbolIndex
+    
+    reports_dir = tmp_path / "reports"
+    reports_dir.mkdir()
+    monkeypatch.setattr(clean_review, "REPORTS_DIR", reports_dir)
+    open_index = SymbolIndex.open.__func__
+    monkeypatch.setattr(
+        SymbolIndex, "open",
+        classmethod(lambda cls, codebase_path, index_dir=None: open_index(cls, codebase_path, tmp_path / "index"))
+    )
+    return reports_dir
+
+
+RISKY_SOURCE = '''import subprocess
+
+
+def run(command, user):
+    if user.is_admin:
+        for part in command.split(";"):
+            if part:
+                subprocess.call(part, shell=True)
+    return eval(command)
+'''
+
+
+@pytest.fixture
+def risky_codebase(tmp_path):
+    """danger.py, clearly the riskiest file, plus three trivial modules"""
+    root = tmp_path / "codebase"
+    root.mkdir()
+    (root / "danger.py").write_text(RISKY_SOURCE)
+    for name in ("alpha", "beta", "gamma"):
+        (root / f"{name}.py").write_text(f"def {name}():\n    return 1\n")
+    return root
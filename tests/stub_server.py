@@ -0,0 +1,79 @@
+"""
+Local stand-in for the Anthropic HTTP API, served from a background thread
+
+Each test passes a handler(method, path, body) returning (status, payload,
+headers); a dict payload is sent as JSON, bytes as they are.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple
+
+Handler = Callable[[str, str, Dict[str, Any]], Tuple[int, Any, Dict[str, str]]]
+
+
+def message(model: str, text: str = "No issues found.", input_tokens: int = 100, output_tokens: int = 20) -> Dict[str, Any]:
+    """A Messages API response body"""
+    return {
+        "id": "msg_stub",
+        "type": "message",
+        "role": "assistant",
+        "model": model,
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens}
+    }
+
+
+class StubServer:
+    """
+    ThreadingHTTPServer on a free local port; use as a context manager
+    """
+    
+    def __init__(self, handler: Handler):
+        stub = self
+        self.handler = handler
+        self.requests = []
+        self._lock = threading.Lock()
+        
+        class RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def log_message(self, *args) -> None:
+                pass
+            
+            def _handle(self, method: str) -> None:
+                length = int(self.headers.get("content-length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                path = self.path.split("?")[0]
+                with stub._lock:
+                    stub.requests.append((method, path, body))
+                status, payload, headers = stub.handler(method, path, body)
+                data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def do_GET(self) -> None:
+                self._handle("GET")
+            
+            def do_POST(self) -> None:
+                self._handle("POST")
+        
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), RequestHandler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread: Optional[threading.Thread] = None
+    
+    def __enter__(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.server.shutdown()
+        self.server.server_close()
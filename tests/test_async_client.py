@@ -0,0 +1,69 @@
+"""
+AsyncClaude4Client against a local stand-in server
+"""
+import asyncio
+import threading
+import time
+
+from claude4_client import AsyncClaude4Client, create_async_http_client
+
+from tests.stub_server import StubServer, message
+
+
+def test_shared_semaphore_limits_in_flight_requests_across_clients():
+    lock = threading.Lock()
+    state = {"in_flight": 0, "peak": 0}
+    
+    def handler(method, path, body):
+        with lock:
+            state["in_flight"] += 1
+            state["peak"] = max(state["peak"], state["in_flight"])
+        time.sleep(0.1)
+        with lock:
+            state["in_flight"] -= 1
+        return 200, message(body["model"]), {}
+    
+    async def review_all(url):
+        semaphore = asyncio.Semaphore(2)
+        http_client = create_async_http_client(4)
+        clients = [
+            AsyncClaude4Client(http_client=http_client, semaphore=semaphore, base_url=url)
+            for _ in range(3)
+        ]
+        try:
+            return await asyncio.gather(*(
+                client.create_independent_message(f"Review part {i}")
+                for client in clients for i in range(2)
+            ))
+        finally:
+            await http_client.aclose()
+    
+    with StubServer(handler) as stub:
+        replies = asyncio.run(review_all(stub.url))
+    
+    assert len(replies) == 6
+    assert all(reply.content[0].text == "No issues found." for reply in replies)
+    assert state["peak"] == 2
+
+
+def test_rate_limited_request_is_retried():
+    calls = []
+    
+    def handler(method, path, body):
+        calls.append(path)
+        if len(calls) == 1:
+            error = {"type": "error", "error": {"type": "rate_limit_error", "message": "slow down"}}
+            return 429, error, {"retry-after-ms": "10"}
+        return 200, message(body["model"], "Recovered."), {}
+    
+    async def review(url):
+        async with AsyncClaude4Client(base_url=url) as client:
+            reply = await client.create_analysis_message("Review this")
+            return reply, client.session_context
+    
+    with StubServer(handler) as stub:
+        reply, session_context = asyncio.run(review(stub.url))
+    
+    assert calls == ["/v1/messages", "/v1/messages"]
+    assert reply.content[0].text == "Recovered."
+    assert [turn["role"] for turn in session_context] == ["user", "assistant"]
@@ -0,0 +1,89 @@
+"""
+BatchReviewer against a local stand-in Message Batches endpoint
+"""
+import json
+
+import pytest
+
+from batch_review import BatchReviewer
+from clean_review import CleanIterativeReviewer
+from config import BATCH_PRICE_FACTOR, DEVELOPMENT_MODEL
+from cost_meter import estimate_cost
+
+from tests.stub_server import StubServer, message
+
+BATCH_ID = "msgbatch_stub"
+
+
+def batch(url, ended):
+    """A MessageBatch body, in progress or ended"""
+    counts = {"processing": 0, "succeeded": 1, "errored": 1} if ended else {"processing": 3, "succeeded": 0, "errored": 0}
+    return {
+        "id": BATCH_ID,
+        "type": "message_batch",
+        "processing_status": "ended" if ended else "in_progress",
+        "request_counts": {**counts, "canceled": 0, "expired": 0},
+        "created_at": "2026-01-01T00:00:00Z",
+        "expires_at": "2026-01-02T00:00:00Z",
+        "ended_at": "2026-01-01T00:01:00Z" if ended else None,
+        "archived_at": None,
+        "cancel_initiated_at": None,
+        "results_url": f"{url}/v1/messages/batches/{BATCH_ID}/results" if ended else None
+    }
+
+
+def test_batch_iteration_records_successes_and_stops_failed_jobs(monkeypatch, tmp_path):
+    polls = []
+    submitted = {}
+    
+    def handler(method, path, body):
+        if method == "POST" and path == "/v1/messages/batches":
+            submitted["requests"] = body["requests"]
+            return 200, batch(stub.url, ended=False), {}
+        if path == f"/v1/messages/batches/{BATCH_ID}":
+            polls.append(path)
+            # Ended on the second poll
+            return 200, batch(stub.url, ended=len(polls) > 1), {}
+        if path == f"/v1/messages/batches/{BATCH_ID}/results":
+            lines = [
+                {"custom_id": "review-0-iter-1",
+                 "result": {"type": "succeeded", "message": message(DEVELOPMENT_MODEL, "## Issue: Use of eval")}},
+                {"custom_id": "review-1-iter-1",
+                 "result": {"type": "errored",
+                            "error": {"type": "error", "error": {"type": "api_error", "message": "boom"}}}}
+                # review-2-iter-1 is missing from the results file
+            ]
+            return 200, "\n".join(json.dumps(line) for line in lines).encode(), {}
+        return 404, {"type": "error", "error": {"type": "not_found_error", "message": path}}, {}
+    
+    with StubServer(handler) as stub:
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", stub.url)
+        reviewer = CleanIterativeReviewer(max_cost=1.0)
+        jobs = []
+        for index in range(3):
+            job_reviewer = reviewer.spawn()
+            file_id = job_reviewer.client.upload_content(f"module_{index}.py", "x = eval(input())\n")
+            jobs.append({
+                "index": index, "codebase_path": tmp_path / f"codebase_{index}", "reviewer": job_reviewer,
+                "file_ids": [file_id], "iterations": [], "active": True
+            })
+        
+        BatchReviewer(reviewer, poll_interval=0)._run_iteration(jobs, 1, 3, "security")
+    
+    assert [r["custom_id"] for r in submitted["requests"]] == [f"review-{i}-iter-1" for i in range(3)]
+    assert len(polls) >= 2
+    
+    succeeded, errored, missing = jobs
+    assert succeeded["active"] and len(succeeded["iterations"]) == 1
+    assert succeeded["iterations"][0]["response"] == "## Issue: Use of eval"
+    assert [turn["role"] for turn in succeeded["reviewer"].client.session_context] == ["user", "assistant"]
+    for job in (errored, missing):
+        assert not job["active"]
+        assert job["iterations"] == []
+        # _stop dropped the unanswered instruction
+        assert job["reviewer"].client.session_context == []
+    
+    # Only the succeeded request is billed, at batch prices; the others' reservations are released
+    meter = reviewer.cost_meter
+    assert meter.reserved == pytest.approx(0)
+    assert meter.spent == pytest.approx(estimate_cost(DEVELOPMENT_MODEL, 100, 20) * BATCH_PRICE_FACTOR)
@@ -0,0 +1,33 @@
+"""
+Model cascade (--cascade) against a local stub Messages endpoint
+"""
+from checkpoint import ReviewCheckpoint
+from clean_review import CleanIterativeReviewer
+from config import CASCADE_TRIAGE_ITERATIONS, DEVELOPMENT_MODEL
+
+from tests.stub_server import StubServer, message
+
+
+def test_cascade_without_flagged_files_completes_the_checkpoint(monkeypatch, tmp_path, workspace):
+    codebase = tmp_path / "codebase"
+    codebase.mkdir()
+    (codebase / "app.py").write_text("def add(a, b):\n    return a + b\n")
+    
+    def handler(method, path, body):
+        return 200, message(body["model"]), {}
+    
+    with StubServer(handler) as stub:
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", stub.url)
+        review = CleanIterativeReviewer().run_iterative_review(
+            codebase, "Find bugs", max_iterations=4, cascade=True
+        )
+    
+    # Triage only: nothing flagged, so nothing goes to the production model
+    assert [body["model"] for _, _, body in stub.requests] == [DEVELOPMENT_MODEL] * CASCADE_TRIAGE_ITERATIONS
+    assert review["cascade"]["escalated_files"] == []
+    
+    # ... and the run counts as finished, so there is nothing to resume
+    checkpoint, = workspace.glob("checkpoint_*.jsonl")
+    state = ReviewCheckpoint.load(checkpoint)
+    assert state["complete"] is not None
+    assert state["complete"]["report"] in {path.name for path in workspace.glob("review_*.json")}
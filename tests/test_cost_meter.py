@@ -0,0 +1,110 @@
+"""
+CostMeter reservations, settlement and the halt/downgrade limit actions
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from config import CACHE_WRITE_PRICE_FACTOR, COST_ESTIMATE_MARGIN, DEVELOPMENT_MODEL, PRODUCTION_MODEL
+from cost_meter import CostLimitExceeded, CostMeter, estimate_cost, worst_case_cost
+
+
+def usage(input_tokens=0, output_tokens=0, cache_write=0, cache_read=0):
+    """The usage block of a Messages API response"""
+    return SimpleNamespace(
+        input_tokens=input_tokens, output_tokens=output_tokens,
+        cache_creation_input_tokens=cache_write, cache_read_input_tokens=cache_read
+    )
+
+
+def test_worst_case_covers_the_estimate_margin_and_cache_writes():
+    plain = worst_case_cost(PRODUCTION_MODEL, 1000, 500)
+    assert plain == pytest.approx(estimate_cost(PRODUCTION_MODEL, 1000 * COST_ESTIMATE_MARGIN, 500))
+    
+    # A request that writes the whole prompt to the cache bills every input token at the write rate
+    cached = worst_case_cost(PRODUCTION_MODEL, 1000, 500, cache_writes=True)
+    assert cached > plain
+    assert cached >= estimate_cost(PRODUCTION_MODEL, 0, 500, cache_write_tokens=1000 * COST_ESTIMATE_MARGIN)
+    assert cached >= estimate_cost(PRODUCTION_MODEL, 1000 * COST_ESTIMATE_MARGIN * CACHE_WRITE_PRICE_FACTOR, 500)
+
+
+def test_settle_replaces_the_reservation_with_the_actual_cost():
+    meter = CostMeter(max_cost=1.0)
+    model, held = meter.reserve(PRODUCTION_MODEL, 1000, 500, cache_writes=True)
+    assert model == PRODUCTION_MODEL
+    assert meter.reserved == pytest.approx(held)
+    
+    cost = meter.settle(model, usage(input_tokens=100, output_tokens=200, cache_write=900), held)
+    
+    assert cost == pytest.approx(estimate_cost(PRODUCTION_MODEL, 100, 200, cache_write_tokens=900))
+    assert cost <= held
+    assert meter.reserved == pytest.approx(0)
+    assert meter.spent == pytest.approx(cost)
+    assert meter.stats()["by_model"][PRODUCTION_MODEL]["cache_write_tokens"] == 900
+
+
+def test_release_drops_a_failed_calls_reservation():
+    meter = CostMeter(max_cost=1.0)
+    _, held = meter.reserve(PRODUCTION_MODEL, 1000, 500)
+    
+    meter.release(held)
+    
+    assert meter.reserved == pytest.approx(0)
+    assert meter.spent == 0
+    assert meter.by_model == {}
+
+
+def test_outstanding_reservations_count_against_the_limit():
+    one_call = worst_case_cost(PRODUCTION_MODEL, 1000, 500)
+    meter = CostMeter(max_cost=one_call * 1.5)
+    meter.reserve(PRODUCTION_MODEL, 1000, 500)
+    
+    # A second concurrent call would overshoot even though nothing is spent yet
+    with pytest.raises(CostLimitExceeded):
+        meter.reserve(PRODUCTION_MODEL, 1000, 500)
+    assert meter.spent == 0
+
+
+def test_halt_refuses_calls_past_the_limit():
+    meter = CostMeter(max_cost=0.01, on_limit="halt")
+    meter.record(PRODUCTION_MODEL, input_tokens=500)
+    assert not meter.halted
+    
+    with pytest.raises(CostLimitExceeded):
+        meter.reserve(PRODUCTION_MODEL, 1000, 4096)
+    
+    assert meter.halted
+    assert meter.stats()["refused_calls"] == 1
+    assert meter.reserved == 0
+
+
+def test_downgrade_sends_the_call_to_the_development_model_when_that_fits():
+    limit = worst_case_cost(DEVELOPMENT_MODEL, 1000, 4096) * 2
+    assert worst_case_cost(PRODUCTION_MODEL, 1000, 4096) > limit
+    meter = CostMeter(max_cost=limit, on_limit="downgrade")
+    
+    model, held = meter.reserve(PRODUCTION_MODEL, 1000, 4096)
+    
+    assert model == DEVELOPMENT_MODEL
+    assert held == pytest.approx(worst_case_cost(DEVELOPMENT_MODEL, 1000, 4096))
+    assert meter.downgraded_calls == 1 and not meter.halted
+
+
+def test_downgrade_still_refuses_when_even_the_development_model_does_not_fit():
+    meter = CostMeter(max_cost=worst_case_cost(DEVELOPMENT_MODEL, 1000, 4096) / 2, on_limit="downgrade")
+    
+    with pytest.raises(CostLimitExceeded):
+        meter.reserve(PRODUCTION_MODEL, 1000, 4096)
+    assert meter.halted and meter.downgraded_calls == 0
+
+
+def test_no_limit_never_refuses():
+    meter = CostMeter()
+    for _ in range(100):
+        meter.reserve(PRODUCTION_MODEL, 100_000, 4096)
+    assert not meter.halted
+
+
+def test_unknown_limit_action_is_rejected():
+    with pytest.raises(ValueError):
+        CostMeter(1.0, on_limit="ignore")
@@ -0,0 +1,84 @@
+"""
+Finding de-duplication across iterations
+"""
+from dedup import dedupe_findings
+from findings import Finding
+
+
+def finding(title, file="app.py", location="", start_line=None, end_line=None, severity="Medium",
+            iteration=1, description="", source="review"):
+    return Finding(
+        title=title, type="Bug", severity=severity, file=file, location=location,
+        description=description, impact="", recommendation="", iteration=iteration,
+        start_line=start_line, end_line=end_line, source=source
+    )
+
+
+def test_reworded_findings_at_the_same_lines_merge_into_the_most_severe():
+    kept, stats = dedupe_findings([
+        finding("Race condition on shared counter", location="Worker.bump", start_line=10, end_line=14, iteration=2),
+        finding("Potential race conditions in the shared counter", start_line=12, severity="High",
+                iteration=5, description="Two threads increment without a lock"),
+        finding("SQL injection in query builder", start_line=40, iteration=1)
+    ])
+    
+    assert stats == {"findings_before": 3, "findings_after": 2, "duplicates_merged": 1}
+    race, sql = kept
+    assert race.severity == "High" and race.description == "Two threads increment without a lock"
+    assert race.iterations == [2, 5] and race.iteration == 2
+    assert sql.title == "SQL injection in query builder" and sql.iterations == [1]
+
+
+def test_loosely_similar_titles_only_merge_at_the_same_location():
+    near = [
+        finding("Missing input validation in handler", start_line=5),
+        finding("Input validation missing", start_line=7),
+    ]
+    apart = [
+        finding("Missing input validation in handler", start_line=5),
+        finding("Input validation missing", start_line=90),
+    ]
+    
+    assert len(dedupe_findings(near)[0]) == 1
+    assert len(dedupe_findings(apart)[0]) == 2
+
+
+def test_named_locations_count_when_there_are_no_line_numbers():
+    kept, _ = dedupe_findings([
+        finding("Bare except hides errors", location="load_config"),
+        finding("Bare except hiding errors", location="load_config()"),
+        finding("Bare except hides errors", location="save_config"),
+    ])
+    
+    # The third has the same title, so even at another location it is near-identical
+    assert len(kept) == 1
+    kept, _ = dedupe_findings([
+        finding("Bare except clause", location="load_config"),
+        finding("Bare except swallows KeyboardInterrupt", location="save_config"),
+    ])
+    assert len(kept) == 2
+
+
+def test_the_same_issue_in_different_files_is_kept_per_file():
+    kept, _ = dedupe_findings([
+        finding("Use of eval", file="a/utils.py", start_line=3),
+        finding("Use of eval", file="b/utils.py", start_line=3),
+        finding("Use of eval", file="A/UTILS.PY", start_line=3),
+    ])
+    
+    assert [f.file for f in kept] == ["a/utils.py", "b/utils.py"]
+
+
+def test_static_findings_are_never_merged_with_each_other():
+    kept, _ = dedupe_findings([
+        finding("Call to eval()", start_line=3, source="static"),
+        finding("Call to eval()", start_line=4, source="static"),
+    ])
+    assert len(kept) == 2
+    
+    # A model finding for the same issue joins the static one
+    kept, _ = dedupe_findings([
+        finding("Call to eval()", start_line=3, source="static"),
+        finding("Dangerous call to eval", start_line=3, iteration=2),
+    ])
+    assert len(kept) == 1 and kept[0].iterations == [1, 2]
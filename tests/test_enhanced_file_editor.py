@@ -0,0 +1,206 @@
+"""
+EnhancedCodeFileEditor: fix text parsing and definition splicing on real sources
+"""
+import ast
+import json
+import textwrap
+
+from enhanced_file_editor import EnhancedCodeFileEditor, FixTextIndex
+
+SERVICE = textwrap.dedent('''\
+    import functools
+    import os
+
+    TIMEOUT = 30
+
+
+    class Service:
+        """Talks to the backend"""
+
+        def fetch(self, key):
+            def build(part):
+                return os.path.join("/data", part)
+            return open(build(key)).read()
+
+        @staticmethod
+        @functools.lru_cache(maxsize=None)
+        def parse(text):
+            return eval(text)
+
+        async def close(self):
+            return None
+
+
+    @functools.lru_cache(maxsize=None)
+    def load(path):
+        return open(path).read()
+''')
+
+
+def fix(code, fix_type="code_replacement", **extra):
+    """A parsed fix as the strategies produce it"""
+    return {"type": fix_type, "new_code": textwrap.dedent(code), "description": "test fix", "method": "test", **extra}
+
+
+def apply(content, *fixes):
+    editor = EnhancedCodeFileEditor(backup_original_files=False)
+    for item in fixes:
+        content = editor._apply_single_fix(content, item, None)
+    return content
+
+
+def test_a_class_with_only_the_fixed_method_keeps_its_other_members():
+    result = apply(SERVICE, fix('''
+        class Service:
+            @staticmethod
+            @functools.lru_cache(maxsize=None)
+            def parse(text):
+                return ast.literal_eval(text)
+    '''))
+    
+    assert "return ast.literal_eval(text)" in result
+    assert "eval(text)" not in result.replace("literal_eval(text)", "")
+    # Decorators are part of the replaced span, not duplicated
+    assert result.count("@staticmethod") == 1
+    assert result.count("@functools.lru_cache(maxsize=None)") == 2
+    # Everything else is untouched
+    for unchanged in ('"""Talks to the backend"""', "def build(part):", "async def close(self):", "TIMEOUT = 30"):
+        assert unchanged in result
+    ast.parse(result)
+
+
+def test_new_methods_go_inside_the_class_body():
+    result = apply(SERVICE, fix('''
+        class Service:
+            def fetch(self, key):
+                with open(os.path.join("/data", key)) as f:
+                    return f.read()
+
+            def validate(self, key):
+                return "/" not in key
+    '''))
+    
+    tree = ast.parse(result)
+    service = next(node for node in tree.body if isinstance(node, ast.ClassDef))
+    assert [node.name for node in service.body if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))] == [
+        "fetch", "parse", "close", "validate"
+    ]
+    assert "def build(part)" not in result
+    assert result.rstrip().endswith("return open(path).read()")
+
+
+def test_a_nested_function_is_replaced_at_its_own_indentation():
+    result = apply(SERVICE, fix('''
+        def build(part):
+            if ".." in part:
+                raise ValueError(part)
+            return os.path.join("/data", part)
+    ''', "function_replacement", target_name="build"))
+    
+    assert (
+        '        def build(part):\n'
+        '            if ".." in part:\n'
+        '                raise ValueError(part)\n'
+        '            return os.path.join("/data", part)\n'
+        '        return open(build(key)).read()\n'
+    ) in result
+    ast.parse(result)
+
+
+def test_a_decorated_top_level_function_is_replaced_with_its_decorator():
+    result = apply(SERVICE, fix('''
+        @functools.lru_cache(maxsize=None)
+        def load(path):
+            with open(path) as f:
+                return f.read()
+    '''))
+    
+    assert result.count("def load(path):") == 1
+    assert "@functools.lru_cache(maxsize=None)\ndef load(path):\n    with open(path) as f:" in result
+    assert result.count("@functools.lru_cache(maxsize=None)") == 2
+
+
+def test_redefining_every_definition_is_not_a_whole_file_replace_when_imports_or_constants_are_dropped():
+    rewritten = '''
+        class Service:
+            def fetch(self, key):
+                return key
+
+
+        def load(path):
+            return path
+    '''
+    result = apply(SERVICE, fix(rewritten))
+    
+    # The definitions are spliced in place; imports and TIMEOUT survive
+    assert result.startswith("import functools\nimport os\n\nTIMEOUT = 30\n")
+    assert "return key" in result and "return path" in result
+    # The class fix lacked parse/close, so those members were kept
+    assert "def parse(text):" in result and "async def close(self):" in result
+
+
+def test_a_complete_fixed_file_replaces_the_whole_file():
+    complete = SERVICE.replace("import os\n", "import os\nimport ast\n").replace("return eval(text)", "return ast.literal_eval(text)")
+    
+    assert apply(SERVICE, fix(complete)) == complete
+
+
+def test_an_unparseable_fix_leaves_the_file_alone():
+    assert apply(SERVICE, fix('''
+        def load(path)
+            return open(path).read(
+    ''')) == SERVICE
+
+
+def test_fix_text_index_pairs_headers_with_the_block_right_after_them():
+    text = (
+        "**File: file_3_service.py**\n```python\nx = 1\n```\n"
+        "**File: other.py**\nSome prose first.\n```python\ny = 2\n```\n"
+        "The change in helpers.py:\n```python\n# see utils.py\nz = 3\n```\n"
+    )
+    index = FixTextIndex(text)
+    
+    assert [code for _, code in index.blocks] == ["x = 1\n", "y = 2\n", "# see utils.py\nz = 3\n"]
+    assert [name for _, name in index.headers] == ["file_3_service.py", "other.py"]
+    # The first header is directly followed by its block; the second is not
+    first_end, second_end = (end for end, _ in index.headers)
+    assert index.block_after(first_end)[1] == "x = 1\n"
+    assert text[second_end:index.block_after(second_end)[0]].strip() == "Some prose first."
+    # Upload ids are stripped and names inside code count as mentions
+    assert [name for _, name in index.mentions] == ["service.py", "other.py", "helpers.py", "utils.py"]
+    mention = text.index("helpers.py")
+    assert index.block_near(mention, 20)[1].endswith("z = 3\n")
+    assert index.block_near(mention, 5) is None
+
+
+def test_fixes_from_a_report_are_applied_and_unparseable_results_skipped(tmp_path, workspace):
+    codebase = tmp_path / "codebase"
+    (codebase / "pkg").mkdir(parents=True)
+    (codebase / "pkg" / "service.py").write_text(SERVICE)
+    fixes = textwrap.dedent('''\
+        **File: pkg/service.py**
+        ```python
+        class Service:
+            @staticmethod
+            def parse(text):
+                return ast.literal_eval(text)
+        ```
+
+        And for load:
+        ```python
+        def load(path):
+            return open(path
+        ```
+    ''')
+    report = tmp_path / "fixes.json"
+    report.write_text(json.dumps({"applied_fixes": {"generated_fixes": fixes}}))
+    
+    results = EnhancedCodeFileEditor(backup_original_files=True).apply_fixes_from_report(report, codebase)
+    
+    result = (codebase / "pkg" / "service.py").read_text()
+    assert results["files_modified"] == [str(codebase / "pkg" / "service.py")]
+    assert "return ast.literal_eval(text)" in result
+    assert "return open(path).read()" in result
+    ast.parse(result)
+    backup_dir = results["backup_directory"]
+    assert (codebase / backup_dir.rsplit("/", 1)[-1] / "service.py").read_text() == SERVICE
@@ -0,0 +1,48 @@
+"""
+Incremental baselines only vouch for files every focus area reviewed
+"""
+from clean_review import CleanIterativeReviewer
+
+from tests.stub_server import StubServer, message
+
+
+def review(monkeypatch, codebase, handler=None, **options):
+    handler = handler or (lambda method, path, body: (200, message(body["model"]), {}))
+    with StubServer(handler) as stub:
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", stub.url)
+        return CleanIterativeReviewer().run_iterative_review(codebase, "Find bugs", max_iterations=4, **options)
+
+
+def test_a_full_review_hashes_every_complete_file(monkeypatch, risky_codebase, workspace):
+    codebase = risky_codebase
+    
+    report = review(monkeypatch, codebase)
+    
+    assert sorted(report["file_hashes"]) == ["alpha.py", "beta.py", "danger.py", "gamma.py"]
+
+
+def test_files_outside_the_risk_deep_pass_are_reviewed_again_next_time(monkeypatch, risky_codebase, workspace):
+    codebase = risky_codebase
+    
+    first = review(monkeypatch, codebase, risk_tiers=True)
+    assert list(first["file_hashes"]) == ["danger.py"]
+    
+    second = review(monkeypatch, codebase, incremental=True)
+    assert second["incremental"]["changed_files"] == ["alpha.py", "beta.py", "gamma.py"]
+    assert second["incremental"]["carried_over_files"] == ["danger.py"]
+
+
+def test_an_interrupted_review_vouches_for_no_file(monkeypatch, risky_codebase, workspace):
+    codebase = risky_codebase
+    calls = []
+    
+    def failing_after_first(method, path, body):
+        calls.append(body)
+        if len(calls) > 1:
+            return 400, {"type": "error", "error": {"type": "invalid_request_error", "message": "boom"}}, {}
+        return 200, message(body["model"]), {}
+    
+    report = review(monkeypatch, codebase, failing_after_first)
+    
+    assert report["actual_iterations"] == 1
+    assert report["file_hashes"] == {}
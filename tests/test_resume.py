@@ -0,0 +1,88 @@
+"""
+Resuming risk-tier and cascade reviews from their checkpoint against a local stub Messages endpoint
+"""
+import json
+
+from checkpoint import ReviewCheckpoint
+from clean_review import CleanIterativeReviewer
+from config import CASCADE_TRIAGE_ITERATIONS, DEVELOPMENT_MODEL, PRODUCTION_MODEL, RISK_SHALLOW_ITERATIONS
+
+from tests.stub_server import StubServer, message
+
+FLAGGED = """## Issue: Shell injection
+- **Type**: Security
+- **Severity**: Critical
+- **File**: danger.py
+- **Location**: run
+- **Description**: the command runs through a shell
+- **Recommendation**: pass an argument list
+"""
+
+
+def interrupt_after_first_call(monkeypatch, codebase, text, **review_options):
+    """Run a review whose requests fail after the first one, which answers with text"""
+    calls = []
+    
+    def handler(method, path, body):
+        calls.append(body)
+        if len(calls) > 1:
+            return 400, {"type": "error", "error": {"type": "invalid_request_error", "message": "boom"}}, {}
+        return 200, message(body["model"], text), {}
+    
+    with StubServer(handler) as stub:
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", stub.url)
+        CleanIterativeReviewer().run_iterative_review(codebase, "Find bugs", **review_options)
+
+
+def resume(monkeypatch, checkpoint):
+    """Resume against a stub that always answers; returns the report and the request bodies"""
+    with StubServer(lambda method, path, body: (200, message(body["model"]), {})) as stub:
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", stub.url)
+        review = CleanIterativeReviewer().resume_review(checkpoint)
+    return review, [body for _, _, body in stub.requests]
+
+
+def test_resume_reruns_the_risk_deep_pass_on_the_deep_files_only(monkeypatch, risky_codebase, workspace):
+    interrupt_after_first_call(
+        monkeypatch, risky_codebase, "No issues found.",
+        max_iterations=4, token_budget=50_000, ranking="path", risk_tiers=True
+    )
+    checkpoint, = workspace.glob("checkpoint_*.jsonl")
+    state = ReviewCheckpoint.load(checkpoint)
+    assert state["complete"] is None
+    assert [record["result"]["iteration"] for record in state["iterations"]] == [1]
+    assert state["start"]["risk_tiers"] and state["start"]["token_budget"] == 50_000
+    assert state["start"]["ranking"] == "path"
+    
+    review, requests = resume(monkeypatch, checkpoint)
+    
+    prompts = [json.dumps(body["messages"][0]) for body in requests]
+    # The shallow pass continues over every file, then a fresh deep-pass conversation starts
+    assert len(prompts) == 1 + (4 - RISK_SHALLOW_ITERATIONS)
+    assert all(name in prompts[0] for name in ("danger.py", "alpha.py", "beta.py", "gamma.py"))
+    deep_prompt = prompts[1]
+    assert "danger.py" in deep_prompt and "alpha.py" not in deep_prompt
+    
+    assert review["risk_tiers"]["deep_files"] == ["danger.py"]
+    assert [(i["iteration"], i.get("risk_tier")) for i in review["iterations_detail"]] == [
+        (1, None), (2, None), (3, "deep"), (4, "deep")
+    ]
+    assert ReviewCheckpoint.load(checkpoint)["complete"] is not None
+
+
+def test_resume_escalates_flagged_files_of_a_cascade_to_the_production_model(monkeypatch, risky_codebase, workspace):
+    interrupt_after_first_call(
+        monkeypatch, risky_codebase, FLAGGED, max_iterations=4, cascade=True
+    )
+    checkpoint, = workspace.glob("checkpoint_*.jsonl")
+    assert ReviewCheckpoint.load(checkpoint)["start"]["cascade"]
+    
+    review, requests = resume(monkeypatch, checkpoint)
+    
+    # The rest of triage stays on the development model; only danger.py is escalated
+    models = [body["model"] for body in requests]
+    assert models == [DEVELOPMENT_MODEL] * (CASCADE_TRIAGE_ITERATIONS - 1) + [PRODUCTION_MODEL] * (4 - CASCADE_TRIAGE_ITERATIONS)
+    escalated_prompt = json.dumps(requests[CASCADE_TRIAGE_ITERATIONS - 1]["messages"][0])
+    assert "danger.py" in escalated_prompt and "alpha.py" not in escalated_prompt
+    assert review["cascade"]["escalated_files"] == ["danger.py"]
+    assert ReviewCheckpoint.load(checkpoint)["complete"] is not None
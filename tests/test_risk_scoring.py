@@ -0,0 +1,29 @@
+"""
+One risk score drives both packing order and risk tiers
+"""
+from pathlib import Path
+
+from context_packer import rank_files
+from risk_scoring import file_signals, score_files, split_by_risk
+
+UNPARSEABLE_RISKY = "<?php\nsystem($_GET['cmd']);\n$x = eval($input);\n$db->query(\"SELECT * FROM users\");\n"
+UNPARSEABLE_PLAIN = "<?php\necho 'hello';\n$total = $a + $b;\nreturn $total;\n"
+
+
+def test_files_ast_cannot_parse_fall_back_to_risky_constructs():
+    assert file_signals(UNPARSEABLE_RISKY)["dangerous_calls"] == 2
+    assert file_signals(UNPARSEABLE_PLAIN)["dangerous_calls"] == 0
+
+
+def test_ranking_and_tiering_agree_on_the_riskiest_file():
+    sources = {
+        Path("plain.php"): UNPARSEABLE_PLAIN,
+        Path("risky.php"): UNPARSEABLE_RISKY,
+        Path("tidy.py"): "def add(a, b):\n    return a + b\n"
+    }
+    scores = score_files(sources)
+    
+    deep, _ = split_by_risk(scores, list(sources), 0.3)
+    
+    assert rank_files(sources, "risk", scores)[0] == Path("risky.php")
+    assert deep == [Path("risky.php")]
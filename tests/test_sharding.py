@@ -0,0 +1,45 @@
+"""
+Sharded reviews merge their shards' findings through dedup.dedupe_findings
+"""
+from clean_review import CleanIterativeReviewer
+from sharding import ShardedReviewer
+
+from tests.stub_server import StubServer, message
+
+ISSUE = """## Issue: {title}
+- **Type**: Security
+- **Severity**: High
+- **File**: big.py
+- **Location**: helper_0
+- **Description**: {description}
+- **Recommendation**: pass an argument list
+"""
+
+
+def test_the_same_issue_from_every_shard_is_reported_once(monkeypatch, tmp_path, workspace):
+    codebase = tmp_path / "codebase"
+    codebase.mkdir()
+    (codebase / "big.py").write_text("".join(
+        f"def helper_{i}(value):\n    return value * {i} + len(str(value))\n\n\n" for i in range(40)
+    ))
+    calls = []
+    
+    def handler(method, path, body):
+        calls.append(body)
+        title = "Shell injection in helper" if len(calls) % 2 else "Shell injection via helper"
+        text = ISSUE.format(title=title, description="x" * len(calls))
+        return 200, message(body["model"], text), {}
+    
+    with StubServer(handler) as stub:
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", stub.url)
+        report = ShardedReviewer(CleanIterativeReviewer()).run_sharded_review(
+            codebase, "Find bugs", max_iterations=2, token_budget=300
+        )
+    
+    assert len(report["sharding"]["shards"]) > 1
+    assert len(calls) == 2 * len(report["sharding"]["shards"])
+    assert len(report["findings"]) == 1
+    assert report["findings"][0]["iterations"] == [1, 2]
+    assert report["deduplication"]["duplicates_merged"] == len(calls) - 1
+    assert len(report["findings_by_file"]["big.py"]) == 1
+    assert report["comprehensive_analysis"].count("## Issue:") == 1
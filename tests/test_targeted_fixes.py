@@ -0,0 +1,136 @@
+"""
+Targeted fix planning and patch application (no API calls)
+"""
+import textwrap
+
+from findings import Finding
+from symbol_index import SymbolIndex
+from targeted_fixes import apply_patches, plan_regions, resolve_file
+
+MODULE = textwrap.dedent('''\
+    import subprocess
+
+
+    class Runner:
+        def run(self, command):
+            return subprocess.call(command, shell=True)
+
+        @property
+        def name(self):
+            return "runner"
+
+
+    def helper(value):
+        return eval(value)
+''')
+
+
+def finding(file, location="", start_line=None, end_line=None, title="Issue"):
+    """A review finding with only the fields fix planning looks at"""
+    return Finding(
+        title=title, type="Bug", severity="High", file=file, location=location,
+        description="", impact="", recommendation="", start_line=start_line, end_line=end_line
+    )
+
+
+def test_resolve_file_ignores_where_the_codebase_lives_and_skips_editor_backups(tmp_path, workspace):
+    # A codebase under a directory that happens to be named backup_*
+    codebase = tmp_path / "backup_2026" / "project"
+    (codebase / "pkg").mkdir(parents=True)
+    (codebase / "pkg" / "app.py").write_text("x = 1\n")
+    # An editor backup of the same file inside the codebase
+    (codebase / "backup_20260101_000000" / "pkg").mkdir(parents=True)
+    (codebase / "backup_20260101_000000" / "pkg" / "app.py").write_text("x = 0\n")
+    index = SymbolIndex.open(codebase)
+    
+    assert resolve_file("pkg/app.py", index) == codebase / "pkg" / "app.py"
+    assert resolve_file("app.py", index) == codebase / "pkg" / "app.py"
+    assert resolve_file("missing.py", index) is None
+    assert resolve_file("", index) is None
+
+
+def test_resolve_file_needs_the_path_when_a_name_is_ambiguous(tmp_path, workspace):
+    for package in ("a", "b"):
+        (tmp_path / package).mkdir()
+        (tmp_path / package / "utils.py").write_text("x = 1\n")
+    index = SymbolIndex.open(tmp_path)
+    
+    assert resolve_file("utils.py", index) is None
+    assert resolve_file("b/utils.py", index) == tmp_path / "b" / "utils.py"
+
+
+def test_plan_regions_skips_unreadable_files_and_plans_the_rest(tmp_path, workspace):
+    (tmp_path / "legacy.py").write_bytes("# caf\xe9\ndef f():\n    return 1\n".encode("latin-1"))
+    (tmp_path / "app.py").write_text("def g():\n    return 2\n")
+    
+    regions, unplaced = plan_regions(
+        [finding("legacy.py", "f", 2), finding("app.py", "g", 2)], tmp_path
+    )
+    
+    assert [(r["file"], r["symbol"], r["start_line"], r["end_line"]) for r in regions] == [("app.py", "g", 1, 2)]
+    assert [f.file for f in unplaced] == ["legacy.py"]
+
+
+def patch_for(region, replacement):
+    """A generated patch for a planned region"""
+    return {
+        "file": region["file"], "start_line": region["start_line"], "end_line": region["end_line"],
+        "symbol": region["symbol"], "original": region["original"], "replacement": replacement
+    }
+
+
+def test_findings_in_a_method_and_its_class_merge_into_one_region(tmp_path, workspace):
+    (tmp_path / "runner.py").write_text(MODULE)
+    
+    regions, unplaced = plan_regions([
+        finding("runner.py", "Runner.run", 6, title="Shell injection"),
+        finding("runner.py", "Runner", 4, title="God class"),
+        finding("runner.py", "decorated name property", 8, title="Property"),
+        finding("runner.py", "helper", title="eval")
+    ], tmp_path)
+    
+    assert unplaced == []
+    assert [(r["symbol"], r["start_line"], r["end_line"], len(r["findings"])) for r in regions] == [
+        ("Runner, Runner.run, Runner.name", 4, 10, 3),
+        ("helper", 13, 14, 1)
+    ]
+    assert regions[1]["original"] == "def helper(value):\n    return eval(value)\n"
+
+
+def test_patches_apply_bottom_up_and_stale_or_unparseable_ones_are_skipped(tmp_path, workspace):
+    (tmp_path / "runner.py").write_text(MODULE)
+    regions, _ = plan_regions([
+        finding("runner.py", "Runner.run", 6), finding("runner.py", "helper", 14)
+    ], tmp_path)
+    run_region, helper_region = regions
+    assert [(r["start_line"], r["end_line"]) for r in regions] == [(5, 6), (13, 14)]
+    
+    # The first patch grows the file; the second must still land on the original lines
+    grown = (
+        "    def run(self, command):\n"
+        "        if not command:\n"
+        "            raise ValueError(\"empty\")\n"
+        "        return subprocess.call(command)\n"
+    )
+    results = apply_patches([
+        patch_for(run_region, grown),
+        patch_for(helper_region, "def helper(value):\n    return ast.literal_eval(value)\n")
+    ], tmp_path)
+    
+    patched = (tmp_path / "runner.py").read_text()
+    assert results["patches_applied"] == 2 and results["patches_skipped"] == []
+    assert "raise ValueError(\"empty\")" in patched and "shell=True" not in patched
+    assert patched.endswith("def helper(value):\n    return ast.literal_eval(value)\n")
+    assert results["files_modified"] == ["runner.py"]
+    backup, = tmp_path.glob("backup_*/runner.py")
+    assert backup.read_text() == MODULE
+    
+    # Regenerated against the old source: stale now, so skipped; a broken patch is skipped too
+    stale = apply_patches([patch_for(helper_region, "def helper(value):\n    return None\n")], tmp_path, backup=False)
+    regions, _ = plan_regions([finding("runner.py", "helper", title="eval")], tmp_path)
+    broken = apply_patches([patch_for(regions[0], "def helper(value)\n    return None\n")], tmp_path, backup=False)
+    
+    assert [item["reason"] for item in stale["patches_skipped"]] == ["source changed since generation"]
+    assert broken["patches_skipped"][0]["reason"].startswith("patched file does not parse")
+    assert stale["files_modified"] == broken["files_modified"] == []
+    assert (tmp_path / "runner.py").read_text() == patched